@@ -1,22 +1,11 @@
-from flask import Flask, request, jsonify
-import random
+import sys
+from server import create_app, create_asgi
 
-app = Flask(__name__)
-
-responses = {
-    "stress": ["Try deep breathing exercises!", "Consider talking to a counselor."],
-    "anxiety": ["Meditation can help reduce anxiety.", "Would you like some relaxation techniques?"]
-}
-
-@app.route('/chatbot', methods=['POST'])
-def chatbot():
-    data = request.json
-    user_message = data.get("message", "").lower()
-    for key in responses:
-        if key in user_message:
-            return jsonify({"response": random.choice(responses[key])})
-    return jsonify({"response": "I'm here to help. Please tell me more."})
+app = create_app()
 
 if __name__ == "__main__":
-   app.run(host="0.0.0.0", port=5000, debug=True)
-
+    if "--asgi" in sys.argv:
+        from server.asgi import serve_asgi
+        serve_asgi(create_asgi(), host="0.0.0.0", port=5000)
+    else:
+        app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,2 @@
+# Benchmark scripts for the Python server, run as modules from the repo root,
+# e.g. python -m benchmarks.bench_intent_matcher
@@ -0,0 +1,57 @@
+# Access-policy lookup cost: prefix trie vs checking each policy in turn
+import time
+from server.access_policy import DEFAULT_POLICIES, DENY, REQUIRE_AUTH, Policy, PolicyTable
+
+PATHS = [
+    ("GET", "/api/appointments"),
+    ("GET", "/admin/users/17/settings"),
+    ("POST", "/api/resources/search"),
+    ("GET", "/static/assets/index-4f9a1c.js"),
+    ("GET", "/api/service250/items/9"),
+]
+
+
+def make_policies(count):
+    policies = list(DEFAULT_POLICIES)
+    i = 0
+    while len(policies) < count:
+        decision = DENY if i % 3 == 0 else REQUIRE_AUTH
+        policies.append(Policy(f"service{i}", f"/api/service{i}/items", decision))
+        i += 1
+    return policies[:count]
+
+
+def linear_lookup(policies, method, path):
+    """Check every policy and keep the longest whole-segment prefix match"""
+    best = None
+    for policy in policies:
+        prefix = policy.prefix
+        if (path == prefix or path.startswith(prefix + "/")) and \
+                (policy.methods is None or method in policy.methods):
+            if best is None or len(prefix) > len(best.prefix):
+                best = policy
+    return best
+
+
+def per_lookup(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for method, path in PATHS:
+            func(method, path)
+    return (time.perf_counter() - start) / (rounds * len(PATHS))
+
+
+def run_benchmark(rounds=20000):
+    print(f"{'policies':>9} {'linear scan':>12} {'trie':>9}")
+    for count in (6, 100, 500):
+        policies = make_policies(count)
+        table = PolicyTable(policies)
+        for method, path in PATHS:
+            assert table.lookup(method, path) is linear_lookup(policies, method, path)
+        linear = per_lookup(lambda m, p: linear_lookup(policies, m, p), rounds // 10)
+        trie = per_lookup(table.lookup, rounds)
+        print(f"{count:>9} {linear * 1e6:>10.2f}us {trie * 1e6:>7.2f}us")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,55 @@
+# Booking a term schedule: one batch request vs one POST per session
+import time
+from datetime import datetime, timedelta
+from server import create_app
+from server.appointments import DATE_FORMAT, parse_date
+from tests.test_config import TEST_USER
+
+
+def term_schedule(count, first=0):
+    """count 90 minute group sessions two hours apart, skipping the first sessions of the term"""
+    start = datetime(2030, 1, 6, 9, 0)
+    return [{"date": (start + timedelta(hours=2 * i)).strftime(DATE_FORMAT), "type": "group"}
+            for i in range(first, first + count)]
+
+
+def per_call(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds
+
+
+def run_benchmark():
+    app = create_app({"LOGIN_RATE_LIMIT_IP": (10 ** 6, 1), "SEED_USERS": [TEST_USER]})
+    client = app.test_client()
+    token = client.post("/api/login", json={"username": "testuser",
+                                            "password": "Test123!"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    text = "2030-03-20 14:30:00"
+    strptime = per_call(lambda: datetime.strptime(text, DATE_FORMAT), 100000)
+    fast = per_call(lambda: parse_date(text), 100000)
+    print(f"date parsing: strptime {strptime * 1e6:.2f}us, parse_date {fast * 1e6:.2f}us")
+
+    print(f"\n{'bookings':>9} {'single POSTs':>13} {'batch':>10} {'speedup':>8}")
+    # Every run books new hours; the user can't hold two sessions at once
+    first = 0
+    for count in (100, 1000, 5000):
+        schedule = term_schedule(count, first)
+        start = time.perf_counter()
+        for item in schedule:
+            client.post("/api/appointments", json=item, headers=headers)
+        singles = time.perf_counter() - start
+        schedule = term_schedule(count, first + count)
+        first += 2 * count
+        start = time.perf_counter()
+        response = client.post("/api/appointments/batch", json={"appointments": schedule},
+                               headers=headers)
+        batch = time.perf_counter() - start
+        assert response.get_json()["accepted"] == count
+        print(f"{count:>9} {singles * 1e3:>11.1f}ms {batch * 1e3:>8.1f}ms {singles / batch:>7.0f}x")
+
+
+if __name__ == '__main__':
+    run_benchmark()
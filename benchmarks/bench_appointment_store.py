@@ -0,0 +1,88 @@
+# Double-booking checks at 100k appointments: interval index vs SQL query
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+import sqlalchemy as sa
+from server.appointment_store import AppointmentStore, to_seconds
+
+COUNSELORS = 200
+USERS = 20011  # prime, so no user gets two bookings in the same hour
+
+
+def schedule(count, seed=1):
+    """count non-clashing hour-long bookings spread over counselors and days"""
+    rng = random.Random(seed)
+    start = datetime(2030, 1, 6, 9, 0)
+    slots = rng.sample(range(count * 2), count)
+    for slot in slots:
+        counselor, hour = divmod(slot, count * 2 // COUNSELORS)
+        yield {
+            "user_id": slot % USERS,
+            "counselor_id": counselor,
+            "date": start + timedelta(hours=hour),
+            "type": "counseling",
+        }
+
+
+def sql_conflict(conn, table, counselor_id, start, end):
+    """The same question asked of the database"""
+    starts = sa.func.julianday(table.c.date) * 86400
+    query = sa.select(sa.func.count()).where(
+        table.c.counselor_id == counselor_id,
+        starts < end,
+        starts + table.c.duration_minutes * 60 > start,
+    )
+    return conn.execute(query).scalar()
+
+
+def run_benchmark(count=100000, probes=2000):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    try:
+        store = AppointmentStore(url)
+        bookings = list(schedule(count))
+        start = time.perf_counter()
+        for i in range(0, count, 5000):
+            results = store.book_many(bookings[i:i + 5000])
+            assert all(error is None for _, error in results)
+        print(f"booked {count} appointments in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        restarted = AppointmentStore(url)
+        print(f"index rebuilt on restart in {(time.perf_counter() - start) * 1e3:.0f}ms "
+              f"({restarted.stats()['indexed']} intervals)")
+
+        rng = random.Random(2)
+        checks = []
+        for _ in range(probes):
+            booking = rng.choice(bookings)
+            offset = rng.choice((-30, 0, 30, 60)) * 60
+            s = to_seconds(booking["date"]) + offset
+            checks.append((booking["counselor_id"], s, s + 3600))
+
+        start = time.perf_counter()
+        index_hits = [restarted.by_counselor.conflict(c, s, e) is not None for c, s, e in checks]
+        index_time = (time.perf_counter() - start) / probes
+
+        # julianday counts from noon 4714 BC; shift the probes to match
+        shift = 1721424.5 * 86400
+        with restarted.engine.connect() as conn:
+            start = time.perf_counter()
+            sql_hits = [sql_conflict(conn, restarted.table, c, s + shift, e + shift) > 0
+                        for c, s, e in checks]
+            sql_time = (time.perf_counter() - start) / probes
+        assert index_hits == sql_hits
+
+        print(f"conflict check: interval index {index_time * 1e6:.2f}us, "
+              f"SQL query {sql_time * 1e6:.0f}us")
+        restarted.engine.dispose()
+        store.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    run_benchmark()
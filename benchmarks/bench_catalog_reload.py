@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from server.catalog import FileCatalog
+from server.chatbot import Chatbot
+
+
+def write_catalog(path, intents, version):
+    data = {
+        f"intent{i}": {
+            "keywords": [f"topic{i}", f"phrase number {i}"],
+            "replies": [f"Reply {j} for intent {i}, revision {version}." for j in range(3)],
+        }
+        for i in range(intents)
+    }
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def run_benchmark():
+    print(f"{'intents':>8} {'reload (ms)':>12} {'swap (us)':>10} "
+          f"{'p50 quiet (us)':>15} {'p99 quiet (us)':>15} {'p99 reloading (us)':>19}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.json")
+        for intents in (100, 1000, 10000):
+            write_catalog(path, intents, 0)
+            catalog = FileCatalog(path)
+            bot = Chatbot(catalog)
+            message = f"i keep thinking about topic{intents // 2} today"
+
+            quiet = []
+            for _ in range(2000):
+                start = time.perf_counter()
+                bot.reply(message)
+                quiet.append(time.perf_counter() - start)
+
+            stop = threading.Event()
+
+            def reloader():
+                version = 1
+                while not stop.is_set():
+                    write_catalog(path, intents, version)
+                    catalog.reload()
+                    version += 1
+
+            thread = threading.Thread(target=reloader)
+            thread.start()
+            busy = []
+            for _ in range(2000):
+                start = time.perf_counter()
+                bot.reply(message)
+                busy.append(time.perf_counter() - start)
+            stop.set()
+            thread.join()
+
+            stats = catalog.stats()
+            print(f"{intents:>8} {stats['last_reload_seconds'] * 1e3:>12.2f} "
+                  f"{stats['last_swap_seconds'] * 1e6:>10.2f} "
+                  f"{percentile(quiet, 50) * 1e6:>15.1f} {percentile(quiet, 99) * 1e6:>15.1f} "
+                  f"{percentile(busy, 99) * 1e6:>19.1f}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
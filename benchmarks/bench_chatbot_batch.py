@@ -0,0 +1,40 @@
+import random
+import time
+from app import app
+
+SAMPLES = [
+    "I have so much stress with coursework",
+    "my anxiety is getting worse",
+    "hello",
+    "I can't sleep before exams",
+    "feeling stressed and anxious",
+]
+
+
+def make_messages(count, seed=7):
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLES) for _ in range(count)]
+
+
+def run_benchmark(count=2000, batch_size=500):
+    client = app.test_client()
+    messages = make_messages(count)
+
+    start = time.perf_counter()
+    for message in messages:
+        client.post("/chatbot", json={"message": message})
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        client.post("/chatbot/batch", json={"messages": messages[offset:offset + batch_size]})
+    batch = time.perf_counter() - start
+
+    print(f"messages: {count}, batch size: {batch_size}")
+    print(f"single calls: {single:.3f}s ({count / single:,.0f} msg/s)")
+    print(f"batch calls:  {batch:.3f}s ({count / batch:,.0f} msg/s)")
+    print(f"speedup:      {single / batch:.1f}x")
+
+
+if __name__ == '__main__':
+    run_benchmark()
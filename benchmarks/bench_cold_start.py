@@ -0,0 +1,34 @@
+# Cold-start cost of the app: fresh interpreter, import, create, first request.
+#
+# Run on two checkouts to compare before/after, e.g. with git worktree.
+import statistics
+import subprocess
+import sys
+
+SNIPPETS = {
+    "import app": "import app",
+    "get_test_app()": "from tests.test_config import get_test_app; get_test_app()",
+    "first /chatbot": (
+        "from tests.test_config import get_test_app; "
+        "get_test_app().test_client().post('/chatbot', json={'message': 'stress'})"
+    ),
+}
+TIMER = "import time; _t = time.perf_counter(); {code}; print(time.perf_counter() - _t)"
+
+
+def measure(code, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", TIMER.format(code=code)],
+                             capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def run_benchmark(runs=7):
+    for name, code in SNIPPETS.items():
+        print(f"{name:>16}: {measure(code, runs) * 1e3:7.1f}ms (median of {runs})")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,51 @@
+import time
+import tracemalloc
+from server.conversation import ConversationStore
+
+REPLY = "Try deep breathing exercises!"
+CHECKPOINTS = (50000, 100000, 200000, 500000)
+
+
+def fill(store, start, stop):
+    for i in range(start, stop):
+        store.get(f"session-{i}").record("stress", REPLY)
+
+
+def measure_memory(max_sessions):
+    """Traced memory after each checkpoint; flat once the cap is reached"""
+    store = ConversationStore(max_sessions=max_sessions)
+    tracemalloc.start()
+    seen = 0
+    rows = []
+    for total in CHECKPOINTS:
+        fill(store, seen, total)
+        seen = total
+        rows.append((total, len(store), tracemalloc.get_traced_memory()[0], store.evictions))
+    tracemalloc.stop()
+    return rows
+
+
+def measure_latency(max_sessions):
+    store = ConversationStore(max_sessions=max_sessions)
+    start = time.perf_counter()
+    fill(store, 0, 2 * max_sessions)
+    miss = (time.perf_counter() - start) / (2 * max_sessions)
+
+    start = time.perf_counter()
+    for i in range(max_sessions, 2 * max_sessions):
+        store.get(f"session-{i}")
+    hit = (time.perf_counter() - start) / max_sessions
+    return miss, hit, store.stats()
+
+
+def run_benchmark(max_sessions=100000):
+    print(f"{'sessions seen':>14} {'stored':>8} {'memory (MB)':>12} {'evictions':>10}")
+    for total, stored, memory, evictions in measure_memory(max_sessions):
+        print(f"{total:>14} {stored:>8} {memory / 2**20:>12.1f} {evictions:>10}")
+    miss, hit, stats = measure_latency(max_sessions)
+    print(f"create+evict: {miss * 1e6:.2f}us, hit: {hit * 1e6:.2f}us")
+    print(f"stats: {stats}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
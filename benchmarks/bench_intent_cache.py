@@ -0,0 +1,55 @@
+import random
+import time
+from server.chatbot import Chatbot
+from server.intent_cache import IntentCache
+
+CATALOG = {f"topic{i}": [f"Reply for topic {i}."] for i in range(1000)}
+CATALOG.update({
+    "stress": ["Try deep breathing exercises!"],
+    "anxiety": ["Meditation can help reduce anxiety."],
+    "help": ["Here are some immediate support options."],
+})
+HEAD = ["I feel anxious", "help", "stressed", "i feel ANXIOUS!", "Help!!", "so stressed out",
+        "i cant sleep", "hello"]
+
+
+def make_traffic(count, seed=11):
+    """Mostly a few short messages, with a long tail of unique ones"""
+    rng = random.Random(seed)
+    traffic = []
+    for i in range(count):
+        if rng.random() < 0.8:
+            traffic.append(rng.choice(HEAD))
+        else:
+            traffic.append(f"message number {i} about my week and topic{rng.randint(0, 999)}")
+    return traffic
+
+
+def timed(bot, traffic):
+    start = time.perf_counter()
+    for message in traffic:
+        bot.reply(message)
+    return time.perf_counter() - start
+
+
+def run_benchmark(count=50000):
+    traffic = make_traffic(count)
+    plain = Chatbot(CATALOG)
+    cached = Chatbot(CATALOG, cache=IntentCache(max_entries=5000))
+    # Warm the lazily built TF-IDF model so neither run pays for it
+    plain.reply("zzz")
+    cached.reply("zzz")
+
+    without = timed(plain, traffic)
+    with_cache = timed(cached, traffic)
+    stats = cached.cache.stats()
+    print(f"messages: {count}, catalog intents: {len(CATALOG)}")
+    print(f"no cache:   {without / count * 1e6:7.1f}us per message")
+    print(f"with cache: {with_cache / count * 1e6:7.1f}us per message")
+    print(f"hit ratio: {stats['hit_ratio']:.1%}, avg hit {stats['avg_hit_us']:.1f}us, "
+          f"avg miss {stats['avg_miss_us']:.1f}us, saved {stats['seconds_saved'] * 1e3:.0f}ms "
+          f"({without - with_cache:.3f}s wall)")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,56 @@
+import random
+import string
+import time
+from server.intents import IntentMatcher
+
+MESSAGES = [
+    "i have been feeling a lot of stress about my exams lately",
+    "my anxiety keeps me awake at night and i can't focus",
+    "hello, i just wanted to talk to someone",
+    "i feel lonely since moving here for university",
+]
+
+
+def make_keywords(count, seed=42):
+    """Generate a catalog of random keywords plus the real intents"""
+    rng = random.Random(seed)
+    keywords = {"stress", "anxiety"}
+    while len(keywords) < count:
+        length = rng.randint(4, 12)
+        keywords.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return sorted(keywords)
+
+
+def loop_match(keywords, message):
+    """The original chatbot() scan: one substring search per keyword"""
+    for key in keywords:
+        if key in message:
+            return key
+    return None
+
+
+def time_per_message(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in MESSAGES:
+            func(message)
+    return (time.perf_counter() - start) / (rounds * len(MESSAGES))
+
+
+def run_benchmark():
+    print(f"{'keywords':>10} {'build (ms)':>12} {'loop (us)':>12} {'matcher (us)':>14} {'speedup':>9}")
+    for count in (10, 1000, 10000):
+        keywords = make_keywords(count)
+        start = time.perf_counter()
+        matcher = IntentMatcher((k, k) for k in keywords)
+        build = time.perf_counter() - start
+
+        rounds = max(10, 20000 // count)
+        loop = time_per_message(lambda m: loop_match(keywords, m), rounds)
+        compiled = time_per_message(matcher.best, rounds)
+        print(f"{count:>10} {build * 1e3:>12.2f} {loop * 1e6:>12.2f} "
+              f"{compiled * 1e6:>14.2f} {loop / compiled:>8.1f}x")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,53 @@
+# Per-request JSON cost of the fixed response bodies under the test routes
+import time
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from server import create_app
+from server.routes import ACCESS_DENIED, INVALID_REQUEST, NOT_LOGGED_IN
+
+BODIES = {
+    "403 access denied": ({"message": "Access Denied - Administrative access required"}, ACCESS_DENIED),
+    "401 please log in": ({"message": "Please log in"}, NOT_LOGGED_IN),
+    "400 invalid request": ({"message": "Invalid request"}, INVALID_REQUEST),
+}
+ROUTES = [("GET", "/admin/users"), ("GET", "/api/appointments"), ("GET", "/api/resources?q='")]
+
+
+def per_call(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds
+
+
+def run_benchmark(rounds=20000):
+    default_app = create_app({'JSON_PROVIDER': DefaultJSONProvider})
+    fast_app = create_app()
+    fast_app.logger.disabled = True
+
+    print("Encoding the body:")
+    print(f"{'body':>20} {'default':>10} {'fast':>10} {'preserialized':>14}")
+    for name, (payload, _) in BODIES.items():
+        default = per_call(lambda: default_app.json.dumps(payload), rounds)
+        fast = per_call(lambda: fast_app.json.dumps(payload), rounds)
+        print(f"{name:>20} {default * 1e6:>8.2f}us {fast * 1e6:>8.2f}us {0:>12.2f}us")
+
+    print("\nBuilding the response object (encode + Response):")
+    print(f"{'body':>20} {'jsonify default':>16} {'jsonify fast':>13} {'preserialized':>14}")
+    for name, (payload, constant) in BODIES.items():
+        with default_app.app_context():
+            default = per_call(lambda: jsonify(payload), rounds)
+        with fast_app.app_context():
+            fast = per_call(lambda: jsonify(payload), rounds)
+            pre = per_call(lambda: fast_app.make_response(constant), rounds)
+        print(f"{name:>20} {default * 1e6:>14.2f}us {fast * 1e6:>11.2f}us {pre * 1e6:>12.2f}us")
+
+    print("\nFull request through the test client:")
+    client = fast_app.test_client()
+    for method, url in ROUTES:
+        elapsed = per_call(lambda: client.open(url, method=method), rounds // 10)
+        print(f"{method} {url:<22} {elapsed * 1e6:8.1f}us")
+
+
+if __name__ == '__main__':
+    run_benchmark()
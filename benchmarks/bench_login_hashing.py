@@ -0,0 +1,69 @@
+# Login throughput and side-request latency across password hashing pool sizes
+import threading
+import time
+from server import create_app
+from server.credentials import DEFAULT_METHOD
+from tests.test_config import TEST_USER
+
+LOGIN_THREADS = 8
+CREDENTIALS = {"username": "testuser", "password": "Test123!"}
+
+
+def run_pool(workers, logins_per_thread):
+    app = create_app({
+        "PASSWORD_HASH_WORKERS": workers,
+        "PASSWORD_HASH_METHOD": DEFAULT_METHOD,
+        "LOGIN_RATE_LIMIT_IP": (10 ** 6, 1),
+        "LOGIN_RATE_LIMIT_USERNAME": (10 ** 6, 1),
+        "SEED_USERS": [TEST_USER],
+    })
+    app.logger.disabled = True
+    # First login pays for the rehash and for starting the pool
+    app.test_client().post("/api/login", json=CREDENTIALS)
+
+    done = threading.Event()
+    side_latencies = []
+
+    def login_worker():
+        client = app.test_client()
+        for _ in range(logins_per_thread):
+            client.post("/api/login", json=CREDENTIALS)
+
+    def side_worker():
+        # A cheap request that should not wait behind the hashing
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/api/appointments")
+            side_latencies.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    side = threading.Thread(target=side_worker)
+    side.start()
+    threads = [threading.Thread(target=login_worker) for _ in range(LOGIN_THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    side.join()
+    app.extensions["credentials"].close()
+
+    side_latencies.sort()
+    p99 = side_latencies[int(len(side_latencies) * 0.99)] if side_latencies else 0.0
+    return LOGIN_THREADS * logins_per_thread / elapsed, p99
+
+
+def run_benchmark(logins_per_thread=4):
+    print(f"{LOGIN_THREADS} threads x {logins_per_thread} logins, {DEFAULT_METHOD}")
+    print(f"{'pool':>8} {'logins/s':>9} {'side p99':>10}")
+    for workers in (0, 1, 2, 4):
+        rate, p99 = run_pool(workers, logins_per_thread)
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:>8} {rate:>9.1f} {p99 * 1e3:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,95 @@
+# Mood trends over 10M entries: vectorised analytics vs a per-row Python loop
+import time
+from array import array
+from datetime import date
+import numpy as np
+from server import mood_analytics as analytics
+
+USERS = 30000
+DAYS = 365
+
+
+def make_snapshot(count, seed=1):
+    """MoodStore.snapshot() style columns: count entries over a year for USERS users"""
+    rng = np.random.default_rng(seed)
+    first = date(2030, 1, 1).toordinal()
+    users = np.sort(rng.integers(0, USERS, count))
+    seconds = (first + rng.integers(0, DAYS, count)) * 86400 + rng.integers(0, 86400, count)
+    # Each user drifts around their own baseline
+    baseline = rng.normal(3.2, 0.6, USERS)[users]
+    codes = np.clip(np.rint(baseline + rng.normal(0, 1, count)) - 1, 0, 4).astype(np.int8)
+    bounds = np.searchsorted(users, np.arange(USERS + 1))
+    snapshot = []
+    for user in range(USERS):
+        lo, hi = bounds[user], bounds[user + 1]
+        order = np.argsort(seconds[lo:hi], kind="stable") + lo
+        snapshot.append((user, array("q", seconds[order].tobytes()),
+                         array("b", codes[order].tobytes())))
+    return snapshot, first
+
+
+def python_trends(times, moods, first_day, num_days, threshold=analytics.LOW_SCORE):
+    """One user's daily means, slope and low streaks, a row at a time"""
+    totals, counts = {}, {}
+    for seconds, code in zip(times, moods):
+        day = seconds // 86400 - first_day
+        if 0 <= day < num_days:
+            totals[day] = totals.get(day, 0) + code + 1
+            counts[day] = counts.get(day, 0) + 1
+    daily = {day: totals[day] / counts[day] for day in totals}
+    n = len(daily)
+    sx = sum(daily)
+    sy = sum(daily.values())
+    sxx = sum(d * d for d in daily)
+    sxy = sum(d * v for d, v in daily.items())
+    slope = (n * sxy - sx * sy) / (n * sxx - sx * sx) if n > 1 else None
+    longest = current = 0
+    for day in range(num_days):
+        current = current + 1 if daily.get(day, 99) <= threshold else 0
+        longest = max(longest, current)
+    return slope, current, longest
+
+
+def timed(label, function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    print(f"  {label:<34} {(time.perf_counter() - start) * 1e3:8.1f}ms")
+    return result
+
+
+def run_benchmark(count=10000000):
+    start = time.perf_counter()
+    snapshot, first = make_snapshot(count)
+    print(f"{count} entries, {USERS} users, {DAYS} days "
+          f"(generated in {time.perf_counter() - start:.1f}s)")
+
+    print("vectorised, all users:")
+    start = time.perf_counter()
+    _, rows, days, scores = timed("load columns", analytics.load_columns, snapshot)
+    matrix = timed("daily score matrix", analytics.daily_scores,
+                   rows, days, scores, USERS, first, DAYS)
+    rolling = timed("7-day rolling means", analytics.rolling_mean, matrix, 7)
+    slopes = timed("slopes", analytics.trend_slopes, matrix)
+    current, longest = timed("low streaks", analytics.low_streaks, matrix)
+    timed("crossings below 2.0", analytics.crossings_below, rolling)
+    vector_time = time.perf_counter() - start
+    print(f"  {'total':<34} {vector_time * 1e3:8.1f}ms")
+    timed("cohort_trends() end to end", analytics.cohort_trends, snapshot, first, DAYS)
+
+    sample = 1000
+    start = time.perf_counter()
+    expected = [python_trends(times, moods, first, DAYS) for _, times, moods in snapshot[:sample]]
+    loop_time = (time.perf_counter() - start) * USERS / sample
+    for i, (slope, cur, long) in enumerate(expected):
+        assert abs(slope - slopes[i]) < 1e-6 and (cur, long) == (current[i], longest[i])
+    print(f"per-row Python loop, extrapolated from {sample} users: {loop_time:.1f}s "
+          f"({loop_time / vector_time:.0f}x slower)")
+
+    start = time.perf_counter()
+    for user in snapshot[:sample]:
+        analytics.user_trends([user], first, 90)
+    print(f"one user's 90-day trends: {(time.perf_counter() - start) / sample * 1e3:.3f}ms")
+
+
+if __name__ == '__main__':
+    run_benchmark()
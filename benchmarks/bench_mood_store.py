@@ -0,0 +1,101 @@
+# Memory and summary cost per million mood entries: columns + rollups vs row dicts
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from server.appointment_store import to_seconds
+from server.mood_store import MOODS, MoodSeries, summary_json
+
+USERS = 2000
+DAYS = 365
+
+
+def entries(count, seed=1):
+    """(user, seconds, mood code) for count entries over a year, in time order"""
+    rng = random.Random(seed)
+    first = to_seconds(datetime(2030, 1, 1))
+    step = DAYS * 86400 // count
+    for i in range(count):
+        yield rng.randrange(USERS), first + i * step, rng.choice((0, 1, 2, 2, 3, 3, 3, 4))
+
+
+def measure(build):
+    """(result, bytes allocated, seconds); timed without tracemalloc running"""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def build_columns(data):
+    series = {}
+    for user, seconds, code in data:
+        s = series.get(user)
+        if s is None:
+            s = series[user] = MoodSeries()
+        s.append(len(series), seconds, code)
+    return series
+
+
+def build_rows(data):
+    rows = {}
+    for i, (user, seconds, code) in enumerate(data):
+        rows.setdefault(user, []).append({
+            "id": i, "userId": user, "mood": MOODS[code], "note": None,
+            "timestamp": seconds,
+        })
+    return rows
+
+
+def rows_summary(rows):
+    """What a summary costs when it has to read every entry"""
+    days = {}
+    for row in rows:
+        counts = days.setdefault(row["timestamp"] // 86400, [0] * 5)
+        counts[MOODS.index(row["mood"])] += 1
+    return [summary_json(ordinal, counts) for ordinal, counts in sorted(days.items())]
+
+
+def run_benchmark(count=1000000):
+    data = list(entries(count))
+    columns, column_bytes, column_time = measure(lambda: build_columns(data))
+    print(f"{count} entries, {USERS} users, {DAYS} days")
+    print(f"columns + rollups: {column_bytes / 2 ** 20:.1f} MiB "
+          f"({column_bytes / count:.1f} bytes/entry), appended in {column_time:.2f}s "
+          f"({column_time / count * 1e6:.2f}us each)")
+    raw = sum(s.nbytes() for s in columns.values())
+    print(f"  of which array payload: {raw / 2 ** 20:.1f} MiB")
+    rows, row_bytes, row_time = measure(lambda: build_rows(data))
+    print(f"row dicts:         {row_bytes / 2 ** 20:.1f} MiB "
+          f"({row_bytes / count:.1f} bytes/entry), built in {row_time:.2f}s")
+
+    users = random.Random(2).sample(range(USERS), 200)
+    compare_summaries(f"typical user ({count // USERS} entries)",
+                      [columns[u] for u in users], [rows[u] for u in users])
+    heavy = list(entries(count // 10, seed=3))
+    heavy = [(0, seconds, code) for _, seconds, code in heavy]
+    compare_summaries(f"heavy user ({len(heavy)} entries)",
+                      [build_columns(heavy)[0]], [build_rows(heavy)[0]])
+
+
+def compare_summaries(label, series, rows):
+    start = time.perf_counter()
+    from_rollups = [[summary_json(o, c) for o, c in s.daily.between(1, 1 << 31)]
+                    for s in series]
+    rollup_time = (time.perf_counter() - start) / len(series)
+    start = time.perf_counter()
+    from_rows = [rows_summary(r) for r in rows]
+    rows_time = (time.perf_counter() - start) / len(rows)
+    assert from_rollups == from_rows
+    print(f"daily summary for a {label}: "
+          f"rollups {rollup_time * 1e3:.2f}ms, scanning rows {rows_time * 1e3:.2f}ms")
+
+
+if __name__ == '__main__':
+    run_benchmark()
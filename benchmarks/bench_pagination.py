@@ -0,0 +1,100 @@
+# Deep pages of a long mood history: keyset cursor vs OFFSET
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+import sqlalchemy as sa
+from server.mood_store import MOODS, MoodStore
+
+HEAVY_USER = 1
+PAGE = 50
+
+
+def history(count, users, seed=1):
+    """count entries: a quarter from one heavy user, the rest spread over users"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        user = HEAVY_USER if i % 4 == 0 else rng.randrange(2, users)
+        yield {
+            "user_id": user,
+            "mood": rng.choice(MOODS),
+            "note": None,
+            # Several entries share each timestamp, so ties on id matter
+            "timestamp": start + timedelta(minutes=i // 3),
+        }
+
+
+def offset_page(conn, t, page):
+    query = (sa.select(t.c.id, t.c.timestamp, t.c.mood)
+             .where(t.c.user_id == HEAVY_USER)
+             .order_by(t.c.timestamp.desc(), t.c.id.desc())
+             .limit(PAGE).offset(page * PAGE))
+    return conn.execute(query).all()
+
+
+def keyset_page(conn, t, before):
+    query = (sa.select(t.c.id, t.c.timestamp, t.c.mood)
+             .where(t.c.user_id == HEAVY_USER)
+             .order_by(t.c.timestamp.desc(), t.c.id.desc())
+             .limit(PAGE))
+    if before is not None:
+        query = query.where(sa.tuple_(t.c.timestamp, t.c.id) < before)
+    return conn.execute(query).all()
+
+
+def best_of(function, *args, repeat=20):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run_benchmark(count=1000000, users=2000):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    try:
+        store = MoodStore(url)
+        t = store.table
+        rows = list(history(count, users))
+        with store.engine.begin() as conn:
+            for i in range(0, count, 50000):
+                conn.execute(t.insert(), rows[i:i + 50000])
+        heavy = count // 4
+        print(f"{count} entries; user {HEAVY_USER} has {heavy} ({heavy // PAGE} pages of {PAGE})")
+
+        # Reopen so the columns are loaded from the table
+        store.engine.dispose()
+        store = MoodStore(url)
+        with store.engine.connect() as conn:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM mood_entries WHERE user_id = 1 "
+                "AND (timestamp, id) < ('2024-06-01 00:00:00.000000', 5) "
+                "ORDER BY timestamp DESC, id DESC LIMIT 50").all()
+            print("keyset plan:", "; ".join(row[-1] for row in plan))
+            print(f"{'page':>6} {'OFFSET':>10} {'keyset SQL':>11} {'keyset cols':>12}")
+            for page in (0, 100, 1000, heavy // PAGE - 1):
+                expected, offset_time = best_of(offset_page, conn, t, page)
+                # The cursor for a page is the key of the last row of the page before it
+                before = None
+                if page:
+                    last = offset_page(conn, t, page - 1)[-1]
+                    before = (last.timestamp, last.id)
+                got, keyset_time = best_of(keyset_page, conn, t, before)
+                assert [row.id for row in got] == [row.id for row in expected]
+                entries, column_time = best_of(store.entries, HEAVY_USER, PAGE, before)
+                assert [entry["id"] for entry in entries] == [row.id for row in expected]
+                print(f"{page + 1:>6} {offset_time * 1e3:>8.2f}ms {keyset_time * 1e3:>9.2f}ms "
+                      f"{column_time * 1e3:>10.2f}ms")
+        store.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    run_benchmark()
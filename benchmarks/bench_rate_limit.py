@@ -0,0 +1,42 @@
+# Cost of a login rate-limit check: one lock vs sharded locks vs shared memory
+import os
+import threading
+import time
+from server.rate_limit import SharedTokenBucketLimiter, TokenBucketLimiter
+
+
+def run_threads(limiter, threads, hits):
+    def worker(n):
+        for i in range(hits):
+            limiter.hit(f"10.{n}.{i % 250}.{i % 7}")
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) / (threads * hits)
+
+
+def run_benchmark(hits=50000):
+    name = f"bench-rate-limit-{os.getpid()}"
+    shared = SharedTokenBucketLimiter(name, 30, 60)
+    limiters = {
+        "memory, 1 shard": TokenBucketLimiter(30, 60, shards=1),
+        "memory, 64 shards": TokenBucketLimiter(30, 60),
+        "shared memory": shared,
+    }
+    try:
+        print(f"{'backend':>18} {'1 thread':>10} {'8 threads':>10}")
+        for label, limiter in limiters.items():
+            single = run_threads(limiter, 1, hits)
+            many = run_threads(limiter, 8, hits // 8)
+            print(f"{label:>18} {single * 1e6:>8.2f}us {many * 1e6:>8.2f}us")
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,62 @@
+# Per-request overhead of the injection check at 1, 20 and 200 rules
+import re
+import time
+from urllib.parse import unquote_plus, urlsplit
+from server.scanner import DEFAULT_RULES, RequestScanner, ScanRule
+
+SQL_RULES = [
+    ScanRule("union_select", r"\bunion\s+(?:all\s+)?select\b"),
+    ScanRule("drop_table", r"\bdrop\s+table\b"),
+    ScanRule("tautology", r"\bor\s+1\s*=\s*1\b"),
+    ScanRule("sleep", r"\bsleep\s*\("),
+    ScanRule("stacked", r";\s*(?:update|delete|insert)\b"),
+]
+URLS = [
+    "http://localhost:5000/api/resources?q=exam%20stress&category=self-help",
+    "http://localhost:5000/api/appointments",
+    "http://localhost:5000/api/mood-entries?limit=20&cursor=eyJ0cyI6MTcwMDAwMDAwMH0",
+    "http://localhost:5000/static/assets/index-4f9a1c.js",
+]
+
+
+def make_rules(count):
+    rules = list(DEFAULT_RULES) + SQL_RULES
+    i = 0
+    while len(rules) < count:
+        rules.append(ScanRule(f"signature{i}", rf"\bsig{i}nature\w*"))
+        i += 1
+    return rules[:count]
+
+
+def old_check(pattern, url):
+    """The original hook: module-level re.search over the whole URL"""
+    return re.search(pattern, url, re.I)
+
+
+def per_request(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url in URLS:
+            func(url)
+    return (time.perf_counter() - start) / (rounds * len(URLS))
+
+
+def run_benchmark(rounds=500):
+    print(f"{'rules':>6} {'old full-URL search':>20} {'scanner':>10} {'speedup':>8}")
+    for count in (1, 20, 200):
+        rules = make_rules(count)
+        pattern = "|".join(f"({rule.pattern})" for rule in rules)
+        scanner = RequestScanner(rules)
+        parts = {url: urlsplit(url) for url in URLS}
+
+        def scan(url):
+            split = parts[url]
+            return scanner.scan(split.path, unquote_plus(split.query) if split.query else "")
+
+        old = per_request(lambda url: old_check(pattern, url), rounds)
+        new = per_request(scan, rounds)
+        print(f"{count:>6} {old * 1e6:>18.2f}us {new * 1e6:>8.2f}us {old / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    run_benchmark()
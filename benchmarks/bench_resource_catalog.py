@@ -0,0 +1,92 @@
+# Resource catalog responses: encoding per request vs cached payloads and 304s
+import time
+from flask import jsonify, request
+from benchmarks.resource_corpus import generate_resources
+from server import create_app
+from server.resources import SEED_RESOURCES, get_resource_store
+
+
+def per_request(client, url, rounds, headers=None, repeat=3):
+    """Best mean time per request over repeat runs, and the last response"""
+    response = client.get(url, headers=headers)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            client.get(url, headers=headers)
+        elapsed = (time.perf_counter() - start) / rounds
+        best = elapsed if best is None else min(best, elapsed)
+    return best, response
+
+
+def in_handler(app, url, rounds, headers=None, repeat=3):
+    """Best time for the view alone to build its response, without the test client"""
+    endpoint = 'uncached' if url.startswith('/bench/') else 'resources'
+    view = app.view_functions[endpoint]
+    best = None
+    with app.test_request_context(url, headers=headers):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                app.make_response(view())
+            elapsed = (time.perf_counter() - start) / rounds
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def make_app(resources):
+    app = create_app({'RESOURCES': resources})
+    app.logger.disabled = True
+
+    # What the catalog cost before: encode the listing on every request
+    @app.route('/bench/uncached')
+    def uncached():
+        return jsonify(get_resource_store(app).all(request.args.get('category') or None))
+
+    return app
+
+
+def run_benchmark(rounds=2000):
+    libraries = [
+        ("seed catalog", SEED_RESOURCES, ""),
+        ("300 articles", list(generate_resources(300)), ""),
+        ("300 articles, one category", list(generate_resources(300)), "?category=support"),
+    ]
+    for name, resources, query in libraries:
+        app = make_app(resources)
+        client = app.test_client()
+        url = f"/api/resources{query}"
+        etag = client.get(url).headers["ETag"]
+        cases = [
+            ("encoded per request", f"/bench/uncached{query}", None),
+            ("cached", url, None),
+            ("cached, gzip", url, {"Accept-Encoding": "gzip"}),
+            ("304 revalidation", url, {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+        ]
+        size = None
+        for case, case_url, headers in cases:
+            elapsed, response = per_request(client, case_url, rounds, headers)
+            handler = in_handler(app, case_url, rounds, headers)
+            if size is None:
+                size = len(response.data)
+                print(f"{name} ({size} bytes of JSON), handler / full request:")
+            print(f"  {case:<20} {handler * 1e6:8.1f}us {elapsed * 1e6:8.1f}us "
+                  f"{len(response.data):>8} bytes ({1 - len(response.data) / size:.0%} saved)")
+        assert response.status_code == 304
+
+    # A write rebuilds only the categories it touched
+    app = make_app(list(generate_resources(300)))
+    client = app.test_client()
+    store = get_resource_store(app)
+    etags = {category: client.get(f"/api/resources?category={category}").headers["ETag"]
+             for category in ("support", "finance")}
+    resource = next(r for r in store.all() if r["category"] == "support")
+    store.update(resource["id"], {"title": "Edited"})
+    changed = [category for category, etag in etags.items()
+               if client.get(f"/api/resources?category={category}",
+                             headers={"If-None-Match": etag}).status_code == 200]
+    print(f"after editing a support resource, changed ETags: {changed}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
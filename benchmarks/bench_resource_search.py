@@ -0,0 +1,100 @@
+# Resource search at 100k documents: BM25 inverted index vs a LIKE-style scan
+import random
+import statistics
+import time
+import sys
+from benchmarks.resource_corpus import TOPIC_WORDS, generate_resources
+from server.resource_search import SearchIndex
+from server.resources import ResourceStore
+
+QUERIES = 500
+
+
+def like_scan(resources, query):
+    """What LIKE '%word%' over title and content amounts to: read every document"""
+    words = query.lower().split()
+    return [r["id"] for r in resources
+            if all(w in r["title"].lower() or w in r["content"].lower() for w in words)]
+
+
+def index_size(index):
+    """Bytes held by the index's own structures (tracemalloc slows the build too much)"""
+    size = sys.getsizeof(index._postings) + sys.getsizeof(index._vocabulary)
+    for term, (docs, tfs) in index._postings.items():
+        size += sys.getsizeof(term) + sys.getsizeof(docs) + sys.getsizeof(tfs) + 56
+    for column in (index._ids, index._alive, index._lengths, index._categories):
+        size += sys.getsizeof(column)
+    return size + sys.getsizeof(index._doc_of) + 32 * len(index._doc_of)
+
+
+def make_queries(rng):
+    queries = []
+    for _ in range(QUERIES):
+        words = rng.sample(TOPIC_WORDS, rng.randint(1, 3))
+        if rng.random() < 0.3:
+            # Search-as-you-type: the last word is still being written
+            words[-1] = words[-1][:max(3, len(words[-1]) // 2)]
+        queries.append(" ".join(words))
+    return queries
+
+
+def percentiles(times):
+    times = sorted(times)
+    return (statistics.median(times) * 1e3, times[int(len(times) * 0.95)] * 1e3,
+            times[-1] * 1e3)
+
+
+def run_benchmark(count=100000):
+    start = time.perf_counter()
+    store = ResourceStore(generate_resources(count))
+    print(f"{count} resources generated in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index = SearchIndex(store.all())
+    build_time = time.perf_counter() - start
+    store.listeners.append(index)
+    size = index_size(index)
+    stats = index.stats()
+    print(f"index built in {build_time:.1f}s: {stats['terms']} terms, "
+          f"{stats['postings']} postings, ~{size / 2 ** 20:.0f} MiB")
+
+    queries = make_queries(random.Random(2))
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, 20)
+        times.append(time.perf_counter() - start)
+    print("search, top 20: median %.2fms, p95 %.2fms, max %.2fms" % percentiles(times))
+
+    times = []
+    for query in queries[:100]:
+        start = time.perf_counter()
+        index.search(query, 20, category="support")
+        times.append(time.perf_counter() - start)
+    print("search in one category: median %.2fms, p95 %.2fms, max %.2fms"
+          % percentiles(times))
+
+    resources = store.all()
+    start = time.perf_counter()
+    for query in queries[:10]:
+        like_scan(resources, query)
+    print(f"LIKE-style scan: {(time.perf_counter() - start) / 10 * 1e3:.0f}ms per query")
+
+    rng = random.Random(3)
+    start = time.perf_counter()
+    for resource_id in rng.sample(range(1, count + 1), 1000):
+        resource = store.get(resource_id)
+        store.update(resource_id, {"content": resource["content"] + " mindfulness"})
+    print(f"1000 edits: {(time.perf_counter() - start) / 1000 * 1e3:.2f}ms each, "
+          f"{index.stats()['dead']} dead documents awaiting compaction")
+    start = time.perf_counter()
+    with index._lock:
+        index._compact()
+    print(f"compaction: {(time.perf_counter() - start) * 1e3:.0f}ms")
+
+    top = index.search("mindfulness", 5)
+    assert len(top) == 5
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,91 @@
+# Request latency under an injection flood: logging inline vs the event queue
+import logging
+import os
+import tempfile
+import threading
+import time
+from server import create_app
+from server.security_events import LoggerSink
+
+THREADS = 8
+URL = "/api/resources?q=%27%20OR%201%3D1"
+
+
+class SlowHandler(logging.FileHandler):
+    """File handler with a fixed extra cost per record, like a remote log shipper"""
+
+    def __init__(self, path, delay):
+        super().__init__(path)
+        self.delay = delay
+
+    def emit(self, record):
+        super().emit(record)
+        self.flush()
+        if self.delay:
+            time.sleep(self.delay)
+
+
+def make_app(path, delay, inline):
+    app = create_app()
+    logger = logging.getLogger(f"bench-{inline}-{delay}")
+    logger.handlers[:] = [SlowHandler(path, delay)]
+    logger.propagate = False
+    events = app.extensions["security_events"]
+    events.sink = LoggerSink(logger)
+    if inline:
+        # What the hook used to do: write the record on the request thread
+        events.emit = lambda event, **fields: events.sink([dict(fields, event=event)])
+    return app, events
+
+
+def flood(app, requests_per_thread):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        local = []
+        for _ in range(requests_per_thread):
+            start = time.perf_counter()
+            client.get(URL)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return latencies, elapsed
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_benchmark(requests_per_thread=1000):
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    print(f"{THREADS} threads x {requests_per_thread} injection requests")
+    print(f"{'sink cost':>10} {'mode':>7} {'p50':>9} {'p99':>9} {'req/s':>8} {'dropped':>8}")
+    try:
+        for delay in (0, 0.0005):
+            for inline in (True, False):
+                app, events = make_app(path, delay, inline)
+                latencies, elapsed = flood(app, requests_per_thread)
+                if not inline:
+                    events.close(timeout=60)
+                mode = "inline" if inline else "queue"
+                print(f"{delay * 1e3:>8.1f}ms {mode:>7} {percentile(latencies, 50) * 1e6:>7.0f}us "
+                      f"{percentile(latencies, 99) * 1e6:>7.0f}us "
+                      f"{len(latencies) / elapsed:>8.0f} {events.stats()['dropped']:>8}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    run_benchmark()
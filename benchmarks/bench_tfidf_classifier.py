@@ -0,0 +1,51 @@
+import random
+import string
+import time
+from server.tfidf import TfidfIntentClassifier
+
+MESSAGES = [
+    "i'm so stressed out about my dissertation deadline",
+    "i keep having panic attacks before lectures",
+    "can't sleep at all this week",
+    "i feel really lonely since i moved here",
+]
+
+
+def make_documents(intents, seed=3):
+    """Random intents, each with a few multi-word example phrasings"""
+    rng = random.Random(seed)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+    documents = {f"intent{i}": [" ".join(word() for _ in range(3)) for _ in range(4)]
+                 for i in range(intents - 4)}
+    documents.update({
+        "stress": ["stress", "stressed", "deadline pressure"],
+        "anxiety": ["anxiety", "anxious", "panic attack"],
+        "sleep": ["insomnia", "can't sleep"],
+        "loneliness": ["lonely", "isolated", "no friends"],
+    })
+    return documents
+
+
+def run_benchmark(rounds=500):
+    print(f"{'intents':>8} {'features':>9} {'build (ms)':>11} {'score (us)':>11} {'top intent':>12}")
+    for intents in (100, 1000, 5000):
+        documents = make_documents(intents)
+        start = time.perf_counter()
+        classifier = TfidfIntentClassifier(documents)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for message in MESSAGES:
+                classifier.top_k(message, 3)
+        per_message = (time.perf_counter() - start) / (rounds * len(MESSAGES))
+        top = classifier.top_k(MESSAGES[0], 1)[0][0]
+        print(f"{intents:>8} {len(classifier.vocabulary):>9} {build * 1e3:>11.1f} "
+              f"{per_message * 1e6:>11.1f} {top:>12}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
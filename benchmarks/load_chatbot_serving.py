@@ -0,0 +1,93 @@
+# Compare the threaded dev server with the ASGI mode under many idle chats.
+#
+# Each idle chat is a TCP connection that has sent half a request and then
+# gone quiet, which is what a user reading a reply looks like to the server.
+import http.client
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+SERVERS = {
+    "threaded": "from app import app; app.run(port={port}, threaded=True)",
+    "asgi": "from server import create_asgi; from server.asgi import serve_asgi; serve_asgi(create_asgi(), port={port})",
+}
+LEVELS = (100, 1000, 3000)
+
+
+def proc_status(pid):
+    """Return (rss_kb, threads) for a process from /proc"""
+    fields = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            fields[key] = value.split()
+    return int(fields["VmRSS"][0]), int(fields["Threads"][0])
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def probe(port):
+    """Time one real chatbot request while the idle connections are open"""
+    start = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("POST", "/chatbot", json.dumps({"message": "stress"}),
+                     {"Content-Type": "application/json"})
+        status = conn.getresponse().status
+        conn.close()
+    except OSError as exc:
+        return f"failed ({exc.__class__.__name__})"
+    return f"{status} in {(time.perf_counter() - start) * 1e3:.1f}ms"
+
+
+def run_mode(mode, port):
+    server = subprocess.Popen([sys.executable, "-c", SERVERS[mode].format(port=port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    idle = []
+    try:
+        wait_for_port(port)
+        time.sleep(0.5)
+        rss, threads = proc_status(server.pid)
+        print(f"{mode:>9} {0:>6} {rss / 1024:>9.1f} {threads:>8}  {probe(port)}")
+        for level in LEVELS:
+            while len(idle) < level:
+                try:
+                    sock = socket.create_connection(("127.0.0.1", port), timeout=2)
+                    sock.sendall(b"POST /chatbot HTTP/1.1\r\nHost: localhost\r\n")
+                except OSError:
+                    break
+                idle.append(sock)
+            time.sleep(1)
+            rss, threads = proc_status(server.pid)
+            print(f"{mode:>9} {len(idle):>6} {rss / 1024:>9.1f} {threads:>8}  {probe(port)}")
+    finally:
+        for sock in idle:
+            sock.close()
+        server.terminate()
+        server.wait()
+
+
+def run_load_test():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 2 * max(LEVELS) + 256), hard))
+    os.environ.setdefault("CHATBOT_KEEPALIVE_SECONDS", "600")
+    print(f"{'mode':>9} {'idle':>6} {'RSS (MB)':>9} {'threads':>8}  probe")
+    for offset, mode in enumerate(SERVERS):
+        run_mode(mode, 5601 + offset)
+
+
+if __name__ == '__main__':
+    run_load_test()
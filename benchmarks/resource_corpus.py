@@ -0,0 +1,57 @@
+# Synthetic resource library for the search and catalog benchmarks
+#
+# Words are drawn from a Zipf distribution over a vocabulary of real
+# wellbeing terms followed by made-up words. A few terms are then very
+# common and most are rare, as in real articles, so query postings have
+# realistic lengths.
+import random
+
+CATEGORIES = ("self-help", "emergency", "online", "support", "wellbeing", "academic",
+              "finance", "housing")
+
+TOPIC_WORDS = """
+anxiety stress exam depression sleep mindfulness breathing meditation counseling therapy
+support group peer wellbeing wellness exercise yoga nutrition routine motivation focus
+procrastination deadline study revision lonely loneliness homesick friendship relationship
+grief loss panic attack worry overthinking mood tracking journal gratitude selfcare
+burnout fatigue energy resilience confidence esteem perfectionism pressure family finance
+money budget debt housing accommodation tenancy international student visa culture
+language disability accessibility adhd autism dyslexia neurodiversity crisis helpline
+emergency samaritans nightline gp doctor nhs referral appointment waiting list campus
+union society volunteering nature walk art music creative hobby screen time social media
+alcohol drugs substance gambling addiction eating disorder body image identity lgbtq
+harassment bullying discrimination safety consent boundaries assertiveness communication
+conflict anger frustration sadness hope recovery relapse medication side effects
+""".split()
+
+
+def make_vocabulary(size, seed=1):
+    rng = random.Random(seed)
+    words = list(dict.fromkeys(TOPIC_WORDS))
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def generate_resources(count, vocabulary_size=50000, seed=1):
+    """count resource dicts (title, category, content, url) with Zipf-distributed words"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, seed)
+    # Zipf weights: the word at rank r is drawn with probability proportional to 1/r
+    cumulative, total = [], 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    words = lambda k: rng.choices(vocabulary, cum_weights=cumulative, k=k)
+    for i in range(count):
+        yield {
+            "title": " ".join(words(rng.randint(3, 7))).capitalize(),
+            "category": rng.choice(CATEGORIES),
+            "content": " ".join(words(rng.randint(80, 300))),
+            "url": f"https://example.com/resources/{i}" if rng.random() < 0.6 else None,
+        }
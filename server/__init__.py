@@ -1,2 +1,41 @@
 # This file makes the server directory a proper Python package
 # It will be used to import server modules in our tests
+import os
+
+
+def create_app(config=None):
+    """Create the Flask app with the chatbot and API routes registered.
+
+    Subsystems are only imported when their routes are first hit, so creating
+    the app stays cheap for workers and tests.
+    """
+    from flask import Flask
+    from server.chatbot import registerChatbotRoutes
+    from server.json_provider import FastJSONProvider
+    from server.routes import registerRoutes
+
+    app = Flask(__name__)
+    app.config.update({
+        'CHATBOT_CATALOG': os.environ.get('CHATBOT_CATALOG'),
+        'JSON_PROVIDER': FastJSONProvider,
+    })
+    if config:
+        app.config.update(config)
+    app.json = app.config['JSON_PROVIDER'](app)
+
+    registerChatbotRoutes(app)
+    registerRoutes(app)
+    return app
+
+
+def create_asgi(config=None):
+    """Create the asyncio (ASGI) app serving the chatbot routes.
+
+    Usable as a uvicorn factory: uvicorn --factory server:create_asgi
+    """
+    from server.asgi import create_asgi_app
+    from server.chatbot import build_chatbot
+
+    app_config = {'CHATBOT_CATALOG': os.environ.get('CHATBOT_CATALOG')}
+    app_config.update(config or {})
+    return create_asgi_app(build_chatbot(app_config))
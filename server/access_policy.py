@@ -0,0 +1,117 @@
+# Central access policy: which paths are open, need a login (or a staff
+# login), or are denied
+#
+# Policies are keyed by path prefix, matched on whole segments, so "/admin"
+# covers "/admin" and "/admin/users" but not "/administrator". At startup
+# they are compiled into a trie with one node per segment; a lookup walks
+# the request path once and the deepest policy on the way wins.
+import threading
+
+ALLOW = "allow"
+DENY = "deny"
+REQUIRE_AUTH = "require_auth"
+REQUIRE_STAFF = "require_staff"
+DECISIONS = (ALLOW, DENY, REQUIRE_AUTH, REQUIRE_STAFF)
+
+
+class Policy:
+    """A decision for every path under prefix, optionally only for some methods"""
+
+    __slots__ = ("name", "prefix", "decision", "methods")
+
+    def __init__(self, name, prefix, decision, methods=None):
+        if decision not in DECISIONS:
+            raise ValueError(f"unknown decision {decision!r} for policy {name!r}")
+        self.name = name
+        self.prefix = prefix
+        self.decision = decision
+        self.methods = tuple(m.upper() for m in methods) if methods else None
+
+    def __repr__(self):
+        return f"Policy({self.name!r}, {self.prefix!r}, {self.decision!r})"
+
+
+DEFAULT_POLICIES = (
+    Policy("admin", "/admin", DENY),
+    Policy("api_admin", "/api/admin", DENY),
+    Policy("user_data", "/api/user-data", DENY),
+    Policy("internal", "/api/internal", DENY),
+    Policy("appointments", "/api/appointments", REQUIRE_AUTH),
+    Policy("availability", "/api/availability", REQUIRE_AUTH),
+    Policy("mood_entries", "/api/mood-entries", REQUIRE_AUTH),
+    Policy("mood_cohort", "/api/mood-entries/analytics/cohort", REQUIRE_STAFF),
+    Policy("user", "/api/user", REQUIRE_AUTH),
+)
+
+
+def _segments(path):
+    return [segment for segment in path.split("/") if segment]
+
+
+class _Node:
+    __slots__ = ("children", "rules")
+
+    def __init__(self):
+        self.children = {}
+        # method -> policy, with None for policies that cover every method
+        self.rules = None
+
+
+class PolicyTable:
+    """Prefix trie of policies with a decision counter per policy"""
+
+    def __init__(self, policies=DEFAULT_POLICIES):
+        self.policies = tuple(policies)
+        self._root = _Node()
+        for policy in self.policies:
+            node = self._root
+            for segment in _segments(policy.prefix):
+                node = node.children.setdefault(segment, _Node())
+            if node.rules is None:
+                node.rules = {}
+            for method in policy.methods or (None,):
+                if method in node.rules:
+                    raise ValueError(f"policies {node.rules[method].name!r} and "
+                                     f"{policy.name!r} overlap")
+                node.rules[method] = policy
+        self._lock = threading.Lock()
+        self.counts = {policy.name: 0 for policy in self.policies}
+        self.unmatched = 0
+
+    def lookup(self, method, path):
+        """Return the deepest policy covering method and path, or None"""
+        node, found = self._root, None
+        rules = node.rules
+        if rules:
+            found = rules.get(method) or rules.get(None)
+        for segment in path.split("/"):
+            if not segment:
+                continue
+            node = node.children.get(segment)
+            if node is None:
+                break
+            rules = node.rules
+            if rules:
+                found = rules.get(method) or rules.get(None) or found
+        return found
+
+    def decide(self, method, path):
+        """Look up a request and count the decision; returns the policy or None"""
+        policy = self.lookup(method, path)
+        with self._lock:
+            if policy is None:
+                self.unmatched += 1
+            else:
+                self.counts[policy.name] += 1
+        return policy
+
+    def stats(self):
+        with self._lock:
+            return {
+                "policies": len(self.policies),
+                "unmatched": self.unmatched,
+                "decisions": {
+                    policy.name: {"decision": policy.decision, "count": self.counts[policy.name]}
+                    for policy in self.policies
+                },
+            }
@@ -0,0 +1,297 @@
+# Appointment storage over SQLAlchemy, with in-memory interval indexes
+#
+# The database is the record; the indexes answer "is this slot free?" without
+# querying it. Each counselor and each user has a sorted list of their booked
+# intervals. Bookings for one key never overlap, so the list is sorted by
+# end time too, and a new interval only has to be compared with the booking
+# that starts just before it and the one that starts just after it. Both are
+# found with one bisect. The indexes are rebuilt from the table when the
+# store starts, and a booking updates them only after its insert commits.
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from server.appointments import DATE_FORMAT, parse_date
+from server.database import create_engine, create_tables, memory_url
+from server.lazy import get_extension
+
+DEFAULT_DURATION = 60
+USER_CONFLICT = "You already have an appointment at that time"
+COUNSELOR_CONFLICT = "The counselor is not available at that time"
+
+log = logging.getLogger(__name__)
+
+
+def to_seconds(date):
+    """Seconds since 0001-01-01 for a naive datetime; cheap to compare"""
+    return date.toordinal() * 86400 + date.hour * 3600 + date.minute * 60 + date.second
+
+
+def from_seconds(seconds):
+    """Inverse of to_seconds()"""
+    days, rest = divmod(seconds, 86400)
+    return datetime.fromordinal(days) + timedelta(seconds=rest)
+
+
+class IntervalIndex:
+    """Non-overlapping [start, end) intervals per key, sorted by start"""
+
+    def __init__(self):
+        self._starts = {}
+        self._ends = {}
+        self._ids = {}
+
+    def __len__(self):
+        return sum(len(starts) for starts in self._starts.values())
+
+    def conflict(self, key, start, end):
+        """Return the id of a booking overlapping [start, end), or None"""
+        starts = self._starts.get(key)
+        if not starts:
+            return None
+        i = bisect_right(starts, start)
+        if i and self._ends[key][i - 1] > start:
+            return self._ids[key][i - 1]
+        if i < len(starts) and starts[i] < end:
+            return self._ids[key][i]
+        return None
+
+    def add(self, key, start, end, appointment_id):
+        starts = self._starts.setdefault(key, [])
+        i = bisect_right(starts, start)
+        starts.insert(i, start)
+        self._ends.setdefault(key, []).insert(i, end)
+        self._ids.setdefault(key, []).insert(i, appointment_id)
+
+    def remove(self, key, start, appointment_id):
+        """Remove one interval; returns False if it is not indexed"""
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        ids = self._ids[key]
+        i = bisect_left(starts, start)
+        while i < len(starts) and starts[i] == start:
+            if ids[i] == appointment_id:
+                del starts[i], self._ends[key][i], ids[i]
+                return True
+            i += 1
+        return False
+
+    def between(self, key, start, end):
+        """Return (start, end, id) for the key's bookings overlapping [start, end)"""
+        starts = self._starts.get(key)
+        if not starts:
+            return []
+        ends, ids = self._ends[key], self._ids[key]
+        i = bisect_right(starts, start)
+        if i and ends[i - 1] > start:
+            i -= 1
+        result = []
+        while i < len(starts) and starts[i] < end:
+            result.append((starts[i], ends[i], ids[i]))
+            i += 1
+        return result
+
+    @classmethod
+    def build(cls, rows):
+        """Build from (key, start, end, id) rows in any order"""
+        index = cls()
+        grouped = {}
+        for key, start, end, appointment_id in rows:
+            grouped.setdefault(key, []).append((start, end, appointment_id))
+        for key, intervals in grouped.items():
+            intervals.sort()
+            index._starts[key] = [i[0] for i in intervals]
+            index._ends[key] = [i[1] for i in intervals]
+            index._ids[key] = [i[2] for i in intervals]
+        return index
+
+
+class AppointmentStore:
+    """Appointments table plus per-counselor and per-user interval indexes.
+
+    Objects in listeners are told about counselor bookings after they
+    commit, through appointment_booked(counselor_id, start, end) and
+    appointment_cancelled(counselor_id, start, end). Times are to_seconds()
+    values. The change is already committed by then, so a listener that
+    raises is logged and counted rather than failing the request.
+    """
+
+    def __init__(self, url="sqlite://"):
+        import sqlalchemy as sa
+
+        self._sa = sa
+        self.engine = create_engine(url)
+        metadata = sa.MetaData()
+        # Mirrors the appointments table in shared/schema.ts
+        self.table = sa.Table(
+            "appointments", metadata,
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.Integer, nullable=False),
+            sa.Column("counselor_id", sa.Integer, index=True),
+            sa.Column("date", sa.Text, nullable=False),
+            sa.Column("duration_minutes", sa.Integer, nullable=False, default=DEFAULT_DURATION),
+            sa.Column("type", sa.Text, nullable=False),
+            sa.Column("status", sa.Text, default="pending"),
+            sa.Column("notes", sa.Text),
+        )
+        # Serves listings and their keyset pages; see server/pagination.py
+        by_user = sa.Index("ix_appointments_user_date_id", self.table.c.user_id,
+                           self.table.c.date, self.table.c.id)
+        create_tables(self.engine, metadata, by_user)
+        self._lock = threading.Lock()
+        self.listeners = []
+        self.conflicts = 0
+        self.listener_errors = 0
+        self._load_indexes()
+
+    def _load_indexes(self):
+        t = self.table
+        query = self._sa.select(t.c.id, t.c.user_id, t.c.counselor_id, t.c.date,
+                                t.c.duration_minutes).where(t.c.status != "cancelled")
+        users, counselors = [], []
+        with self.engine.connect() as conn:
+            for row in conn.execute(query):
+                start = to_seconds(parse_date(row.date))
+                end = start + row.duration_minutes * 60
+                users.append((row.user_id, start, end, row.id))
+                if row.counselor_id is not None:
+                    counselors.append((row.counselor_id, start, end, row.id))
+        self.by_user = IntervalIndex.build(users)
+        self.by_counselor = IntervalIndex.build(counselors)
+
+    def _check(self, booking, start, end):
+        if self.by_user.conflict(booking["user_id"], start, end) is not None:
+            return USER_CONFLICT
+        counselor_id = booking.get("counselor_id")
+        if counselor_id is not None and \
+                self.by_counselor.conflict(counselor_id, start, end) is not None:
+            return COUNSELOR_CONFLICT
+        return None
+
+    def _index(self, booking, start, end, appointment_id):
+        self.by_user.add(booking["user_id"], start, end, appointment_id)
+        if booking.get("counselor_id") is not None:
+            self.by_counselor.add(booking["counselor_id"], start, end, appointment_id)
+
+    def book_many(self, bookings):
+        """Insert bookings that don't clash, in one transaction.
+
+        Each booking is a dict with user_id, date (a datetime), type and
+        optionally counselor_id, duration_minutes and notes. Bookings are
+        also checked against earlier ones in the same call. Returns one
+        (row dict, None) or (None, error) per booking.
+        """
+        results, accepted = [], []
+        with self._lock:
+            pending_user, pending_counselor = IntervalIndex(), IntervalIndex()
+            for booking in bookings:
+                duration = booking.get("duration_minutes") or DEFAULT_DURATION
+                start = to_seconds(booking["date"])
+                end = start + duration * 60
+                error = self._check(booking, start, end)
+                if error is None and \
+                        pending_user.conflict(booking["user_id"], start, end) is not None:
+                    error = USER_CONFLICT
+                counselor_id = booking.get("counselor_id")
+                if error is None and counselor_id is not None and \
+                        pending_counselor.conflict(counselor_id, start, end) is not None:
+                    error = COUNSELOR_CONFLICT
+                if error:
+                    self.conflicts += 1
+                    results.append((None, error))
+                    continue
+                # Not inserted yet, so the batch position stands in for the id
+                pending_user.add(booking["user_id"], start, end, len(accepted))
+                if counselor_id is not None:
+                    pending_counselor.add(counselor_id, start, end, len(accepted))
+                row = {
+                    "user_id": booking["user_id"],
+                    "counselor_id": counselor_id,
+                    "date": booking["date"].strftime(DATE_FORMAT),
+                    "duration_minutes": duration,
+                    "type": booking["type"],
+                    "status": "confirmed",
+                    "notes": booking.get("notes"),
+                }
+                accepted.append((row, start, end))
+                results.append((row, None))
+
+            if accepted:
+                with self.engine.begin() as conn:
+                    for row, _, _ in accepted:
+                        row["id"] = conn.execute(self.table.insert(), row).inserted_primary_key[0]
+                # Only committed rows reach the indexes
+                for row, start, end in accepted:
+                    self._index(row, start, end, row["id"])
+                    if row["counselor_id"] is not None:
+                        self._notify("appointment_booked", row["counselor_id"], start, end)
+        return results
+
+    def book(self, booking):
+        """Insert one booking; returns (row dict, None) or (None, error)"""
+        return self.book_many([booking])[0]
+
+    def cancel(self, appointment_id, user_id):
+        """Cancel one of user_id's appointments; returns the row, or None if not found"""
+        t = self.table
+        with self._lock:
+            with self.engine.begin() as conn:
+                row = conn.execute(self._sa.select(t).where(
+                    t.c.id == appointment_id, t.c.user_id == user_id,
+                    t.c.status != "cancelled")).first()
+                if row is None:
+                    return None
+                conn.execute(t.update().where(t.c.id == appointment_id).values(status="cancelled"))
+            row = dict(row._mapping, status="cancelled")
+            start = to_seconds(parse_date(row["date"]))
+            end = start + row["duration_minutes"] * 60
+            self.by_user.remove(user_id, start, appointment_id)
+            if row["counselor_id"] is not None:
+                self.by_counselor.remove(row["counselor_id"], start, appointment_id)
+                self._notify("appointment_cancelled", row["counselor_id"], start, end)
+        return row
+
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception:
+                self.listener_errors += 1
+                log.exception("appointment listener %r failed on %s", listener, event)
+
+    def counselor_bookings(self, counselor_id, start, end):
+        """(start, end, id) for the counselor's bookings overlapping [start, end)"""
+        return self.by_counselor.between(counselor_id, start, end)
+
+    def for_user(self, user_id, limit=None, after=None):
+        """The user's appointments by (date, id), after the (datetime, id) key if given"""
+        t = self.table
+        query = self._sa.select(t).where(t.c.user_id == user_id).order_by(t.c.date, t.c.id)
+        if after is not None:
+            date, appointment_id = after
+            query = query.where(self._sa.tuple_(t.c.date, t.c.id) >
+                                (date.strftime(DATE_FORMAT), appointment_id))
+        if limit is not None:
+            query = query.limit(limit)
+        with self.engine.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(query)]
+
+    def stats(self):
+        return {
+            "indexed": len(self.by_user),
+            "users": len(self.by_user._starts),
+            "counselors": len(self.by_counselor._starts),
+            "conflicts": self.conflicts,
+            "listener_errors": self.listener_errors,
+        }
+
+
+def get_appointment_store(app):
+    """Return the app's AppointmentStore, creating it on first use.
+
+    SQLAlchemy is only imported then, so apps that never touch appointments
+    don't pay for it at startup.
+    """
+    return get_extension(app, "appointments", lambda: AppointmentStore(
+        memory_url(app, "APPOINTMENTS_DATABASE_URL")))
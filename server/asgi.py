@@ -0,0 +1,165 @@
+# asyncio (ASGI) serving mode for the chatbot routes
+#
+# Each open connection is a coroutine instead of an OS thread, so thousands of
+# idle chats cost a few KB each rather than a thread stack. The routes keep the
+# same request and response contract as the Flask views. Calls into the bot run
+# in the loop's default thread pool: a batch of thousands of messages, or the
+# first paraphrase that builds the TF-IDF model and imports numpy, would
+# otherwise stall every other connection.
+import asyncio
+import json
+import os
+from urllib.parse import parse_qs
+from server.chatbot import validate_batch, validate_message
+from server.streaming import stream_reply
+
+MAX_BODY_SIZE = 1024 * 1024
+
+ROUTES = {
+    "/chatbot": ("POST",),
+    "/chatbot/batch": ("POST",),
+    "/chatbot/stream": ("GET", "POST"),
+}
+
+
+async def _read_body(receive, limit):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if len(body) > limit:
+            return None
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def _send_json(send, payload, status=200):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_stream(send, intent, chunks):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"x-chatbot-intent", (intent or "none").encode("utf-8")),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ],
+    })
+    for event in stream_reply(intent, chunks):
+        await send({"type": "http.response.body", "body": event, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _query_param(scope, name):
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(name)
+    return values[0] if values else ""
+
+
+def create_asgi_app(bot, max_body_size=MAX_BODY_SIZE, max_in_flight=1000):
+    """Build an ASGI application serving /chatbot, /chatbot/batch and /chatbot/stream.
+
+    max_in_flight bounds how many requests are being handled at once; idle
+    keep-alive connections do not count against it. Requests over the limit
+    get a 503 instead of queueing without bound.
+    """
+    in_flight = 0
+
+    async def call(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def handle(scope, receive, send):
+        path, method = scope["path"], scope["method"]
+        if method == "GET":
+            message, session_id = (_query_param(scope, "message"),
+                                   _query_param(scope, "session_id") or None)
+            error = validate_message(message, session_id)
+            if error:
+                return await _send_json(send, {"error": error}, 400)
+            intent, chunks = await call(bot.reply_stream, message, session_id)
+            return await _send_stream(send, intent, chunks)
+
+        body = await _read_body(receive, max_body_size)
+        if body is None:
+            return await _send_json(send, {"error": "Request body too large"}, 413)
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return await _send_json(send, {"error": "Invalid JSON"}, 400)
+        if not isinstance(data, dict):
+            return await _send_json(send, {"error": "Invalid JSON"}, 400)
+
+        if path == "/chatbot/batch":
+            messages = data.get("messages")
+            error = validate_batch(messages)
+            if error:
+                return await _send_json(send, {"error": error}, 400)
+            return await _send_json(send, {"responses": await call(bot.reply_batch, messages)})
+        message, session_id = data.get("message", ""), data.get("session_id")
+        error = validate_message(message, session_id)
+        if error:
+            return await _send_json(send, {"error": error}, 400)
+        if path == "/chatbot":
+            _, reply = await call(bot.reply, message, session_id)
+            return await _send_json(send, {"response": reply})
+        intent, chunks = await call(bot.reply_stream, message, session_id)
+        return await _send_stream(send, intent, chunks)
+
+    async def app(scope, receive, send):
+        nonlocal in_flight
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        allowed = ROUTES.get(scope["path"])
+        if allowed is None:
+            return await _send_json(send, {"message": "Not Found"}, 404)
+        if scope["method"] not in allowed:
+            return await _send_json(send, {"message": "Method Not Allowed"}, 405)
+        if in_flight >= max_in_flight:
+            return await _send_json(send, {"message": "Server busy, try again shortly"}, 503)
+
+        # Everything runs on the event loop thread, so a plain counter is safe
+        in_flight += 1
+        try:
+            await handle(scope, receive, send)
+        finally:
+            in_flight -= 1
+
+    return app
+
+
+def serve_asgi(asgi_app, host="127.0.0.1", port=5000):
+    """Run an ASGI app under uvicorn with bounded connections"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError("ASGI mode needs uvicorn: pip install uvicorn")
+    uvicorn.run(
+        asgi_app,
+        host=host,
+        port=port,
+        limit_concurrency=int(os.environ.get("CHATBOT_MAX_CONNECTIONS", 10000)),
+        timeout_keep_alive=int(os.environ.get("CHATBOT_KEEPALIVE_SECONDS", 75)),
+        log_level="warning",
+    )
@@ -0,0 +1,245 @@
+# Free-slot bitmaps for counselors, kept in step with the appointment store
+#
+# Each working day is cut into fixed slots (15 minutes by default) and each
+# counselor has one int per day with bit i set while slot i is free. A
+# session needing k slots fits wherever k consecutive bits are set, which is
+# k - 1 shift-and-ANDs on a single small int. For "any counselor" queries
+# each day also caches the OR of every counselor's run mask, so finding the
+# next free slot costs a few bit operations per day looked at, whatever the
+# number of bookings. Only days with bookings are stored: any other day is
+# computed when asked for and thrown away, so queries cannot grow the engine.
+# The engine covers today and the horizon_days after it: stored days are
+# dropped once they are in the past, bookings beyond the horizon are only
+# read from the store when their day comes into range, and only the slots a
+# booking or cancellation touches are updated.
+import threading
+from datetime import date, datetime
+from server.appointment_store import from_seconds, get_appointment_store, to_seconds
+from server.lazy import get_extension
+
+SLOT_MINUTES = 15
+OPEN_MINUTE = 9 * 60
+CLOSE_MINUTE = 17 * 60
+WORKDAYS = (0, 1, 2, 3, 4)
+HORIZON_DAYS = 90
+DEFAULT_COUNSELORS = (1, 2, 3)
+
+
+class AvailabilityEngine:
+    """Per-counselor, per-day free-slot bitmaps"""
+
+    def __init__(self, counselors, open_minute=OPEN_MINUTE, close_minute=CLOSE_MINUTE,
+                 slot_minutes=SLOT_MINUTES, workdays=WORKDAYS, horizon_days=HORIZON_DAYS,
+                 bookings=None, clock=date.today):
+        self.counselors = tuple(counselors)
+        self.open_minute = open_minute
+        self.slot_minutes = slot_minutes
+        self.slots = (close_minute - open_minute) // slot_minutes
+        self.workdays = frozenset(workdays)
+        self.horizon_days = horizon_days
+        self._full = (1 << self.slots) - 1
+        # bookings(counselor, start, end) lists (start, end, id) for a range;
+        # used to redraw a day after a cancellation and to load days as they
+        # come within the horizon
+        self._bookings = bookings
+        self._clock = clock
+        # ordinal -> {counselor: bitmap}, for days with bookings only
+        self._days = {}
+        # ordinal -> {k: run mask} for stored days; _free_runs is the same for
+        # a workday without bookings, which they all share
+        self._runs = {}
+        self._free_runs = {}
+        # First day covered, and the day after the last one
+        self._first = self._end = None
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    def _empty_day(self, ordinal):
+        if datetime.fromordinal(ordinal).weekday() in self.workdays:
+            return {counselor: self._full for counselor in self.counselors}
+        return {}
+
+    def _day(self, ordinal):
+        """The bitmaps of a day, without storing the day if it has none yet"""
+        day = self._days.get(ordinal)
+        return self._empty_day(ordinal) if day is None else day
+
+    def _stored_day(self, ordinal):
+        """The stored bitmaps of a day, creating them for a booking to change"""
+        day = self._days.get(ordinal)
+        if day is None:
+            day = self._days[ordinal] = self._empty_day(ordinal)
+        return day
+
+    def _window(self):
+        """(first ordinal, end ordinal) covered today; called with the lock held.
+
+        When the day changes, past days are dropped and bookings on the days
+        that came within the horizon are loaded from the store.
+        """
+        today = self._clock().toordinal()
+        if today != self._first:
+            previous_end = self._end
+            self._first, self._end = today, today + self.horizon_days
+            for ordinal in [o for o in self._days if o < today]:
+                del self._days[ordinal]
+                self._runs.pop(ordinal, None)
+            if previous_end is not None and self._bookings is not None:
+                start = max(previous_end, today) * 86400
+                for counselor in self.counselors:
+                    for s, e, _ in self._bookings(counselor, start, self._end * 86400):
+                        self._set_busy(counselor, s, e)
+        return self._first, self._end
+
+    def _slot_range(self, start, end, ordinal):
+        """Slots of day ordinal that [start, end) touches, clipped to the day"""
+        day_start = ordinal * 86400 + self.open_minute * 60
+        slot = self.slot_minutes * 60
+        first = max(0, (start - day_start) // slot)
+        last = min(self.slots, -(-(end - day_start) // slot))
+        return first, last
+
+    def _mask(self, first, last):
+        return ((1 << last) - 1) & ~((1 << first) - 1) if last > first else 0
+
+    def _set_busy(self, counselor, start, end):
+        first, last = self._window()
+        for ordinal in range(max(start // 86400, first), min((end - 1) // 86400 + 1, last)):
+            day = self._stored_day(ordinal)
+            if counselor in day:
+                day[counselor] &= ~self._mask(*self._slot_range(start, end, ordinal))
+                self._runs.pop(ordinal, None)
+
+    def appointment_booked(self, counselor, start, end):
+        with self._lock:
+            self._set_busy(counselor, start, end)
+            self.updates += 1
+
+    def appointment_cancelled(self, counselor, start, end):
+        # Neighbouring bookings that don't line up with slot edges can share a
+        # slot with this one, so redraw the day from its remaining bookings
+        with self._lock:
+            for ordinal in range(start // 86400, (end - 1) // 86400 + 1):
+                day = self._days.get(ordinal)
+                if day is None or counselor not in day:
+                    continue
+                day[counselor] = self._full
+                self._runs.pop(ordinal, None)
+                if self._bookings is not None:
+                    for s, e, _ in self._bookings(counselor, ordinal * 86400,
+                                                  (ordinal + 1) * 86400):
+                        self._set_busy(counselor, s, e)
+            self.updates += 1
+
+    def _slots_needed(self, duration_minutes):
+        return max(1, -(-duration_minutes // self.slot_minutes))
+
+    def _run_mask(self, bitmap, k):
+        """Bit i set when slots i .. i+k-1 are all free"""
+        mask = bitmap
+        for shift in range(1, k):
+            mask &= bitmap >> shift
+        return mask
+
+    def _any_runs(self, ordinal, k):
+        day = self._days.get(ordinal)
+        if day is None:
+            if datetime.fromordinal(ordinal).weekday() not in self.workdays:
+                return 0
+            runs = self._free_runs
+        else:
+            runs = self._runs.setdefault(ordinal, {})
+        mask = runs.get(k)
+        if mask is None:
+            mask = 0
+            for bitmap in self._day(ordinal).values():
+                mask |= self._run_mask(bitmap, k)
+            runs[k] = mask
+        return mask
+
+    def _start_seconds(self, ordinal, slot):
+        return ordinal * 86400 + (self.open_minute + slot * self.slot_minutes) * 60
+
+    def _from(self, mask, ordinal, after):
+        """Clear the bits of slots on day ordinal that start before after"""
+        slot = self.slot_minutes * 60
+        earliest = -(-(after - self._start_seconds(ordinal, 0)) // slot)
+        if earliest > 0:
+            mask &= ~((1 << min(earliest, self.slots)) - 1)
+        return mask
+
+    def next_available(self, duration_minutes, after, counselor=None):
+        """Earliest (counselor, start datetime) with room for the session, or None"""
+        k = self._slots_needed(duration_minutes)
+        after = to_seconds(after)
+        first_day = after // 86400
+        with self._lock:
+            first, last = self._window()
+            first_day = max(first_day, first)
+            for ordinal in range(first_day, min(first_day + self.horizon_days, last)):
+                if counselor is None:
+                    mask = self._any_runs(ordinal, k)
+                else:
+                    mask = self._run_mask(self._day(ordinal).get(counselor, 0), k)
+                if ordinal == first_day:
+                    mask = self._from(mask, ordinal, after)
+                if not mask:
+                    continue
+                slot = (mask & -mask).bit_length() - 1
+                if counselor is None:
+                    bit = 1 << slot
+                    counselor_found = next(c for c, bitmap in self._day(ordinal).items()
+                                           if self._run_mask(bitmap, k) & bit)
+                else:
+                    counselor_found = counselor
+                return counselor_found, from_seconds(self._start_seconds(ordinal, slot))
+        return None
+
+    def free_starts(self, duration_minutes, day, counselor, after=None):
+        """Start datetimes on day (a date) where the counselor has room for the session"""
+        k = self._slots_needed(duration_minutes)
+        ordinal = day.toordinal()
+        with self._lock:
+            first, last = self._window()
+            if not first <= ordinal < last:
+                return []
+            mask = self._run_mask(self._day(ordinal).get(counselor, 0), k)
+        if after is not None:
+            mask = self._from(mask, ordinal, to_seconds(after))
+        starts = []
+        while mask:
+            slot = (mask & -mask).bit_length() - 1
+            starts.append(from_seconds(self._start_seconds(ordinal, slot)))
+            mask &= mask - 1
+        return starts
+
+    def stats(self):
+        return {
+            "counselors": len(self.counselors),
+            "days": len(self._days),
+            "slot_minutes": self.slot_minutes,
+            "updates": self.updates,
+        }
+
+
+def get_availability(app):
+    """Return the app's AvailabilityEngine, built from the store on first use"""
+    def build():
+        store = get_appointment_store(app)
+        engine = AvailabilityEngine(
+            app.config.get("AVAILABILITY_COUNSELORS", DEFAULT_COUNSELORS),
+            open_minute=app.config.get("AVAILABILITY_OPEN_MINUTE", OPEN_MINUTE),
+            close_minute=app.config.get("AVAILABILITY_CLOSE_MINUTE", CLOSE_MINUTE),
+            bookings=store.counselor_bookings,
+        )
+        today = to_seconds(datetime.combine(date.today(), datetime.min.time()))
+        # Register before loading so no booking can fall between the two
+        with store._lock:
+            store.listeners.append(engine)
+            for counselor in engine.counselors:
+                for start, end, _ in store.by_counselor.between(counselor, today, 1 << 62):
+                    engine.appointment_booked(counselor, start, end)
+        engine.updates = 0
+        return engine
+
+    return get_extension(app, "availability", build)
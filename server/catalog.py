@@ -0,0 +1,208 @@
+# Response catalog for the chatbot, hot-reloadable from a JSON file
+#
+# Requests read catalog.snapshot once and use that object for the rest of the
+# request. A reload compiles a complete new snapshot off to the side and then
+# swaps it in with a single attribute assignment, which is atomic under the
+# GIL, so readers never take a lock and never see a half-built catalog.
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from server.intent_cache import normalize_message
+from server.intents import IntentMatcher
+from server.streaming import compile_reply_chunks
+from server.tfidf import TfidfIntentClassifier
+
+_classifier_lock = threading.Lock()
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog file cannot be parsed"""
+
+
+class CatalogSnapshot:
+    """Immutable compiled catalog: replies, keyword matcher and reply chunks"""
+
+    __slots__ = ("responses", "keywords", "examples", "matcher", "reply_chunks", "version",
+                 "_classifier")
+
+    def __init__(self, intents, version=0):
+        # intents maps intent -> (keywords, replies, examples)
+        self.responses = MappingProxyType({i: tuple(e[1]) for i, e in intents.items()})
+        self.keywords = MappingProxyType({i: tuple(e[0]) for i, e in intents.items()})
+        self.examples = MappingProxyType({i: tuple(e[2]) for i, e in intents.items()})
+        # Keywords get the same normalisation as incoming messages
+        self.matcher = IntentMatcher(
+            (normalize_message(keyword), intent)
+            for intent, keywords in self.keywords.items() for keyword in keywords
+        )
+        self.reply_chunks = MappingProxyType(compile_reply_chunks(self.responses))
+        self.version = version
+        self._classifier = None
+
+    @classmethod
+    def from_responses(cls, responses, version=0):
+        """Build a snapshot from the {keyword: [replies]} dict used by app.py"""
+        return cls({key: ((key,), replies, ()) for key, replies in responses.items()}, version)
+
+    @property
+    def classifier(self):
+        """TF-IDF classifier over intent names, keywords and examples.
+
+        Built on first use, since most messages are answered by the keyword
+        matcher and the model pulls in numpy.
+        """
+        if self._classifier is None:
+            with _classifier_lock:
+                if self._classifier is None:
+                    self._classifier = TfidfIntentClassifier({
+                        intent: (intent,) + self.keywords[intent] + self.examples[intent]
+                        for intent in self.responses
+                    })
+        return self._classifier
+
+
+def parse_catalog(data):
+    """Turn parsed catalog JSON into {intent: (keywords, replies, examples)}.
+
+    Each intent is either a list of replies, keyed by its own keyword, or an
+    object with "replies" and optional "keywords" and "examples". Keywords
+    are matched exactly; examples are paraphrases that only train the TF-IDF
+    fallback.
+    """
+    if not isinstance(data, dict):
+        raise CatalogError("catalog must be a JSON object")
+    intents = {}
+    for intent, entry in data.items():
+        if isinstance(entry, list):
+            keywords, replies, examples = [intent], entry, []
+        elif isinstance(entry, dict):
+            keywords, replies = entry.get("keywords", [intent]), entry.get("replies")
+            examples = entry.get("examples", [])
+        else:
+            raise CatalogError(f"intent {intent!r} must be a list or an object")
+        if not replies or not all(isinstance(r, str) for r in replies):
+            raise CatalogError(f"intent {intent!r} needs a non-empty list of replies")
+        if not all(isinstance(k, str) and k for k in keywords):
+            raise CatalogError(f"intent {intent!r} has an invalid keyword")
+        if not isinstance(examples, list) or not all(isinstance(e, str) for e in examples):
+            raise CatalogError(f"intent {intent!r} has invalid examples")
+        intents[intent] = (keywords, replies, examples)
+    return intents
+
+
+class Catalog:
+    """Holder for the current snapshot"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def swap(self, snapshot):
+        self.snapshot = snapshot
+
+    def stats(self):
+        return {"version": self.snapshot.version, "intents": len(self.snapshot.responses)}
+
+
+class FileCatalog(Catalog):
+    """Catalog loaded from a JSON file and reloaded when the file changes.
+
+    A file that fails to parse is reported in stats() and the previous
+    snapshot stays live.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_error = None
+        self.last_reload_seconds = None
+        self.last_swap_seconds = None
+        self._signature = None
+        self._version = 0
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        super().__init__(self._load(self._stat()))
+
+    def _stat(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, signature):
+        start = time.perf_counter()
+        with open(self.path, encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except ValueError as exc:
+                raise CatalogError(f"invalid JSON: {exc}")
+        snapshot = CatalogSnapshot(parse_catalog(data), self._version + 1)
+        self._version = snapshot.version
+        self.last_reload_seconds = time.perf_counter() - start
+        self._signature = signature
+        return snapshot
+
+    def reload(self):
+        """Load the file and swap the new snapshot in; returns True on success"""
+        with self._reload_lock:
+            try:
+                signature = self._stat()
+            except OSError as exc:
+                return self._reload_failed(exc)
+            try:
+                snapshot = self._load(signature)
+            except (OSError, CatalogError) as exc:
+                # Don't retry a broken file until it changes again
+                self._signature = signature
+                return self._reload_failed(exc)
+            # Hold the old snapshot until after timing so the swap figure
+            # doesn't include freeing it
+            previous = self.snapshot
+            start = time.perf_counter()
+            self.swap(snapshot)
+            self.last_swap_seconds = time.perf_counter() - start
+            del previous
+            self.reloads += 1
+            self.last_error = None
+            return True
+
+    def _reload_failed(self, exc):
+        self.reload_errors += 1
+        self.last_error = str(exc)
+        return False
+
+    def reload_if_changed(self):
+        try:
+            signature = self._stat()
+        except OSError as exc:
+            self.last_error = str(exc)
+            return False
+        if signature == self._signature:
+            return False
+        return self.reload()
+
+    def watch(self, interval=2.0):
+        """Poll the file from a daemon thread and reload it when it changes"""
+        if self._watcher is not None:
+            return self
+
+        def poll():
+            while True:
+                time.sleep(interval)
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=poll, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+        return self
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            "path": self.path,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "last_error": self.last_error,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_swap_seconds": self.last_swap_seconds,
+        })
+        return stats
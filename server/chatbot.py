@@ -0,0 +1,155 @@
+# Chatbot reply logic shared by the Flask views and the ASGI app
+import random
+import re
+from server.catalog import Catalog, CatalogSnapshot, FileCatalog
+from server.conversation import ConversationStore
+from server.intent_cache import IntentCache, normalize_message
+from server.lazy import add_lazy_rule
+from server.streaming import split_reply
+
+DEFAULT_RESPONSE = "I'm here to help. Please tell me more."
+MAX_BATCH_MESSAGES = 5000
+# Session ids are kept as ConversationStore keys, so their size is bounded too
+SESSION_ID = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+# Built-in catalog, used when CHATBOT_CATALOG doesn't point at a file
+DEFAULT_RESPONSES = {
+    "stress": ["Try deep breathing exercises!", "Consider talking to a counselor."],
+    "anxiety": ["Meditation can help reduce anxiety.", "Would you like some relaxation techniques?"]
+}
+
+
+def validate_batch(messages):
+    """Return an error message for a bad batch payload, or None if it is valid"""
+    if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+        return "messages must be a list of strings"
+    if len(messages) > MAX_BATCH_MESSAGES:
+        return f"At most {MAX_BATCH_MESSAGES} messages per batch"
+    return None
+
+
+def validate_message(message, session_id):
+    """Return an error message for a bad single-message payload, or None if it is valid"""
+    if not isinstance(message, str):
+        return "message must be a string"
+    if session_id is not None and (not isinstance(session_id, str)
+                                   or not SESSION_ID.fullmatch(session_id)):
+        return "session_id must be 1 to 128 letters, digits, '-' or '_'"
+    return None
+
+
+class Chatbot:
+    """Answers messages from the current snapshot of a response catalog.
+
+    catalog is a Catalog (or FileCatalog), or a plain {keyword: [replies]}
+    dict for a fixed catalog. Each call reads catalog.snapshot exactly once,
+    so a reload in the middle of a request can't mix two catalogs.
+    """
+
+    def __init__(self, catalog, sessions=None, fallback_threshold=0.32, cache=None):
+        if isinstance(catalog, dict):
+            catalog = Catalog(CatalogSnapshot.from_responses(catalog))
+        self.catalog = catalog
+        self.sessions = sessions
+        # Minimum TF-IDF cosine for a paraphrase to count; None disables it.
+        # Misspelt keywords in short messages score about 0.32-0.45, unrelated
+        # words that share a few n-grams ("street", "strong") stay near 0.3 or below
+        self.fallback_threshold = fallback_threshold
+        # Optional IntentCache keyed on the normalised message
+        self.cache = cache
+        self.default_chunks = split_reply(DEFAULT_RESPONSE)
+
+    def _fallback(self, snapshot, text):
+        if self.fallback_threshold is None:
+            return None
+        best = snapshot.classifier.top_k(text, 1)
+        if best and best[0][1] >= self.fallback_threshold:
+            return best[0][0]
+        return None
+
+    def _resolve(self, snapshot, text):
+        """Intent for an already normalised message, served from cache if possible"""
+        def compute(text):
+            intent = snapshot.matcher.best(text)
+            if intent is None:
+                intent = self._fallback(snapshot, text)
+            return intent
+
+        if self.cache is None:
+            return compute(text)
+        return self.cache.resolve(snapshot, text, compute)
+
+    def classify(self, message, snapshot=None):
+        """Return the intent for a message: keyword match first, then TF-IDF"""
+        snapshot = snapshot or self.catalog.snapshot
+        return self._resolve(snapshot, normalize_message(message))
+
+    def _choose(self, snapshot, intent, session_id):
+        """Pick the index of a reply, avoiding ones this session saw recently"""
+        replies = snapshot.responses[intent]
+        if session_id is None or self.sessions is None:
+            return random.randrange(len(replies))
+        state = self.sessions.get(session_id)
+        recent = state.recent_replies
+        candidates = [i for i, r in enumerate(replies) if r not in recent]
+        if not candidates:
+            # Everything was used recently; at least never repeat the last one
+            candidates = [i for i, r in enumerate(replies) if r != recent[-1]] or [0]
+        index = random.choice(candidates)
+        state.record(intent, replies[index])
+        return index
+
+    def reply(self, message, session_id=None):
+        """Return (intent, reply) for one message; intent is None on fallback"""
+        snapshot = self.catalog.snapshot
+        intent = self.classify(message, snapshot)
+        if intent is None:
+            return None, DEFAULT_RESPONSE
+        return intent, snapshot.responses[intent][self._choose(snapshot, intent, session_id)]
+
+    def reply_batch(self, messages):
+        """Return one {"intent", "response"} dict per message, in order"""
+        snapshot = self.catalog.snapshot
+        resolved = {}
+        results = []
+        for message in messages:
+            # Repeated messages in a batch are only resolved once
+            text = normalize_message(message)
+            if text not in resolved:
+                resolved[text] = self._resolve(snapshot, text)
+            intent = resolved[text]
+            if intent is not None:
+                reply = random.choice(snapshot.responses[intent])
+            else:
+                reply = DEFAULT_RESPONSE
+            results.append({"intent": intent, "response": reply})
+        return results
+
+    def reply_stream(self, message, session_id=None):
+        """Return (intent, chunks) where chunks is a shared pre-split reply"""
+        snapshot = self.catalog.snapshot
+        intent = self.classify(message, snapshot)
+        if intent is None:
+            return None, self.default_chunks
+        return intent, snapshot.reply_chunks[intent][self._choose(snapshot, intent, session_id)]
+
+
+def build_chatbot(config):
+    """Build the Chatbot described by an app config.
+
+    CHATBOT_CATALOG points at a JSON catalog that is reloaded when it changes;
+    otherwise CHATBOT_RESPONSES (default: DEFAULT_RESPONSES) is used as-is.
+    """
+    if config.get("CHATBOT_CATALOG"):
+        catalog = FileCatalog(config["CHATBOT_CATALOG"]).watch()
+    else:
+        catalog = dict(config.get("CHATBOT_RESPONSES") or DEFAULT_RESPONSES)
+    return Chatbot(catalog, sessions=ConversationStore(), cache=IntentCache())
+
+
+def registerChatbotRoutes(app):
+    add_lazy_rule(app, '/chatbot', 'server.chatbot_views.chatbot', methods=['POST'])
+    add_lazy_rule(app, '/chatbot/batch', 'server.chatbot_views.chatbot_batch', methods=['POST'])
+    add_lazy_rule(app, '/chatbot/stream', 'server.chatbot_views.chatbot_stream', methods=['GET', 'POST'])
+    add_lazy_rule(app, '/chatbot/stats', 'server.chatbot_views.chatbot_stats', methods=['GET'])
+    return app
@@ -0,0 +1,65 @@
+# Chatbot views; imported on the first chatbot request, see registerChatbotRoutes
+from flask import Response, current_app, jsonify, request
+from server.chatbot import DEFAULT_RESPONSE, build_chatbot, validate_batch, validate_message
+from server.json_provider import preserialized
+from server.lazy import get_extension
+from server.streaming import stream_reply
+
+DEFAULT_REPLY = preserialized({"response": DEFAULT_RESPONSE})
+INVALID_JSON = preserialized({"error": "Invalid JSON"}, 400)
+
+def get_chatbot(app=None):
+    """Return the app's Chatbot, building it from app.config on first use"""
+    app = app or current_app
+    return get_extension(app, "chatbot", lambda: build_chatbot(app.config))
+
+
+def chatbot():
+    data = request.json
+    if not isinstance(data, dict):
+        return INVALID_JSON
+    message, session_id = data.get("message", ""), data.get("session_id")
+    error = validate_message(message, session_id)
+    if error:
+        return jsonify({"error": error}), 400
+    intent, reply = get_chatbot().reply(message, session_id)
+    if intent is None:
+        return DEFAULT_REPLY
+    return jsonify({"response": reply})
+
+
+def chatbot_batch():
+    data = request.json
+    if not isinstance(data, dict):
+        return INVALID_JSON
+    messages = data.get("messages")
+    error = validate_batch(messages)
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify({"responses": get_chatbot().reply_batch(messages)})
+
+
+def chatbot_stream():
+    # GET lets browsers use EventSource, which cannot send a request body
+    data = request.args if request.method == 'GET' else request.json
+    if not isinstance(data, dict):
+        return INVALID_JSON
+    message, session_id = data.get("message", ""), data.get("session_id")
+    error = validate_message(message, session_id)
+    if error:
+        return jsonify({"error": error}), 400
+    intent, chunks = get_chatbot().reply_stream(message, session_id)
+    return Response(stream_reply(intent, chunks), mimetype="text/event-stream", headers={
+        "X-Chatbot-Intent": intent or "none",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+def chatbot_stats():
+    bot = get_chatbot()
+    return jsonify({
+        "sessions": bot.sessions.stats(),
+        "catalog": bot.catalog.stats(),
+        "intent_cache": bot.cache.stats(),
+    })
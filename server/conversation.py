@@ -0,0 +1,90 @@
+# Per-session conversation state for the chatbot
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionState:
+    """What the bot remembers about one conversation"""
+
+    __slots__ = ("history", "recent_intents", "recent_replies", "expires_at")
+
+    def __init__(self, history, expires_at):
+        # Short tuples are several times smaller than bounded deques, which
+        # matters at 100k sessions. Replies are references into the shared
+        # catalog, not copies.
+        self.history = history
+        self.recent_intents = ()
+        self.recent_replies = ()
+        self.expires_at = expires_at
+
+    def record(self, intent, reply):
+        self.recent_intents = (self.recent_intents + (intent,))[-self.history:]
+        self.recent_replies = (self.recent_replies + (reply,))[-self.history:]
+
+
+class ConversationStore:
+    """Bounded LRU of SessionState with TTL expiry.
+
+    At most max_sessions states are kept and each state holds at most history
+    intents and replies, so memory has a hard ceiling however many users chat.
+    Lookups, inserts and evictions are all O(1).
+    """
+
+    def __init__(self, max_sessions=100000, ttl=1800, history=5, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.history = history
+        self._clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id):
+        """Return the state for session_id, creating it if needed"""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            state = self._sessions.get(session_id)
+            if state is not None:
+                self.hits += 1
+                self._sessions.move_to_end(session_id)
+            else:
+                self.misses += 1
+                if len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+                state = SessionState(self.history, now + self.ttl)
+                self._sessions[session_id] = state
+            state.expires_at = now + self.ttl
+            return state
+
+    def _expire(self, now):
+        # Every access pushes expires_at to now + ttl and moves the session to
+        # the end, so expired sessions are always at the front.
+        sessions = self._sessions
+        while sessions:
+            session_id, state = next(iter(sessions.items()))
+            if state.expires_at > now:
+                break
+            del sessions[session_id]
+            self.expirations += 1
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        return {
+            "sessions": len(self._sessions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
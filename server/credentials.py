@@ -0,0 +1,169 @@
+# Password hashing and verification, run off the request thread
+#
+# Hashing is deliberately slow and holds the GIL for its whole run, so doing
+# it in a request thread stalls every other request in the process. The
+# service sends the work to a small process pool instead. Callers still wait
+# for their own result, but other requests keep running meanwhile.
+import secrets
+import threading
+import time
+from concurrent.futures import BrokenExecutor, TimeoutError as JobTimeout
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+
+class CredentialServiceBusy(Exception):
+    """Raised when a hashing job cannot be run or finished in time right now"""
+
+
+def hash_method(password_hash):
+    """Return the method prefix of a werkzeug hash, e.g. "scrypt:32768:8:1" """
+    return password_hash.split("$", 1)[0]
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method)
+
+
+def _verify(password_hash, password, method):
+    # Rehash in the same job so a successful login upgrades the stored hash
+    # without a second round trip to the pool
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if hash_method(password_hash) != method:
+        return True, generate_password_hash(password, method)
+    return True, None
+
+
+class CredentialService:
+    """Bounded process pool for hashing and checking passwords.
+
+    method is a full werkzeug method string including its cost parameters,
+    since stored hashes are compared against it to decide whether to rehash.
+    At most max_pending jobs are queued or running; beyond that calls raise
+    CredentialServiceBusy instead of queueing without limit. A job that
+    outlives timeout, or whose worker died, also raises it; the job keeps
+    its place in the count until it really ends, and a broken pool is
+    replaced on the next call. workers=0 runs jobs in the calling thread.
+    """
+
+    def __init__(self, workers=2, max_pending=64, method=DEFAULT_METHOD, timeout=10.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.method = method
+        self.timeout = timeout
+        self._pool = None
+        self._dummy_hash = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.max_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.job_seconds = 0.0
+
+    def _executor(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    # spawn, so workers don't inherit the server's threads and locks
+                    self._pool = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _discard(self, pool):
+        """Drop a pool whose worker died, so the next job starts a fresh one"""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self.restarts += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, start):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self.job_seconds += time.perf_counter() - start
+
+    def _run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise CredentialServiceBusy("too many pending jobs")
+            self.pending += 1
+            self.max_depth = max(self.max_depth, self.pending)
+        start = time.perf_counter()
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                self._finished(start)
+
+        pool = self._executor()
+        try:
+            future = pool.submit(func, *args)
+        except BrokenExecutor:
+            self._finished(start)
+            self._discard(pool)
+            raise CredentialServiceBusy("worker pool broken")
+        # Released when the job ends, not when the caller stops waiting for it
+        future.add_done_callback(lambda _: self._finished(start))
+        try:
+            return future.result(self.timeout)
+        except JobTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise CredentialServiceBusy("job timed out")
+        except BrokenExecutor:
+            self._discard(pool)
+            raise CredentialServiceBusy("worker pool broken")
+
+    def hash_password(self, password):
+        return self._run(_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check password; returns (ok, new hash if the stored one is outdated)"""
+        ok, new_hash = self._run(_verify, password_hash, password, self.method)
+        if new_hash is not None:
+            with self._lock:
+                self.rehashed += 1
+        return ok, new_hash
+
+    def dummy_hash(self):
+        """Hash of a random password at the configured method.
+
+        Logins for unknown usernames are checked against it, so they take
+        as long as real ones and response times don't reveal who has an
+        account.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = self.hash_password(secrets.token_urlsafe(16))
+        return self._dummy_hash
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "method": self.method,
+                "pending": self.pending,
+                "max_depth": self.max_depth,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+                "avg_job_ms": self.job_seconds / self.completed * 1e3 if self.completed else 0.0,
+            }
@@ -0,0 +1,38 @@
+# SQLAlchemy engines and tables for the stores that keep their records in a database
+MEMORY_URLS = ("sqlite://", "sqlite:///:memory:")
+# Largest value an INTEGER column holds; bigger Python ints overflow in the driver
+MAX_ID = 2 ** 63 - 1
+
+
+def create_engine(url):
+    """Engine for url; imports SQLAlchemy only when a store is first built"""
+    import sqlalchemy as sa
+    from sqlalchemy.pool import StaticPool
+
+    if url in MEMORY_URLS:
+        # One shared connection, or each thread would get its own empty database
+        return sa.create_engine(url, poolclass=StaticPool,
+                                connect_args={"check_same_thread": False})
+    return sa.create_engine(url)
+
+
+def create_tables(engine, metadata, *indexes):
+    """Create metadata's tables, then indexes added to a table after it was first created"""
+    metadata.create_all(engine)
+    # create_all skips tables that already exist, indexes included
+    for index in indexes:
+        index.create(engine, checkfirst=True)
+
+
+def memory_url(app, key):
+    """app.config[key] (default in-memory SQLite); raises ValueError for anything else.
+
+    Stored rows are keyed on UserStore ids, and UserStore is in memory: ids
+    start from 1 again after a restart, so a file-backed store would show
+    one user's rows to whoever registers next under the same id.
+    """
+    url = app.config.get(key, "sqlite://")
+    if url not in MEMORY_URLS:
+        raise ValueError(f"{key} must be an in-memory database until user accounts "
+                         "are persisted alongside it")
+    return url
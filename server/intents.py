@@ -0,0 +1,100 @@
+# Keyword-based intent matching for the chatbot
+from collections import deque
+
+
+class IntentMatcher:
+    """Aho-Corasick automaton over the chatbot's intent keywords.
+
+    The automaton is compiled once from (phrase, intent) pairs and then finds
+    every phrase occurring in a message in a single pass over its characters,
+    no matter how many phrases the catalog holds.
+    """
+
+    def __init__(self, phrases):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._intents = []
+        priority = {}
+
+        for phrase, intent in phrases:
+            phrase = phrase.lower()
+            if not phrase:
+                continue
+            if intent not in priority:
+                priority[intent] = len(self._intents)
+                self._intents.append(intent)
+            state = 0
+            for ch in phrase:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            if priority[intent] not in self._out[state]:
+                self._out[state] += (priority[intent],)
+
+        self._build_failure_links()
+
+    @classmethod
+    def from_responses(cls, responses):
+        """Build a matcher where every key of a responses dict is its own intent"""
+        return cls((key, key) for key in responses)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] += self._out[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self._intents)
+
+    def match(self, text):
+        """Return every intent found in text, best first.
+
+        Intents are ranked by how many of their phrases occur in the message;
+        ties keep catalog order, so a single hit behaves like the old
+        first-key-wins loop. text is expected to be lower-cased already.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = {}
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                hits[index] = hits.get(index, 0) + 1
+        ranked = sorted(hits, key=lambda index: (-hits[index], index))
+        return [self._intents[index] for index in ranked]
+
+    def best(self, text, default=None):
+        """Return the top ranked intent for text, or default if none match"""
+        ranked = self.match(text)
+        return ranked[0] if ranked else default
+
+    def best_many(self, texts, default=None):
+        """Return the top intent for each text, in order.
+
+        Repeated messages are only scanned once, which is the common case when
+        replaying logs of short messages.
+        """
+        seen = {}
+        results = []
+        for text in texts:
+            if text not in seen:
+                seen[text] = self.best(text, default)
+            results.append(seen[text])
+        return results
@@ -0,0 +1,47 @@
+# Lazily loaded views, after the "Lazily Loading Views" pattern in the Flask docs,
+# and components built on first use
+import threading
+from werkzeug.utils import cached_property, import_string
+
+# Reentrant, since building one component may build the ones it depends on
+_build_lock = threading.RLock()
+
+
+class LazyView:
+    """View that imports its real function on the first request it serves.
+
+    Registering a route with LazyView("server.some_views.view") keeps the
+    module, and everything it imports, out of application startup.
+    """
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit(".", 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def add_lazy_rule(app, rule, import_name, **options):
+    """Register rule on app, importing the view only when the route is first hit"""
+    app.add_url_rule(rule, endpoint=import_name.rsplit(".", 1)[1],
+                     view_func=LazyView(import_name), **options)
+
+
+def get_extension(app, name, build):
+    """Return app.extensions[name], storing build() there on first use.
+
+    build runs at most once per app; requests that arrive while it runs
+    wait for it rather than building a second copy.
+    """
+    component = app.extensions.get(name)
+    if component is None:
+        with _build_lock:
+            component = app.extensions.get(name)
+            if component is None:
+                component = app.extensions[name] = build()
+    return component
@@ -0,0 +1,181 @@
+# Vectorised mood trends over the moodEntries columns
+#
+# Entries are first reduced to a users x days matrix of daily mean scores
+# (1 for awful up to 5 for great, NaN on days without an entry) with two
+# bincounts. Every statistic after that is whole-array arithmetic on the
+# matrix, so one student and the whole university take the same code path:
+# rolling means are differences of cumulative sums, slopes are closed-form
+# least squares, and low streaks and threshold crossings come from the edges
+# of boolean masks.
+from datetime import date
+import numpy as np
+
+# A daily score at or below this is a "down" or "awful" day
+LOW_SCORE = 2.0
+DEFAULT_DAYS = 90
+DEFAULT_WINDOW = 7
+# Cohort figures covering fewer users than this are withheld
+MIN_COHORT_USERS = 5
+
+
+def load_columns(snapshot):
+    """(user ids, row per entry, day ordinal per entry, score per entry) arrays.
+
+    snapshot is MoodStore.snapshot() output: (user id, times, moods) per
+    user, with times and moods as array.array columns.
+    """
+    user_ids = np.fromiter((user_id for user_id, _, _ in snapshot), dtype=np.int64,
+                           count=len(snapshot))
+    lengths = np.fromiter((len(times) for _, times, _ in snapshot), dtype=np.int64,
+                          count=len(snapshot))
+    if not snapshot:
+        empty = np.empty(0, dtype=np.int64)
+        return user_ids, empty, empty, empty
+    seconds = np.concatenate([np.frombuffer(times, dtype=np.int64) for _, times, _ in snapshot])
+    codes = np.concatenate([np.frombuffer(moods, dtype=np.int8) for _, _, moods in snapshot])
+    rows = np.repeat(np.arange(len(snapshot)), lengths)
+    return user_ids, rows, seconds // 86400, codes.astype(np.int64) + 1
+
+
+def daily_scores(rows, days, scores, users, first_day, num_days):
+    """users x num_days float32 matrix of mean score per day, NaN where there is none"""
+    offset = days - first_day
+    keep = (offset >= 0) & (offset < num_days)
+    cells = rows[keep] * num_days + offset[keep]
+    size = users * num_days
+    counts = np.bincount(cells, minlength=size)
+    totals = np.bincount(cells, weights=scores[keep], minlength=size)
+    with np.errstate(invalid="ignore"):
+        return (totals / counts).astype(np.float32).reshape(users, num_days)
+
+
+def rolling_mean(matrix, window):
+    """Mean of the days present in each trailing window (shorter at the start)"""
+    present = ~np.isnan(matrix)
+    sums = np.cumsum(np.where(present, matrix, 0), axis=1, dtype=np.float64)
+    counts = np.cumsum(present, axis=1, dtype=np.int32)
+    # Window totals: the running total minus the running total window days back
+    sums[:, window:] -= sums[:, :-window].copy()
+    counts[:, window:] -= counts[:, :-window].copy()
+    with np.errstate(invalid="ignore"):
+        return (sums / counts).astype(np.float32)
+
+
+def trend_slopes(matrix):
+    """Least-squares slope, in score per day, of each row's present days; NaN under two"""
+    present = (~np.isnan(matrix)).astype(np.float64)
+    y = np.where(present > 0, matrix, 0).astype(np.float64)
+    x = np.arange(matrix.shape[1], dtype=np.float64)
+    n = present.sum(axis=1)
+    sx, sxx = present @ x, present @ (x * x)
+    sy, sxy = y.sum(axis=1), y @ x
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * sxy - sx * sy) / denominator
+    slope[denominator == 0] = np.nan
+    return slope
+
+
+def low_streaks(matrix, threshold=LOW_SCORE):
+    """(current, longest) runs of consecutive days at or below threshold, per row.
+
+    A day without an entry ends a streak. Each row is padded with a zero on
+    both sides, so runs in the flattened mask never join across rows.
+    """
+    users, num_days = matrix.shape
+    padded = np.zeros((users, num_days + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix <= threshold
+    edges = np.diff(padded.ravel())
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    row = starts // (num_days + 2)
+    longest = np.zeros(users, dtype=np.int64)
+    np.maximum.at(longest, row, lengths)
+    current = np.zeros(users, dtype=np.int64)
+    ongoing = ends % (num_days + 2) == num_days
+    current[row[ongoing]] = lengths[ongoing]
+    return current, longest
+
+
+def crossings_below(matrix, threshold=LOW_SCORE):
+    """Boolean matrix, True on days a series drops from above threshold to at or below it"""
+    crossed = np.zeros(matrix.shape, dtype=bool)
+    crossed[:, 1:] = (matrix[:, 1:] <= threshold) & (matrix[:, :-1] > threshold)
+    return crossed
+
+
+def cohort_daily(matrix, min_users=1):
+    """Mean of the users' daily scores for each day, over users with an entry.
+
+    Days with entries from fewer than min_users users are NaN.
+    """
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=0)
+    with np.errstate(invalid="ignore"):
+        means = np.where(present, matrix, 0).sum(axis=0, dtype=np.float64) / counts
+    means[counts < min_users] = np.nan
+    return means.astype(np.float32)[np.newaxis, :]
+
+
+def as_list(values):
+    """JSON-friendly list, with NaN as None"""
+    rounded = np.round(values.astype(np.float64), 3)
+    return [None if value != value else value for value in rounded.tolist()]
+
+
+def as_number(value):
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def user_trends(snapshot, first_day, num_days, window=DEFAULT_WINDOW, threshold=LOW_SCORE):
+    """Trends for the single user in snapshot (which may be empty)"""
+    _, rows, days, scores = load_columns(snapshot)
+    matrix = daily_scores(rows, days, scores, 1, first_day, num_days)
+    rolling = rolling_mean(matrix, window)
+    current, longest = low_streaks(matrix, threshold)
+    crossed = np.flatnonzero(crossings_below(rolling, threshold)[0])
+    return {
+        "daily": as_list(matrix[0]),
+        "rolling": as_list(rolling[0]),
+        "slope": as_number(trend_slopes(matrix)[0]),
+        "lowStreak": {"current": int(current[0]), "longest": int(longest[0])},
+        "crossings": [date.fromordinal(first_day + int(day)).isoformat() for day in crossed],
+    }
+
+
+def cohort_trends(snapshot, first_day, num_days, window=DEFAULT_WINDOW,
+                  threshold=LOW_SCORE, streak=3, min_users=MIN_COHORT_USERS):
+    """Aggregate trends across every user in snapshot.
+
+    Per-user results are computed for all users at once but only reported as
+    counts and means. A small group's mean can still give a member away (with
+    two users, the mean and your own score are the other's score), so days
+    with fewer than min_users users are reported as None, and the counts are
+    None when the whole cohort is smaller than that.
+    """
+    user_ids, rows, days, scores = load_columns(snapshot)
+    matrix = daily_scores(rows, days, scores, len(user_ids), first_day, num_days)
+    active = ~np.isnan(matrix).all(axis=1)
+    matrix = matrix[active]
+    cohort = cohort_daily(matrix, min_users)
+    trends = {
+        "daily": as_list(cohort[0]),
+        "rolling": as_list(rolling_mean(cohort, window)[0]),
+        "slope": as_number(trend_slopes(cohort)[0]),
+    }
+    if matrix.shape[0] < min_users:
+        return dict(trends, users=None, usersInLowStreak=None, usersCrossedBelow=None,
+                    usersImproving=None, usersDeclining=None)
+    rolling = rolling_mean(matrix, window)
+    current, _ = low_streaks(matrix, threshold)
+    recent = crossings_below(rolling, threshold)[:, -window:].any(axis=1)
+    slopes = trend_slopes(matrix)
+    return dict(
+        trends,
+        users=int(matrix.shape[0]),
+        usersInLowStreak=int((current >= streak).sum()),
+        usersCrossedBelow=int(recent.sum()),
+        usersImproving=int((slopes > 0).sum()),
+        usersDeclining=int((slopes < 0).sum()),
+    )
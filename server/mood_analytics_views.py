@@ -0,0 +1,72 @@
+# Mood analytics views; imported on the first analytics request so numpy
+# stays out of startup, see registerRoutes
+import threading
+from datetime import date
+from flask import current_app, g, jsonify, request
+from server import mood_analytics as analytics
+from server.mood_store import get_mood_store
+
+MAX_DAYS = 366
+MAX_STREAK = 30
+
+_cohort_lock = threading.Lock()
+
+
+def int_arg(name, default, low, high):
+    """Integer query argument within [low, high], or None if it is invalid"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    if not value.isdecimal() or not low <= int(value) <= high:
+        return None
+    return int(value)
+
+
+def analytics_query():
+    """(first day ordinal, days, window) from the query string, or None if invalid"""
+    days = int_arg("days", analytics.DEFAULT_DAYS, 1, MAX_DAYS)
+    if days is None:
+        return None
+    window = int_arg("window", min(analytics.DEFAULT_WINDOW, days), 1, days)
+    if window is None:
+        return None
+    return date.today().toordinal() - days + 1, days, window
+
+
+def period_json(first_day, days, window):
+    return {
+        "from": date.fromordinal(first_day).isoformat(),
+        "to": date.fromordinal(first_day + days - 1).isoformat(),
+        "window": window,
+    }
+
+
+def invalid_query():
+    return jsonify({"error": f"days must be 1-{MAX_DAYS} and window 1-days"}), 400
+
+
+def mood_analytics():
+    query = analytics_query()
+    if query is None:
+        return invalid_query()
+    snapshot = get_mood_store(current_app).snapshot(g.user.id)
+    return jsonify(dict(period_json(*query), **analytics.user_trends(snapshot, *query)))
+
+
+def mood_cohort():
+    query = analytics_query()
+    streak = int_arg("streak", 3, 1, MAX_STREAK)
+    if query is None or streak is None:
+        return invalid_query()
+    store = get_mood_store(current_app)
+    min_users = current_app.config.get("MOOD_COHORT_MIN_USERS", analytics.MIN_COHORT_USERS)
+    # Whole-population results only change when an entry is added
+    key = (store.version, streak, min_users) + query
+    with _cohort_lock:
+        cached = current_app.extensions.get("mood_cohort")
+        if cached is None or cached[0] != key:
+            trends = analytics.cohort_trends(store.snapshot(), *query, streak=streak,
+                                             min_users=min_users)
+            cached = current_app.extensions["mood_cohort"] = (
+                key, dict(period_json(*query), streak=streak, minUsers=min_users, **trends))
+    return jsonify(cached[1])
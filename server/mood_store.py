@@ -0,0 +1,255 @@
+# Mood entries over SQLAlchemy, served from compact per-user columns
+#
+# The database is the record. Reads are served from memory: each user's
+# entries are three parallel arrays (id, timestamp, mood code), which take
+# 17 bytes per entry instead of a few hundred for a dict or row object. Notes
+# are rare and kept in one dict keyed by entry id. Each user also has daily
+# and weekly rollups holding five mood counts per bucket. They are updated
+# on every append, so summaries never look at individual entries.
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from server.appointment_store import from_seconds, to_seconds
+from server.appointments import DATE_FORMAT
+from server.database import create_engine, create_tables, memory_url
+from server.lazy import get_extension
+
+# Worst to best; the code is the index and the score used in averages is code + 1
+MOODS = ("awful", "down", "okay", "good", "great")
+MOOD_CODES = {mood: code for code, mood in enumerate(MOODS)}
+MAX_NOTE_LENGTH = 2000
+
+MISSING_MOOD = "Please select a mood"
+INVALID_MOOD = "Invalid mood"
+INVALID_NOTE = "Invalid note"
+INVALID_PERIOD = "Invalid summary period"
+
+
+def validate_mood_entry(data):
+    """Return an error message for a bad mood entry payload, or None"""
+    if not isinstance(data, dict) or "mood" not in data:
+        return MISSING_MOOD
+    if not isinstance(data["mood"], str) or data["mood"] not in MOOD_CODES:
+        return INVALID_MOOD
+    note = data.get("note")
+    if note is not None and (not isinstance(note, str) or len(note) > MAX_NOTE_LENGTH):
+        return INVALID_NOTE
+    return None
+
+
+class Rollup:
+    """Mood counts per bucket of width days, for one user, sorted by bucket.
+
+    Day ordinal 1 (0001-01-01) was a Monday, so with width 7 each bucket is
+    a Monday-to-Sunday week. counts holds five counts per bucket, in MOODS
+    order.
+    """
+
+    __slots__ = ("width", "keys", "counts")
+
+    def __init__(self, width):
+        self.width = width
+        self.keys = array("i")
+        self.counts = array("I")
+
+    def add(self, ordinal, code):
+        key = (ordinal - 1) // self.width
+        keys = self.keys
+        if keys and keys[-1] == key:
+            # The common case: another entry in the current bucket
+            self.counts[5 * (len(keys) - 1) + code] += 1
+            return
+        i = len(keys) if not keys or keys[-1] < key else bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            keys.insert(i, key)
+            self.counts[5 * i:5 * i] = array("I", (0, 0, 0, 0, 0))
+        self.counts[5 * i + code] += 1
+
+    def between(self, first, last):
+        """(first day ordinal, counts) for buckets overlapping days first..last"""
+        lo = bisect_left(self.keys, (first - 1) // self.width)
+        hi = bisect_right(self.keys, (last - 1) // self.width)
+        return [(self.keys[i] * self.width + 1, self.counts[5 * i:5 * i + 5])
+                for i in range(lo, hi)]
+
+    def nbytes(self):
+        return (len(self.keys) * self.keys.itemsize
+                + len(self.counts) * self.counts.itemsize)
+
+
+class MoodSeries:
+    """One user's entries as parallel columns, sorted by (timestamp, id)"""
+
+    __slots__ = ("ids", "times", "moods", "daily", "weekly")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.times = array("q")
+        self.moods = array("b")
+        self.daily = Rollup(1)
+        self.weekly = Rollup(7)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, entry_id, seconds, code):
+        times = self.times
+        if not times or times[-1] <= seconds:
+            self.ids.append(entry_id)
+            times.append(seconds)
+            self.moods.append(code)
+        else:
+            # Backdated entry, e.g. loaded out of order; keep the columns sorted
+            i = bisect_right(times, seconds)
+            self.ids.insert(i, entry_id)
+            times.insert(i, seconds)
+            self.moods.insert(i, code)
+        ordinal = seconds // 86400
+        self.daily.add(ordinal, code)
+        self.weekly.add(ordinal, code)
+
+    def nbytes(self):
+        return (len(self.ids) * (self.ids.itemsize + self.times.itemsize
+                                 + self.moods.itemsize)
+                + self.daily.nbytes() + self.weekly.nbytes())
+
+
+def summary_json(first_ordinal, counts):
+    """API representation of one rollup bucket"""
+    total = sum(counts)
+    return {
+        "date": date.fromordinal(first_ordinal).isoformat(),
+        "count": total,
+        "average": round(sum((code + 1) * n for code, n in enumerate(counts)) / total, 2),
+        "moods": dict(zip(MOODS, counts)),
+    }
+
+
+class MoodStore:
+    """mood_entries table plus per-user columns and rollups"""
+
+    def __init__(self, url="sqlite://"):
+        import sqlalchemy as sa
+
+        self._sa = sa
+        self.engine = create_engine(url)
+        metadata = sa.MetaData()
+        # Mirrors the moodEntries table in shared/schema.ts
+        self.table = sa.Table(
+            "mood_entries", metadata,
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.Integer, nullable=False),
+            sa.Column("mood", sa.Text, nullable=False),
+            sa.Column("note", sa.Text),
+            sa.Column("timestamp", sa.DateTime, nullable=False),
+        )
+        # Same order as the columns, for keyset pages read straight from SQL
+        by_user = sa.Index("ix_mood_entries_user_timestamp_id", self.table.c.user_id,
+                           self.table.c.timestamp, self.table.c.id)
+        create_tables(self.engine, metadata, by_user)
+        self._lock = threading.Lock()
+        self._series = {}
+        self._notes = {}
+        # Bumped on every add, so derived results can tell when they are stale
+        self.version = 0
+        self._load()
+
+    def _load(self):
+        t = self.table
+        query = self._sa.select(t.c.id, t.c.user_id, t.c.mood, t.c.note, t.c.timestamp)
+        with self.engine.connect() as conn:
+            for row in conn.execute(query.order_by(t.c.timestamp, t.c.id)):
+                self._append(row.user_id, row.id, to_seconds(row.timestamp),
+                             MOOD_CODES[row.mood], row.note)
+
+    def _append(self, user_id, entry_id, seconds, code, note):
+        series = self._series.get(user_id)
+        if series is None:
+            series = self._series[user_id] = MoodSeries()
+        series.append(entry_id, seconds, code)
+        if note:
+            self._notes[entry_id] = note
+
+    def add(self, user_id, mood, note=None, timestamp=None):
+        """Record an entry (timestamp defaults to now); returns its JSON dict"""
+        timestamp = (timestamp or datetime.now()).replace(microsecond=0)
+        with self._lock:
+            with self.engine.begin() as conn:
+                entry_id = conn.execute(self.table.insert(), {
+                    "user_id": user_id, "mood": mood, "note": note, "timestamp": timestamp,
+                }).inserted_primary_key[0]
+            self._append(user_id, entry_id, to_seconds(timestamp), MOOD_CODES[mood], note)
+            self.version += 1
+        return self._entry_json(user_id, entry_id, to_seconds(timestamp), MOOD_CODES[mood])
+
+    def _entry_json(self, user_id, entry_id, seconds, code):
+        return {
+            "id": entry_id,
+            "userId": user_id,
+            "mood": MOODS[code],
+            "note": self._notes.get(entry_id),
+            "timestamp": from_seconds(seconds).strftime(DATE_FORMAT),
+        }
+
+    def entries(self, user_id, limit=None, before=None):
+        """The user's entries as JSON dicts, newest first.
+
+        before is a (datetime, id) key: only entries older than it are
+        returned. The columns are sorted by (timestamp, id), so the page
+        boundary is one bisect away however deep the page is.
+        """
+        series = self._series.get(user_id)
+        if series is None:
+            return []
+        with self._lock:
+            end = len(series)
+            if before is not None:
+                seconds, entry_id = to_seconds(before[0]), before[1]
+                times, ids = series.times, series.ids
+                end = bisect_left(times, seconds)
+                while end < len(times) and times[end] == seconds and ids[end] < entry_id:
+                    end += 1
+            start = 0 if limit is None else max(0, end - limit)
+            columns = list(zip(series.ids[start:end], series.times[start:end],
+                               series.moods[start:end]))
+        return [self._entry_json(user_id, entry_id, seconds, code)
+                for entry_id, seconds, code in reversed(columns)]
+
+    def summary(self, user_id, period="daily", first=None, last=None):
+        """Rollup buckets for dates first..last (inclusive, default all), oldest first"""
+        series = self._series.get(user_id)
+        if series is None:
+            return []
+        rollup = series.daily if period == "daily" else series.weekly
+        first = first.toordinal() if first else 1
+        last = last.toordinal() if last else 1 << 31
+        with self._lock:
+            buckets = rollup.between(first, last)
+        return [summary_json(ordinal, counts) for ordinal, counts in buckets]
+
+    def snapshot(self, user_id=None):
+        """Copies of the timestamp and mood columns: (user id, times, moods) per user.
+
+        Covers every user, or only user_id when given.
+        """
+        with self._lock:
+            if user_id is not None:
+                series = self._series.get(user_id)
+                return [] if series is None else [(user_id, series.times[:], series.moods[:])]
+            return [(uid, series.times[:], series.moods[:])
+                    for uid, series in self._series.items()]
+
+    def stats(self):
+        return {
+            "users": len(self._series),
+            "entries": sum(len(series) for series in self._series.values()),
+            "notes": len(self._notes),
+            "column_bytes": sum(series.nbytes() for series in self._series.values()),
+        }
+
+
+def get_mood_store(app):
+    """Return the app's MoodStore, creating it on first use"""
+    return get_extension(app, "mood_entries", lambda: MoodStore(
+        memory_url(app, "MOOD_DATABASE_URL")))
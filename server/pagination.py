@@ -0,0 +1,57 @@
+# Keyset pagination for per-user listings
+#
+# A cursor names the last item of the previous page by its sort key,
+# (timestamp, id), instead of counting rows from the top. The next page
+# starts with a seek on that key in the (user_id, timestamp, id) index, so
+# page 1000 costs the same as page 1. Cursors are base64url JSON and opaque
+# to clients. Every query still filters on the logged in user, so a forged
+# cursor can only move around that user's own items.
+import base64
+import json
+from server.appointments import parse_date
+from server.database import MAX_ID
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+INVALID_LIMIT = f"limit must be between 1 and {MAX_PAGE_SIZE}"
+INVALID_CURSOR = "Invalid cursor"
+
+
+def encode_cursor(timestamp, item_id):
+    """Cursor for the item with this "YYYY-MM-DD HH:MM:SS" timestamp and id"""
+    data = json.dumps({"ts": timestamp, "id": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor):
+    """(timestamp datetime, id) from a cursor; raises ValueError if it is malformed.
+
+    The id must fit the database's integer column, which the driver would
+    otherwise fail to bind.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError(INVALID_CURSOR)
+    if not isinstance(data, dict) or type(data.get("id")) is not int \
+            or not 0 <= data["id"] <= MAX_ID:
+        raise ValueError(INVALID_CURSOR)
+    try:
+        return parse_date(data.get("ts")), data["id"]
+    except ValueError:
+        raise ValueError(INVALID_CURSOR)
+
+
+def page_request(args):
+    """Return (error, limit, cursor key or None) from the query string"""
+    limit = args.get("limit", str(DEFAULT_PAGE_SIZE))
+    if not limit.isdecimal() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+        return INVALID_LIMIT, None, None
+    cursor = args.get("cursor")
+    if cursor is None:
+        return None, int(limit), None
+    try:
+        return None, int(limit), decode_cursor(cursor)
+    except ValueError:
+        return INVALID_CURSOR, None, None
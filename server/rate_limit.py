@@ -0,0 +1,235 @@
+# Token-bucket rate limiting for the login endpoint
+#
+# Each key (an IP address, a username) has a bucket of `capacity` tokens that
+# refills at `rate` tokens per second; a request spends one token and is
+# refused when the bucket is empty. A bucket left idle for capacity / rate
+# seconds is full again, which is the same as having no bucket at all, so idle
+# keys can be dropped without changing any decision.
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """In-process token buckets, sharded over striped locks.
+
+    Keys are spread over `shards` independent dicts, each with its own lock,
+    so request threads only contend when their keys land in the same shard.
+    Each shard is kept in least-recently-used order: idle keys are expired
+    from its front as it is touched, and a shard over its share of max_keys
+    evicts its oldest key.
+    """
+
+    def __init__(self, capacity, period, shards=64, max_keys=100000, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.idle_seconds = period
+        self.max_per_shard = max(1, max_keys // shards)
+        self.clock = clock
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self._counter_lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return sum(len(buckets) for _, buckets in self._shards)
+
+    def hit(self, key, cost=1):
+        """Spend cost tokens for key; returns (allowed, seconds until allowed)"""
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        expired = evicted = 0
+        with lock:
+            now = self.clock()
+            # Front of the shard is the key touched longest ago
+            while buckets:
+                oldest = next(iter(buckets))
+                if now - buckets[oldest][1] < self.idle_seconds:
+                    break
+                del buckets[oldest]
+                expired += 1
+
+            bucket = buckets.get(key)
+            if bucket is None:
+                tokens = self.capacity
+                if len(buckets) >= self.max_per_shard:
+                    buckets.popitem(last=False)
+                    evicted = 1
+            else:
+                tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                buckets.move_to_end(key)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            buckets[key] = (tokens, now)
+
+        with self._counter_lock:
+            self.expired += expired
+            self.evictions += evicted
+            if allowed:
+                self.allowed += 1
+            else:
+                self.limited += 1
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "keys": len(self),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+class SharedTokenBucketLimiter:
+    """Token buckets in a shared memory segment, for workers on one host.
+
+    The segment is a fixed table of slots, so memory never grows. A key hashes
+    to one set of WAYS slots; a key not in its set takes an empty slot, or
+    one whose bucket has refilled, and only then evicts the one idle longest.
+    Keys are hashed with a random salt kept at the start of the segment, so
+    clients cannot choose keys that collide with someone else's. Sets are
+    guarded by striped locks: a thread lock within the process plus an fcntl
+    byte-range lock on a lock file between processes.
+
+    The first process to use `name` creates the segment; later ones attach.
+    Start the limiter before forking workers so the creator outlives them.
+    """
+
+    WAYS = 8
+    SLOT = struct.Struct("<Qdd")  # key hash, tokens, last update
+    SALT_SIZE = 16
+
+    def __init__(self, name, capacity, period, slots=65536, stripes=64, clock=time.monotonic):
+        import fcntl
+        from multiprocessing import resource_tracker, shared_memory
+
+        self._fcntl = fcntl
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.clock = clock
+        self._sets = max(1, slots // self.WAYS)
+        size = self.SALT_SIZE + self._sets * self.WAYS * self.SLOT.size
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.owner = True
+            self._shm.buf[:self.SALT_SIZE] = os.urandom(self.SALT_SIZE)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+            # Attaching registers the segment with this process's resource
+            # tracker, which would unlink it when the worker exits
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._buf = self._shm.buf
+        self._salt = self._read_salt()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._lockfile = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), "a+b")
+        self._counter_lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    def _read_salt(self, timeout=1.0):
+        # The creator writes the salt just after creating the segment
+        deadline = time.monotonic() + timeout
+        while True:
+            salt = bytes(self._buf[:self.SALT_SIZE])
+            if any(salt):
+                return salt
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"shared memory segment {self.name} has no salt")
+            time.sleep(0.001)
+
+    def _hash(self, key):
+        # hash() is salted per process, so workers share the segment's salt instead
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8,
+                                 key=self._salt).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def hit(self, key, cost=1):
+        """Spend cost tokens for key; returns (allowed, seconds until allowed)"""
+        h = self._hash(key)
+        index = h % self._sets
+        stripe = index % len(self._stripes)
+        slot_size, buf = self.SLOT.size, self._buf
+        base = self.SALT_SIZE + index * self.WAYS * slot_size
+        evicted = 0
+        with self._stripes[stripe]:
+            self._fcntl.lockf(self._lockfile, self._fcntl.LOCK_EX, 1, stripe)
+            try:
+                now = self.clock()
+                target, oldest = None, math.inf
+                for way in range(self.WAYS):
+                    offset = base + way * slot_size
+                    slot_key, tokens, updated = self.SLOT.unpack_from(buf, offset)
+                    if slot_key == h:
+                        target = offset
+                        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+                        break
+                    # A refilled bucket is the same as no bucket, so reusing it loses nothing
+                    if slot_key == 0 or tokens + (now - updated) * self.rate >= self.capacity:
+                        if oldest != -math.inf:
+                            target, oldest = offset, -math.inf
+                    elif updated < oldest:
+                        target, oldest = offset, updated
+                else:
+                    evicted = oldest != -math.inf
+                    tokens = self.capacity
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                self.SLOT.pack_into(buf, target, h, tokens, now)
+            finally:
+                self._fcntl.lockf(self._lockfile, self._fcntl.LOCK_UN, 1, stripe)
+
+        with self._counter_lock:
+            self.evictions += evicted
+            if allowed:
+                self.allowed += 1
+            else:
+                self.limited += 1
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        self._lockfile.close()
+
+    def unlink(self):
+        """Remove the segment and lock file; call once, from the creator"""
+        self._shm.unlink()
+        try:
+            os.remove(os.path.join(tempfile.gettempdir(), f"{self.name}.lock"))
+        except OSError:
+            pass
+
+    def stats(self):
+        # Counters are for this process; the buckets are shared
+        return {
+            "backend": "shared_memory",
+            "name": self.name,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+        }
+
+
+def make_limiter(limit, shared_name=None):
+    """Build a limiter from a (capacity, period_seconds) pair.
+
+    With shared_name the buckets live in that shared memory segment so all
+    workers on the host see the same counts.
+    """
+    capacity, period = limit
+    if shared_name:
+        return SharedTokenBucketLimiter(shared_name, capacity, period)
+    return TokenBucketLimiter(capacity, period)
@@ -0,0 +1,122 @@
+# Encoded, compressed resource catalog responses with conditional GET support
+#
+# Each category's listing (and the unfiltered one) is encoded to JSON and
+# gzipped once, then served as bytes until a write changes it. Validators
+# come from a per-category version number that writes bump, rather than
+# from the body, so a request carrying a current ETag is answered 304 from
+# the version alone, without building the payload or reading the store.
+import gzip
+import threading
+import time
+from werkzeug.http import http_date, quote_etag
+from server.json_provider import JSON_HEADERS, encode_body
+from server.lazy import get_extension
+from server.resources import get_resource_store
+
+# Bodies smaller than this are sent uncompressed; gzip's framing outweighs the saving
+MIN_GZIP_BYTES = 256
+GZIP_HEADERS = (("Content-Encoding", "gzip"),)
+
+
+def validator_headers(etag, modified):
+    """Headers every catalog response carries, 304s included"""
+    # One weak ETag covers both the plain and the gzipped body
+    return (("ETag", quote_etag(etag, weak=True)),
+            ("Last-Modified", http_date(modified)),
+            ("Cache-Control", "no-cache"),
+            ("Vary", "Accept-Encoding"))
+
+
+class CatalogPayload:
+    """One listing, encoded and compressed, with complete response headers"""
+
+    __slots__ = ("body", "gzipped", "headers", "gzip_headers")
+
+    def __init__(self, resources, validators):
+        self.body = encode_body(resources)
+        # mtime=0 keeps the compressed bytes identical for identical bodies
+        self.gzipped = (gzip.compress(self.body, compresslevel=9, mtime=0)
+                        if len(self.body) >= MIN_GZIP_BYTES else None)
+        self.headers = validators + JSON_HEADERS
+        self.gzip_headers = self.headers + GZIP_HEADERS
+
+
+class ResourceCatalogCache:
+    """Per-category catalog payloads, invalidated by ResourceStore writes.
+
+    Register it in the store's listeners. A write bumps the version of the
+    resource's category, its previous category if it moved, and the
+    unfiltered listing (category None); every other payload stays cached.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        # Versions are only meaningful within this cache, so tag ETags with when it started
+        self._epoch = f"{int(time.time() * 1000):x}"
+        now = time.time()
+        # category -> (version, ETag value, last modified time, validator
+        # headers); None is the whole catalog
+        self._versions = {category: self._version(1, now)
+                          for category in {r["category"] for r in store.all()} | {None}}
+        self._payloads = {}
+        self.builds = 0
+
+    def resource_saved(self, resource, previous):
+        categories = {None, resource["category"]}
+        if previous is not None:
+            categories.add(previous["category"])
+        now = time.time()
+        with self._lock:
+            for category in categories:
+                version = self._versions[category][0] if category in self._versions else 0
+                self._versions[category] = self._version(version + 1, now)
+                self._payloads.pop(category, None)
+
+    def _version(self, version, modified):
+        etag = f"{self._epoch}-{version}"
+        return version, etag, modified, validator_headers(etag, modified)
+
+    def known(self, category):
+        return category in self._versions
+
+    def validators(self, category):
+        """(ETag value, last modified time, headers) of a known category, without building it"""
+        return self._versions[category][1:]
+
+    def payload(self, category):
+        """The cached CatalogPayload for a known category, built on a miss"""
+        payload = self._payloads.get(category)
+        if payload is not None:
+            return payload
+        # Build under the store's lock so no write lands between reading the
+        # resources and labelling them with a version
+        with self._store._lock:
+            payload = self._payloads.get(category)
+            if payload is None:
+                payload = CatalogPayload(self._store.all(category),
+                                         self._versions[category][3])
+                with self._lock:
+                    self._payloads[category] = payload
+                self.builds += 1
+        return payload
+
+    def stats(self):
+        return {
+            "categories": len(self._versions) - 1,
+            "cached": len(self._payloads),
+            "builds": self.builds,
+            "bytes": sum(len(p.body) + len(p.gzipped or b"") for p in self._payloads.values()),
+        }
+
+
+def get_resource_cache(app):
+    """Return the app's ResourceCatalogCache, registered with the resource store"""
+    def build():
+        store = get_resource_store(app)
+        with store._lock:
+            cache = ResourceCatalogCache(store)
+            store.listeners.append(cache)
+        return cache
+
+    return get_extension(app, "resource_cache", build)
@@ -0,0 +1,238 @@
+# BM25 full-text search over resource title, category and content
+#
+# An inverted index maps each term to its postings: the internal document
+# numbers that contain it and the term's field-weighted frequency in each.
+# Postings are append-only arrays, so adding a resource only appends to the
+# lists of its own terms. An edited resource gets a new document number and
+# the old one is masked out until the next compaction. A query scores each
+# term's postings as numpy views with whole-array BM25 arithmetic and picks
+# the top results with argpartition, so its cost follows the postings it
+# touches rather than the number of resources. Query terms of three or more
+# characters also match the terms they are a prefix of, found by bisecting
+# a sorted vocabulary.
+import re
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from server.lazy import get_extension
+from server.resources import get_resource_store
+
+K1 = 1.2
+B = 0.75
+# A title hit counts three times as much as a body hit
+FIELD_WEIGHTS = (("title", 3), ("category", 2), ("content", 1))
+MIN_PREFIX = 3
+MAX_EXPANSIONS = 32
+# Compact once dead documents outnumber live ones (and there are enough to matter)
+COMPACT_MIN_DEAD = 1024
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or the to what with you your".split())
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercased alphanumeric words, without stopwords"""
+    return [word for word in _TOKEN.findall(text.lower()) if word not in STOPWORDS]
+
+
+def term_weights(resource):
+    """Field-weighted frequency of each term in a resource"""
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        # Counting a field's words weight times is cheaper than multiplying afterwards
+        weights.update(tokenize(resource.get(field) or "") * weight)
+    return weights
+
+
+class SearchIndex:
+    """Incrementally updated BM25 index of resources"""
+
+    def __init__(self, resources=()):
+        import numpy as np
+
+        self._np = np
+        self._lock = threading.Lock()
+        self._clear()
+        for resource in resources:
+            self._add(resource)
+
+    def _clear(self):
+        # term -> (document numbers, weighted term frequencies)
+        self._postings = {}
+        # term -> postings that belong to dead documents
+        self._dead_postings = {}
+        self._vocabulary = []
+        # Per document number
+        self._ids = array("i")
+        self._alive = array("b")
+        self._lengths = array("f")
+        self._categories = array("i")
+        self._doc_of = {}
+        self._category_codes = {}
+        self._total_length = 0.0
+        self._norm = None
+        self.dead = 0
+
+    def __len__(self):
+        return len(self._doc_of)
+
+    def _add(self, resource):
+        weights = term_weights(resource)
+        doc = len(self._ids)
+        self._ids.append(resource["id"])
+        self._alive.append(1)
+        length = sum(weights.values())
+        self._lengths.append(length)
+        self._total_length += length
+        category = resource.get("category")
+        self._categories.append(
+            self._category_codes.setdefault(category, len(self._category_codes)))
+        self._doc_of[resource["id"]] = doc
+        all_postings = self._postings
+        for term, tf in weights.items():
+            postings = all_postings.get(term)
+            if postings is None:
+                postings = all_postings[term] = (array("i"), array("f"))
+                insort(self._vocabulary, term)
+            postings[0].append(doc)
+            postings[1].append(tf)
+        self._norm = None
+
+    def _remove(self, resource):
+        doc = self._doc_of.pop(resource["id"], None)
+        if doc is None:
+            return
+        self._alive[doc] = 0
+        self._total_length -= self._lengths[doc]
+        # Stored resources are never mutated, so this is the indexed version
+        dead = self._dead_postings
+        for term in term_weights(resource):
+            dead[term] = dead.get(term, 0) + 1
+        self.dead += 1
+        self._norm = None
+
+    def resource_saved(self, resource, previous):
+        with self._lock:
+            if previous is not None:
+                self._remove(previous)
+            self._add(resource)
+            if self.dead >= COMPACT_MIN_DEAD and self.dead > len(self._doc_of):
+                self._compact()
+
+    def _compact(self):
+        """Renumber live documents and drop the postings of dead ones"""
+        np = self._np
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        renumber = np.cumsum(alive) - 1
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            docs = np.frombuffer(docs, dtype=np.int32)
+            keep = alive[docs]
+            if keep.any():
+                postings[term] = (array("i", renumber[docs[keep]].astype(np.int32).tobytes()),
+                                  array("f", np.frombuffer(tfs, dtype=np.float32)[keep].tobytes()))
+        live = np.flatnonzero(alive)
+        ids = np.frombuffer(self._ids, dtype=np.int32)[live]
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)[live]
+        categories = np.frombuffer(self._categories, dtype=np.int32)[live]
+
+        self._postings = postings
+        self._dead_postings = {}
+        self._vocabulary = sorted(postings)
+        self._ids = array("i", ids.tobytes())
+        self._alive = array("b", bytes([1]) * len(ids))
+        self._lengths = array("f", lengths.tobytes())
+        self._categories = array("i", categories.tobytes())
+        self._doc_of = {resource_id: doc for doc, resource_id in enumerate(self._ids)}
+        self._norm = None
+        self.dead = 0
+
+    def _df(self, term):
+        """Number of live documents containing term"""
+        postings = self._postings.get(term)
+        if postings is None:
+            return 0
+        return len(postings[0]) - self._dead_postings.get(term, 0)
+
+    def _expand(self, term):
+        """Indexed terms the query term matches: itself, and longer ones it prefixes"""
+        if len(term) < MIN_PREFIX:
+            return [term] if self._df(term) else []
+        vocabulary = self._vocabulary
+        matches = []
+        i = bisect_left(vocabulary, term)
+        while i < len(vocabulary) and vocabulary[i].startswith(term) \
+                and len(matches) < MAX_EXPANSIONS:
+            if self._df(vocabulary[i]):
+                matches.append(vocabulary[i])
+            i += 1
+        return matches
+
+    def search(self, query, limit=20, category=None):
+        """Best (resource id, score) pairs for query, highest score first"""
+        np = self._np
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            live = len(self._doc_of)
+            if not terms or not live:
+                return []
+            if self._norm is None:
+                # BM25 length normalisation, shared by every term until the next write
+                lengths = np.frombuffer(self._lengths, dtype=np.float32)
+                self._norm = K1 * (1 - B + B * lengths / (self._total_length / live))
+            norm = self._norm
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+            for term in terms:
+                expansions = self._expand(term)
+                if not expansions:
+                    continue
+                # A prefix scores as its best-matching expansion in each document
+                best = scores if len(expansions) == 1 else np.zeros_like(scores)
+                for expansion in expansions:
+                    docs, tfs = self._postings[expansion]
+                    docs = np.frombuffer(docs, dtype=np.int32)
+                    tfs = np.frombuffer(tfs, dtype=np.float32)
+                    df = self._df(expansion)
+                    idf = np.log(1 + (live - df + 0.5) / (df + 0.5))
+                    weight = (idf * tfs * (K1 + 1) / (tfs + norm[docs])).astype(np.float32)
+                    if best is scores:
+                        scores[docs] += weight
+                    else:
+                        best[docs] = np.maximum(best[docs], weight)
+                if best is not scores:
+                    scores += best
+            if self.dead:
+                scores *= np.frombuffer(self._alive, dtype=np.int8)
+            if category is not None:
+                code = self._category_codes.get(category)
+                if code is None:
+                    return []
+                scores[np.frombuffer(self._categories, dtype=np.int32) != code] = 0
+            hits = np.flatnonzero(scores)
+            if len(hits) > limit:
+                hits = hits[np.argpartition(-scores[hits], limit)[:limit]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+            return [(self._ids[doc], float(scores[doc])) for doc in hits]
+
+    def stats(self):
+        return {
+            "documents": len(self._doc_of),
+            "dead": self.dead,
+            "terms": sum(1 for term in self._postings if self._df(term)),
+            "postings": sum(len(docs) for docs, _ in self._postings.values()),
+        }
+
+
+def get_resource_search(app):
+    """Return the app's SearchIndex, built from the resource store on first use"""
+    def build():
+        store = get_resource_store(app)
+        # Register under the store's lock so no write falls between the two
+        with store._lock:
+            index = SearchIndex(store.all())
+            store.listeners.append(index)
+        return index
+
+    return get_extension(app, "resource_search", build)
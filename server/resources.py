@@ -0,0 +1,122 @@
+# Support resources catalog, mirroring the resources table in shared/schema.ts
+import threading
+from server.lazy import get_extension
+
+# Seed data from MemStorage.seedResources in server/storage.ts
+SEED_RESOURCES = (
+    {
+        "title": "Managing Exam Stress",
+        "category": "self-help",
+        "content": "Tips for managing exam-related stress and anxiety:\n• Practice deep breathing exercises\n• Break tasks into smaller chunks\n• Create a study schedule\n• Take regular breaks\n• Get enough sleep\n• Stay hydrated and eat well",
+        "url": "https://example.com/exam-stress",
+    },
+    {
+        "title": "Emergency Support",
+        "category": "emergency",
+        "content": "24/7 Crisis Helpline: 0800 132 737\nUniversity Counseling: 029 2087 4966\nEmergency Services: 999\nSamaritans: 116 123",
+        "url": None,
+    },
+    {
+        "title": "Anxiety Management Techniques",
+        "category": "self-help",
+        "content": "• 5-4-3-2-1 Grounding Technique\n• Progressive Muscle Relaxation\n• Mindful Breathing\n• Worry Time Scheduling\n• Thought Recording",
+        "url": "https://example.com/anxiety-management",
+    },
+    {
+        "title": "Depression Support",
+        "category": "self-help",
+        "content": "• Daily Activity Scheduling\n• Mood Tracking\n• Building Support Networks\n• Self-Care Strategies\n• Understanding Your Triggers",
+        "url": "https://example.com/depression-support",
+    },
+    {
+        "title": "Online Mental Health Resources",
+        "category": "online",
+        "content": "• Headspace - Meditation App\n• Calm - Sleep and Relaxation\n• MoodGym - CBT Training\n• Big White Wall - Online Community\n• Student Minds - Student Mental Health",
+        "url": "https://example.com/online-resources",
+    },
+    {
+        "title": "Peer Support Groups",
+        "category": "support",
+        "content": "Join our student-led support groups:\n• Anxiety Support Circle - Wednesdays 6PM\n• Depression Support Group - Mondays 5PM\n• International Students Meetup - Fridays 4PM",
+        "url": None,
+    },
+    {
+        "title": "Wellness Activities",
+        "category": "wellbeing",
+        "content": "Campus wellness activities:\n• Yoga Sessions - Student Union\n• Mindfulness Workshops\n• Art Therapy Groups\n• Nature Walk Groups\n• Stress-Busting Exercise Classes",
+        "url": None,
+    },
+)
+
+FIELDS = ("title", "category", "content", "url")
+
+
+def validate_resource(data):
+    """Return an error message for a bad resource, or None if it is valid"""
+    if not isinstance(data, dict):
+        return "Resource must be an object"
+    for field in ("title", "category", "content"):
+        if not isinstance(data.get(field), str) or not data[field].strip():
+            return f"Missing {field}"
+    if data.get("url") is not None and not isinstance(data["url"], str):
+        return "Invalid url"
+    return None
+
+
+class ResourceStore:
+    """Resources by id, in insertion order.
+
+    Objects in listeners are told about every write after it is made,
+    through resource_saved(resource, previous), where previous is None for
+    a new resource. Resource dicts are never mutated once stored, so
+    readers can hold on to them.
+    """
+
+    def __init__(self, resources=SEED_RESOURCES):
+        self._resources = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.listeners = []
+        for data in resources:
+            self.add(data)
+
+    def __len__(self):
+        return len(self._resources)
+
+    def get(self, resource_id):
+        return self._resources.get(resource_id)
+
+    def all(self, category=None):
+        resources = list(self._resources.values())
+        if category is not None:
+            return [r for r in resources if r["category"] == category]
+        return resources
+
+    def add(self, data):
+        with self._lock:
+            resource = {"id": self._next_id}
+            resource.update((field, data.get(field)) for field in FIELDS)
+            self._next_id += 1
+            self._resources[resource["id"]] = resource
+            for listener in self.listeners:
+                listener.resource_saved(resource, None)
+        return resource
+
+    def update(self, resource_id, data):
+        """Replace the given fields of a resource; returns it, or None if not found"""
+        with self._lock:
+            previous = self._resources.get(resource_id)
+            if previous is None:
+                return None
+            resource = dict(previous)
+            resource.update((field, data[field]) for field in FIELDS if field in data)
+            self._resources[resource_id] = resource
+            for listener in self.listeners:
+                listener.resource_saved(resource, previous)
+        return resource
+
+
+def get_resource_store(app):
+    """Return the app's ResourceStore, seeded on first use"""
+    return get_extension(app, "resources", lambda: ResourceStore(
+        app.config.get("RESOURCES", SEED_RESOURCES)))
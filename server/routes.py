@@ -1,82 +1,474 @@
-from flask import Flask, request, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-import re
-from datetime import datetime
+from flask import g, request, jsonify
+import math
+import secrets
+from datetime import date as Date, datetime, timedelta
+from server import appointments as booking
+from server.appointment_store import get_appointment_store
+from server.availability import DEFAULT_COUNSELORS, get_availability
+from server.access_policy import DEFAULT_POLICIES, DENY, REQUIRE_AUTH, REQUIRE_STAFF, PolicyTable
+from server.credentials import DEFAULT_METHOD, CredentialService, CredentialServiceBusy
+from server.database import MAX_ID, memory_url
+from server.json_provider import preserialized
+from server.lazy import add_lazy_rule
+from server.pagination import INVALID_CURSOR, INVALID_LIMIT, encode_cursor, page_request
+from server import mood_store as moods
+from server.mood_store import get_mood_store
+from server.rate_limit import make_limiter
+from server.resource_cache import get_resource_cache
+from server.resource_search import get_resource_search
+from server.resources import get_resource_store
+from server.scanner import (BODY_RULES, DEFAULT_ALLOW, DEFAULT_RULES, MAX_BODY_SIZE,
+                            BodyTooLarge, RequestScanner)
+from server.security_events import JSONLinesSink, LoggerSink, SecurityEventLog
+from server.session_tokens import COOKIE_NAME, SessionTokens
+from server.users import UserStore, validate_registration
+
+# Fixed bodies are encoded once here instead of on every request
+INVALID_REQUEST = preserialized({'message': 'Invalid request'}, 400)
+AUTHENTICATION_FAILED = preserialized({"message": "Authentication failed"}, 401)
+NOT_LOGGED_IN = preserialized({"message": "Please log in"}, 401)
+LOGGED_OUT = preserialized({"message": "Logged out"}, 200)
+BOOKING_ERRORS = {
+    error: preserialized({"error": error}, 400)
+    for error in (booking.MISSING_FIELDS, booking.PAST_APPOINTMENT, booking.INVALID_DATE,
+                  booking.INVALID_TYPE, booking.INVALID_COUNSELOR, booking.INVALID_DURATION)
+}
+TOO_MANY_ATTEMPTS = preserialized({
+    "message": "Too many attempts, please try again later"
+}, 429)
+SERVICE_BUSY = preserialized({"message": "Service busy, please try again"}, 503)
+USERNAME_TAKEN = preserialized({"message": "Username already exists"}, 409)
+MOOD_ERRORS = {
+    error: preserialized({"error": error}, 400)
+    for error in (moods.MISSING_MOOD, moods.INVALID_MOOD, moods.INVALID_NOTE,
+                  moods.INVALID_PERIOD)
+}
+PAGE_ERRORS = {
+    error: preserialized({"error": error}, 400) for error in (INVALID_LIMIT, INVALID_CURSOR)
+}
+MAX_SEARCH_RESULTS = 100
+INVALID_SEARCH_LIMIT = preserialized({
+    "error": f"limit must be between 1 and {MAX_SEARCH_RESULTS}"
+}, 400)
+NO_RESOURCES = preserialized([])
+APPOINTMENT_NOT_FOUND = preserialized({"error": "Appointment not found"}, 404)
+MAX_AVAILABILITY_DAYS = 31
+BODY_TOO_LARGE = preserialized({"error": "Request body too large"}, 413)
+ACCESS_DENIED = preserialized({
+    "message": "Access Denied - Administrative access required"
+}, 403)
 
 def registerRoutes(app):
+    # Checked now rather than when the stores are first used
+    for key in ('APPOINTMENTS_DATABASE_URL', 'MOOD_DATABASE_URL'):
+        memory_url(app, key)
+    scanner = app.extensions['request_scanner'] = RequestScanner(
+        app.config.get('SCANNER_RULES', DEFAULT_RULES),
+        allow=app.config.get('SCANNER_ALLOW', DEFAULT_ALLOW),
+        body_rules=app.config.get('SCANNER_BODY_RULES', BODY_RULES),
+        # Bodies are spooled before Flask sees them, so cap them here too
+        max_body_size=app.config.get('MAX_CONTENT_LENGTH') or MAX_BODY_SIZE,
+    )
+    log_path = app.config.get('SECURITY_LOG_PATH')
+    events = app.extensions['security_events'] = SecurityEventLog(
+        JSONLinesSink(log_path) if log_path else LoggerSink(app.logger),
+        max_queue=app.config.get('SECURITY_LOG_QUEUE_SIZE', 10000),
+    )
+    # Login attempts per (capacity, period in seconds), by client IP and by
+    # username. RATE_LIMIT_SHARED_MEMORY names a shared memory segment so that
+    # worker processes on one host share the counts.
+    shared_name = app.config.get('RATE_LIMIT_SHARED_MEMORY')
+    login_limits = app.extensions['login_rate_limits'] = {
+        'ip': make_limiter(app.config.get('LOGIN_RATE_LIMIT_IP', (30, 60)),
+                           shared_name and f"{shared_name}-ip"),
+        'username': make_limiter(app.config.get('LOGIN_RATE_LIMIT_USERNAME', (10, 300)),
+                                 shared_name and f"{shared_name}-user"),
+    }
+    users = app.extensions['users'] = UserStore()
+    # (username, password hash[, extra fields such as {"staff": True}]) tuples;
+    # tests use this for known accounts
+    for username, password_hash, *fields in app.config.get('SEED_USERS', ()):
+        users.add(username, password_hash, **(fields[0] if fields else {}))
+    credentials = app.extensions['credentials'] = CredentialService(
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING', 64),
+        method=app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+    )
+    # Without a SECRET_KEY tokens are only valid for this process's lifetime
+    tokens = app.extensions['session_tokens'] = SessionTokens(
+        app.config.get('SECRET_KEY') or secrets.token_bytes(32),
+        ttl=app.config.get('SESSION_TOKEN_TTL', 3600),
+        cache_size=app.config.get('SESSION_TOKEN_CACHE_SIZE', 1024),
+    )
+    policies = app.extensions['access_policy'] = PolicyTable(
+        app.config.get('ACCESS_POLICIES', DEFAULT_POLICIES))
+    counselors = frozenset(app.config.get('AVAILABILITY_COUNSELORS', DEFAULT_COUNSELORS))
+    # "report" logs body hits without rejecting them, "block" rejects, "off"
+    # leaves bodies unread
+    body_mode = app.config.get('SCANNER_BODY_MODE', 'report')
+
+    def request_token():
+        header = request.headers.get('Authorization', '')
+        if header.startswith('Bearer '):
+            return header[7:]
+        return request.cookies.get(COOKIE_NAME)
+
+    def current_user():
+        claims = tokens.verify(request_token())
+        return users.get_by_id(claims.user_id) if claims else None
+
+    # Runs first so denied requests are refused before their body is read
+    @app.before_request
+    def enforce_access_policy():
+        policy = policies.decide(request.method, request.path)
+        if policy is None:
+            return None
+        if policy.decision in (REQUIRE_AUTH, REQUIRE_STAFF):
+            g.user = current_user()
+            if g.user is None:
+                return NOT_LOGGED_IN
+        if policy.decision == DENY or (policy.decision == REQUIRE_STAFF and not g.user.staff):
+            events.emit(
+                'access_denied',
+                ip=request.remote_addr,
+                url=request.url,
+                method=request.method,
+                policy=policy.name
+            )
+            return ACCESS_DENIED
+        return None
+
     # SQL injection prevention middleware
     @app.before_request
     def check_for_sql_injection():
-        if request.url:
-            sql_patterns = r'(\%27)|(\')|(\-\-)|(\%23)|(#)'
-            if re.search(sql_patterns, request.url, re.I):
-                app.logger.warning("Potential SQL injection attempt", {
-                    'ip': request.remote_addr,
-                    'url': request.url,
-                    'method': request.method
-                })
-                return jsonify({'message': 'Invalid request'}), 400
+        rule = scanner.scan_request(request)
+        if rule:
+            events.emit(
+                'sql_injection',
+                ip=request.remote_addr,
+                url=request.url,
+                method=request.method,
+                rule=rule,
+                source='url',
+                blocked=True
+            )
+            return INVALID_REQUEST
+
+        if body_mode != 'off':
+            try:
+                rule = scanner.scan_request_body(request, stop=body_mode == 'block')
+            except BodyTooLarge:
+                return BODY_TOO_LARGE
+            if rule:
+                events.emit(
+                    'sql_injection',
+                    ip=request.remote_addr,
+                    url=request.url,
+                    method=request.method,
+                    rule=rule,
+                    source='body',
+                    blocked=body_mode == 'block'
+                )
+                if body_mode == 'block':
+                    return INVALID_REQUEST
+
+    @app.teardown_request
+    def close_body_spool(exc=None):
+        spool = request.environ.pop('scanner.body_spool', None)
+        if spool is not None:
+            spool.close()
+
+    def too_many_attempts(retry_after):
+        body, status, headers = TOO_MANY_ATTEMPTS
+        return body, status, headers + (('Retry-After', str(math.ceil(retry_after))),)
+
+    def service_busy():
+        body, status, headers = SERVICE_BUSY
+        return body, status, headers + (('Retry-After', '1'),)
+
+    @app.route('/api/register', methods=['POST'])
+    def register():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return INVALID_REQUEST
+        errors = validate_registration(data)
+        if errors:
+            return jsonify({"message": "Registration validation failed", "errors": errors}), 400
+        if users.get(data['username']) is not None:
+            return USERNAME_TAKEN
+        try:
+            password_hash = credentials.hash_password(data['password'])
+        except CredentialServiceBusy:
+            return service_busy()
+        user = users.add(
+            data['username'],
+            password_hash,
+            email=data.get('email'),
+            student_id=data.get('studentId'),
+            full_name=data.get('fullName')
+        )
+        if user is None:
+            return USERNAME_TAKEN
+        return jsonify(user.to_dict()), 201
 
     @app.route('/api/login', methods=['POST'])
     def login():
         data = request.get_json()
 
-        # For testing purposes, we'll simulate authentication
-        if data.get('username') == 'testuser' and data.get('password') == 'Test123!':
-            return jsonify({"message": "Login successful"}), 200
+        allowed, retry_after = login_limits['ip'].hit(request.remote_addr)
+        username = data.get('username') if isinstance(data, dict) else None
+        if allowed and isinstance(username, str):
+            allowed, retry_after = login_limits['username'].hit(username.lower())
+        if not allowed:
+            events.emit(
+                'login_rate_limited',
+                ip=request.remote_addr,
+                username=username if isinstance(username, str) else None
+            )
+            return too_many_attempts(retry_after)
+
+        password = data.get('password') if isinstance(data, dict) else None
+        user = users.get(username) if isinstance(username, str) else None
+        if not isinstance(password, str):
+            return AUTHENTICATION_FAILED
+        try:
+            if user is None:
+                # Same work as a real check, so timing doesn't tell which usernames exist
+                credentials.verify(credentials.dummy_hash(), password)
+                return AUTHENTICATION_FAILED
+            ok, new_hash = credentials.verify(user.password_hash, password)
+        except CredentialServiceBusy:
+            return service_busy()
+        if not ok:
+            return AUTHENTICATION_FAILED
+        if new_hash is not None:
+            users.set_password_hash(user.username, new_hash)
+        token = tokens.issue(user.id)
+        response = jsonify({"message": "Login successful", "id": user.id, "token": token})
+        response.set_cookie(COOKIE_NAME, token, max_age=tokens.ttl, httponly=True,
+                            secure=True, samesite='Lax')
+        return response
 
-        return jsonify({"message": "Authentication failed"}), 401
+    @app.route('/api/logout', methods=['POST'])
+    def logout():
+        tokens.revoke(request_token())
+        body, status, headers = LOGGED_OUT
+        response = app.response_class(body, status, headers)
+        response.delete_cookie(COOKIE_NAME, httponly=True, secure=True, samesite='Lax')
+        return response
+
+    @app.route('/api/user', methods=['GET'])
+    def user_profile():
+        return jsonify(g.user.to_dict())
 
     @app.route('/api/appointments', methods=['GET', 'POST'])
     def appointments():
-        # Check if user is authenticated (simulated for tests)
-        if not request.headers.get('Authorization'):
-            return jsonify({"message": "Please log in to view appointments"}), 401
+        store = get_appointment_store(app)
+        if request.method == 'GET':
+            error, limit, after = page_request(request.args)
+            if error:
+                return PAGE_ERRORS[error]
+            # One extra row says whether there is a next page
+            rows = store.for_user(g.user.id, limit + 1, after)
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1]["date"], rows[-1]["id"])
+            return jsonify({
+                "appointments": [booking.appointment_json(row) for row in rows],
+                "nextCursor": next_cursor
+            })
+
+        data = request.get_json()
+        error, date = booking.validate_booking(data, datetime.now(), counselors)
+        if error:
+            return BOOKING_ERRORS[error]
+        row, conflict = store.book(booking.booking_from_request(data, g.user.id, date))
+        if conflict:
+            return jsonify({"error": conflict}), 409
+        return jsonify(booking.appointment_json(row)), 201
 
-        if request.method == 'POST':
-            data = request.get_json()
+    @app.route('/api/appointments/<int:appointment_id>', methods=['DELETE'])
+    def cancel_appointment(appointment_id):
+        if appointment_id > MAX_ID:
+            return APPOINTMENT_NOT_FOUND
+        row = get_appointment_store(app).cancel(appointment_id, g.user.id)
+        if row is None:
+            return APPOINTMENT_NOT_FOUND
+        return jsonify(booking.appointment_json(row))
 
-            # Validate appointment data
-            if not all(k in data for k in ["date", "type"]):
-                return jsonify({"error": "Missing required fields"}), 400
+    def availability_query():
+        """(error, session minutes, counselor ids) from the query string"""
+        kind = request.args.get('type')
+        if kind not in booking.VALID_TYPES:
+            return booking.INVALID_TYPE, None, None
+        engine = get_availability(app)
+        counselor = request.args.get('counselorId')
+        if counselor is None:
+            return None, booking.TYPE_DURATIONS[kind], engine.counselors
+        if not counselor.isdecimal() or int(counselor) not in engine.counselors:
+            return booking.INVALID_COUNSELOR, None, None
+        return None, booking.TYPE_DURATIONS[kind], (int(counselor),)
 
-            # Validate date format
+    @app.route('/api/availability/next', methods=['GET'])
+    def next_available():
+        error, minutes, counselors = availability_query()
+        if error:
+            return BOOKING_ERRORS[error]
+        now = datetime.now().replace(microsecond=0)
+        after = now
+        if 'after' in request.args:
             try:
-                appointment_date = datetime.strptime(data['date'], '%Y-%m-%d %H:%M:%S')
-                if appointment_date < datetime.now():
-                    return jsonify({"error": "Cannot book appointments in the past"}), 400
+                after = max(booking.parse_date(request.args['after']), now)
             except ValueError:
-                return jsonify({"error": "Invalid date format"}), 400
+                return BOOKING_ERRORS[booking.INVALID_DATE]
+        engine = get_availability(app)
+        if after >= now + timedelta(days=engine.horizon_days):
+            return jsonify({"available": None})
+        found = engine.next_available(
+            minutes, after, counselors[0] if len(counselors) == 1 else None)
+        if found is None:
+            return jsonify({"available": None})
+        counselor, start = found
+        return jsonify({"available": {
+            "counselorId": counselor,
+            "date": start.strftime(booking.DATE_FORMAT),
+            "durationMinutes": minutes,
+        }})
 
-            # Validate appointment type
-            valid_types = ["counseling", "therapy", "group"]
-            if data['type'] not in valid_types:
-                return jsonify({"error": "Invalid appointment type"}), 400
+    @app.route('/api/availability', methods=['GET'])
+    def availability():
+        error, minutes, counselors = availability_query()
+        if error:
+            return BOOKING_ERRORS[error]
+        now = datetime.now().replace(microsecond=0)
+        try:
+            first = Date.fromisoformat(request.args.get('from', now.date().isoformat()))
+            last = Date.fromisoformat(request.args.get('to', first.isoformat()))
+        except ValueError:
+            return BOOKING_ERRORS[booking.INVALID_DATE]
+        if not 0 <= (last - first).days < MAX_AVAILABILITY_DAYS:
+            return jsonify({"error": f"Ask for at most {MAX_AVAILABILITY_DAYS} days"}), 400
+        engine = get_availability(app)
+        # Only days from today to the end of the booking horizon are listed
+        first = max(first, now.date())
+        last = min(last, now.date() + timedelta(days=engine.horizon_days - 1))
+        days = []
+        for offset in range((last - first).days + 1):
+            day = first + timedelta(days=offset)
+            days.append({"date": day.isoformat(), "counselors": [{
+                "counselorId": counselor,
+                "starts": [start.strftime(booking.DATE_FORMAT)
+                           for start in engine.free_starts(minutes, day, counselor, now)],
+            } for counselor in counselors]})
+        return jsonify({"durationMinutes": minutes, "days": days})
 
-            # For testing, return a simulated successful booking
-            return jsonify({
-                "id": 1,
-                "date": data['date'],
-                "type": data['type'],
-                "status": "confirmed"
-            }), 201
-
-        return jsonify({"message": "Please log in to view appointments"}), 401
+    @app.route('/api/appointments/batch', methods=['POST'])
+    def appointments_batch():
+        data = request.get_json(silent=True)
+        items = data.get('appointments') if isinstance(data, dict) else None
+        error = booking.validate_batch(items)
+        if error:
+            return jsonify({"error": error}), 400
 
-    @app.route('/admin', methods=['GET'])
-    @app.route('/admin/<path:subpath>', methods=['GET'])
-    def admin_routes(subpath=None):
+        # One clock read for the whole batch
+        now = datetime.now()
+        validate = booking.validate_booking
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            error, date = validate(item, now, counselors)
+            if error:
+                results[index] = {"index": index, "error": error}
+            else:
+                valid.append((index, date))
+        booked = get_appointment_store(app).book_many(
+            [booking.booking_from_request(items[i], g.user.id, date) for i, date in valid])
+        for (index, _), (row, conflict) in zip(valid, booked):
+            if conflict:
+                results[index] = {"index": index, "error": conflict}
+            else:
+                results[index] = dict(booking.appointment_json(row), index=index)
+        accepted = sum(1 for row, _ in booked if row is not None)
         return jsonify({
-            "message": "Access Denied - Administrative access required"
-        }), 403
+            "accepted": accepted,
+            "rejected": len(items) - accepted,
+            "results": results
+        })
+
+    @app.route('/api/mood-entries', methods=['GET', 'POST'])
+    def mood_entries():
+        store = get_mood_store(app)
+        if request.method == 'GET':
+            error, limit, before = page_request(request.args)
+            if error:
+                return PAGE_ERRORS[error]
+            entries = store.entries(g.user.id, limit + 1, before)
+            next_cursor = None
+            if len(entries) > limit:
+                entries = entries[:limit]
+                next_cursor = encode_cursor(entries[-1]["timestamp"], entries[-1]["id"])
+            return jsonify({"entries": entries, "nextCursor": next_cursor})
 
-    @app.route('/api/admin/<path:subpath>', methods=['GET'])
-    @app.route('/api/user-data/<path:subpath>', methods=['GET'])
-    @app.route('/api/internal/<path:subpath>', methods=['GET'])
-    def protected_api_routes(subpath=None):
+        data = request.get_json(silent=True)
+        error = moods.validate_mood_entry(data)
+        if error:
+            return MOOD_ERRORS[error]
+        return jsonify(store.add(g.user.id, data['mood'], data.get('note'))), 201
+
+    @app.route('/api/mood-entries/summary', methods=['GET'])
+    def mood_summary():
+        period = request.args.get('period', 'daily')
+        if period not in ('daily', 'weekly'):
+            return MOOD_ERRORS[moods.INVALID_PERIOD]
+        try:
+            first = Date.fromisoformat(request.args['from']) if 'from' in request.args else None
+            last = Date.fromisoformat(request.args['to']) if 'to' in request.args else None
+        except ValueError:
+            return BOOKING_ERRORS[booking.INVALID_DATE]
         return jsonify({
-            "message": "Access Denied - Administrative access required"
-        }), 403
+            "period": period,
+            "summary": get_mood_store(app).summary(g.user.id, period, first, last)
+        })
+
+    @app.route('/api/resources', methods=['GET'])
+    def resources():
+        category = request.args.get('category') or None
+        query = request.args.get('q', '').strip()
+        if not query:
+            return resource_catalog(category)
+
+        limit = request.args.get('limit', '20')
+        if not limit.isdecimal() or not 1 <= int(limit) <= MAX_SEARCH_RESULTS:
+            return INVALID_SEARCH_LIMIT
+        hits = get_resource_search(app).search(query, int(limit), category)
+        store = get_resource_store(app)
+        return jsonify([dict(store.get(resource_id), score=round(score, 4))
+                        for resource_id, score in hits])
+
+    def resource_catalog(category):
+        """The cached listing, or 304 when the client's copy is still current"""
+        catalog = get_resource_cache(app)
+        if not catalog.known(category):
+            return NO_RESOURCES
+        etag, modified, headers = catalog.validators(category)
+        if request.if_none_match:
+            if request.if_none_match.contains_weak(etag):
+                return b'', 304, headers
+        elif request.if_modified_since and \
+                int(modified) <= request.if_modified_since.timestamp():
+            return b'', 304, headers
+
+        # The payload carries its own headers, in case a write landed since the check
+        payload = catalog.payload(category)
+        if payload.gzipped is not None and request.accept_encodings['gzip']:
+            return payload.gzipped, 200, payload.gzip_headers
+        return payload.body, 200, payload.headers
+
+    # numpy is only imported when analytics are first asked for
+    add_lazy_rule(app, '/api/mood-entries/analytics',
+                  'server.mood_analytics_views.mood_analytics', methods=['GET'])
+    add_lazy_rule(app, '/api/mood-entries/analytics/cohort',
+                  'server.mood_analytics_views.mood_cohort', methods=['GET'])
 
     return app
\ No newline at end of file
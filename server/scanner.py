@@ -0,0 +1,256 @@
+# Precompiled request scanner used by the SQL injection before_request hook
+import re
+import tempfile
+import threading
+from urllib.parse import unquote_plus
+
+
+_META = set("\\.^$*+?{}[]|()")
+_QUANTIFIERS = set("*+?{")
+
+
+def _has_top_level_branch(pattern):
+    depth, in_class, escaped = 0, False, False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def literal_prefix(pattern):
+    """Return the literal text every match of pattern starts with, or ""
+
+    A leading \\b is skipped; the scan stops at the first regex syntax. A
+    pattern with a top-level | has no common prefix.
+    """
+    if _has_top_level_branch(pattern):
+        return ""
+    if pattern.startswith("\\b"):
+        pattern = pattern[2:]
+    end = 0
+    while end < len(pattern) and pattern[end] not in _META:
+        end += 1
+    if end < len(pattern) and pattern[end] in _QUANTIFIERS:
+        # The quantifier applies to the last character, which may not appear
+        end -= 1
+    return pattern[:end]
+
+
+class BodyTooLarge(Exception):
+    """A request body is longer than the scanner's max_body_size"""
+
+
+class ScanRule:
+    """A named pattern the scanner looks for"""
+
+    __slots__ = ("name", "pattern", "prefix")
+
+    def __init__(self, name, pattern, prefix=None):
+        self.name = name
+        self.pattern = pattern
+        self.prefix = literal_prefix(pattern) if prefix is None else prefix
+
+    def __repr__(self):
+        return f"ScanRule({self.name!r}, {self.pattern!r})"
+
+
+# The characters the original URL check rejected. The query is decoded before
+# scanning, so %27 and %23 arrive as ' and #; a leftover %27 or %23 after
+# decoding means the value was encoded twice.
+DEFAULT_RULES = (
+    ScanRule("quote", r"'"),
+    ScanRule("comment", r"--"),
+    ScanRule("hash", r"#"),
+    ScanRule("double_encoded", r"%(?:27|23)"),
+)
+
+# Bodies are JSON written by users, where apostrophes, "--" and "#" are
+# ordinary punctuation ("I'm ok -- really #1"), so the bare characters the URL
+# rules look for would fire on most requests. Body rules look for them only
+# in the shapes an injection takes.
+BODY_RULES = (
+    ScanRule("tautology", r"'\s*(?:or|and)\s+'?\w+'?\s*=\s*'?\w"),
+    ScanRule("quote_comment", r"'\s*(?:--|#|/\*)"),
+    ScanRule("union_select", r"\bunion\s+(?:all\s+)?select\b"),
+    ScanRule("stacked_query", r";\s*(?:(?:drop|alter|truncate)\s+table|delete\s+from"
+                              r"|insert\s+into|update\s+\w+\s+set)\b"),
+)
+
+# Body inspection reads the input in chunks of CHUNK_SIZE bytes, keeping the
+# last OVERLAP bytes of one chunk in front of the next so a match that
+# straddles the boundary is still found. Matches longer than OVERLAP can be
+# missed when they straddle. Bodies above SPOOL_SIZE are spooled to disk, and
+# bodies above MAX_BODY_SIZE are refused rather than spooled.
+CHUNK_SIZE = 64 * 1024
+OVERLAP = 256
+SPOOL_SIZE = 1024 * 1024
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Routes that never reach the database: static files, and the chatbot, whose
+# messages legitimately contain apostrophes.
+DEFAULT_ALLOW = ("/static/", "/chatbot")
+
+
+class RequestScanner:
+    """Scans a request's path and decoded query against a set of rules.
+
+    All rules are compiled into one alternation of named groups at startup,
+    so a request costs a single regex pass however many rules there are, and
+    the group that matched says which rule fired.
+
+    The regex engine tries every alternative at every position, so the
+    alternation sits behind a lookahead on the rules' literal prefixes (cut
+    to GATE_LENGTH characters and deduplicated). Positions that cannot start
+    any rule are rejected by the short gate instead of by each rule in turn.
+    If any rule has no literal prefix the gate is left out.
+    """
+
+    GATE_LENGTH = 3
+
+    def __init__(self, rules=DEFAULT_RULES, allow=DEFAULT_ALLOW, chunk_size=CHUNK_SIZE,
+                 overlap=OVERLAP, spool_size=SPOOL_SIZE, body_rules=BODY_RULES,
+                 max_body_size=MAX_BODY_SIZE):
+        self.rules = tuple(rules)
+        self.body_rules = tuple(body_rules)
+        self.allow = tuple(allow)
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.spool_size = spool_size
+        self.max_body_size = max_body_size
+        self._names = {f"r{i}": rule.name for i, rule in enumerate(self.rules)}
+        self._body_names = {f"r{i}": rule.name for i, rule in enumerate(self.body_rules)}
+        self._regex = (re.compile(self._compile_pattern(self.rules), re.IGNORECASE)
+                       if self.rules else None)
+        # Bodies are scanned as bytes so a chunk boundary can't split a character
+        self._body_regex = (re.compile(self._compile_pattern(self.body_rules).encode("utf-8"),
+                                       re.IGNORECASE)
+                            if self.body_rules else None)
+        self._lock = threading.Lock()
+        self.scanned = 0
+        self.skipped = 0
+        self.hits = {rule.name: 0 for rule in self.rules}
+        self.bodies_scanned = 0
+        self.body_bytes = 0
+        self.bodies_refused = 0
+        self.body_hits = {rule.name: 0 for rule in self.body_rules}
+
+    def _compile_pattern(self, rules):
+        alternation = "|".join(f"(?P<r{i}>{rule.pattern})" for i, rule in enumerate(rules))
+        prefixes = {rule.prefix[:self.GATE_LENGTH].lower() for rule in rules}
+        if "" in prefixes:
+            return alternation
+        gate = "|".join(re.escape(prefix) for prefix in sorted(prefixes))
+        return f"(?=(?:{gate}))(?:{alternation})"
+
+    def scan(self, path, query=""):
+        """Return the name of the first rule found in path/query, or None"""
+        if path.startswith(self.allow):
+            with self._lock:
+                self.skipped += 1
+            return None
+        text = f"{path}?{query}" if query else path
+        match = self._regex.search(text) if self._regex else None
+        with self._lock:
+            self.scanned += 1
+            if match is None:
+                return None
+            name = self._names[match.lastgroup]
+            self.hits[name] += 1
+        return name
+
+    def scan_request(self, request):
+        """Scan a Flask request: decoded path plus decoded query string"""
+        query = request.query_string
+        if query:
+            query = unquote_plus(query.decode("utf-8", "replace"))
+        return self.scan(request.path, query or "")
+
+    def scan_body(self, stream, stop=False):
+        """Copy stream into a spool file while scanning it chunk by chunk.
+
+        Returns (rule name or None, spool). The spool is rewound and holds
+        every byte read, so the caller can hand it on in place of the
+        original stream. Scanning carries on after a hit so the spool is
+        complete, unless stop is true: then reading ends at the first hit and
+        the spool only holds what was read, for callers that reject the
+        request anyway. Raises BodyTooLarge once more than max_body_size
+        bytes have been read.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        regex, overlap = self._body_regex, self.overlap
+        tail, found, size = b"", None, 0
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if self.max_body_size is not None and size > self.max_body_size:
+                spool.close()
+                with self._lock:
+                    self.bodies_refused += 1
+                raise BodyTooLarge(size)
+            spool.write(chunk)
+            if regex is not None and found is None:
+                window = tail + chunk
+                match = regex.search(window)
+                if match is not None:
+                    found = self._body_names[match.lastgroup]
+                    if stop:
+                        break
+                tail = window[-overlap:] if overlap else b""
+        spool.seek(0)
+        with self._lock:
+            self.bodies_scanned += 1
+            self.body_bytes += size
+            if found is not None:
+                self.body_hits[found] += 1
+        return found, spool
+
+    def scan_request_body(self, request, stop=False):
+        """Scan a Flask request's body and replace its stream with the spool.
+
+        The view then reads the same bytes from the spool instead of the
+        socket. Requests with no body or on an allow-listed path are left
+        alone. Returns the name of the rule found, or None; stop is passed
+        to scan_body. Raises BodyTooLarge for bodies over max_body_size,
+        without reading them when Content-Length already says so.
+        """
+        if request.path.startswith(self.allow):
+            return None
+        environ = request.environ
+        length = request.content_length
+        if not length and not environ.get("wsgi.input_terminated"):
+            return None
+        if self.max_body_size is not None and length and length > self.max_body_size:
+            with self._lock:
+                self.bodies_refused += 1
+            raise BodyTooLarge(length)
+        found, spool = self.scan_body(request.stream, stop)
+        request.stream = environ["wsgi.input"] = spool
+        environ["scanner.body_spool"] = spool
+        return found
+
+    def stats(self):
+        with self._lock:
+            return {
+                "scanned": self.scanned,
+                "skipped": self.skipped,
+                "blocked": sum(self.hits.values()),
+                "rules": dict(self.hits),
+                "bodies_scanned": self.bodies_scanned,
+                "body_bytes": self.body_bytes,
+                "bodies_refused": self.bodies_refused,
+                "body_rules": dict(self.body_hits),
+            }
@@ -0,0 +1,174 @@
+# Structured security events, written to a sink from a background thread
+#
+# Request threads only put the event on a bounded queue. A single worker takes
+# events off in batches and hands each batch to the sink, so slow log I/O
+# never holds up a request. When the queue is full new events are dropped and
+# counted rather than blocking the request.
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class LoggerSink:
+    """Writes each event as one JSON record to a logging.Logger"""
+
+    def __init__(self, logger, level=logging.WARNING):
+        self.logger = logger
+        self.level = level
+
+    def __call__(self, batch):
+        for event in batch:
+            self.logger.log(self.level, "security event %s", json.dumps(event))
+
+
+class JSONLinesSink:
+    """Appends events to a file as JSON lines, one write per batch"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, batch):
+        self._file.write("".join(json.dumps(event) + "\n" for event in batch))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class SecurityEventLog:
+    """Bounded queue of security events drained by a batching worker thread.
+
+    The worker starts with the first event. close() is registered with
+    atexit, so events still queued at shutdown are written out.
+    """
+
+    def __init__(self, sink, max_queue=10000, batch_size=256):
+        self.sink = sink
+        self.batch_size = batch_size
+        self._queue = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._closed = False
+        self.emitted = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.written = 0
+        self.batches = 0
+        self.sink_errors = 0
+        self.max_depth = 0
+        self._full = False
+
+    def emit(self, event, **fields):
+        """Queue an event without blocking; returns False if it was dropped"""
+        if self._closed:
+            with self._lock:
+                self.dropped += 1
+            return False
+        if self._worker is None:
+            self._start()
+        fields["event"] = event
+        fields["time"] = time.time()
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                # One overflow per run of drops, so floods can be told apart
+                # from a single burst
+                if not self._full:
+                    self._full = True
+                    self.overflows += 1
+            return False
+        depth = self._queue.qsize()
+        with self._lock:
+            self.emitted += 1
+            self._full = False
+            if depth > self.max_depth:
+                self.max_depth = depth
+        return True
+
+    def _start(self):
+        with self._lock:
+            if self._worker is not None or self._closed:
+                return
+            self._worker = threading.Thread(target=self._run, name="security-events", daemon=True)
+            self._worker.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + stop):
+                q.task_done()
+            if stop:
+                return
+
+    def _write(self, batch):
+        try:
+            self.sink(batch)
+        except Exception:
+            with self._lock:
+                self.sink_errors += 1
+            return
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued event has been written; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not done.wait(remaining):
+                    return False
+        return True
+
+    def close(self, timeout=5.0):
+        """Write out queued events and stop the worker"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._worker is not None:
+            # Blocks until there is room, so the stop marker queues behind
+            # every event already accepted
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                return
+            self._worker.join(timeout)
+        close_sink = getattr(self.sink, "close", None)
+        if close_sink is not None:
+            close_sink()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "emitted": self.emitted,
+                "dropped": self.dropped,
+                "overflows": self.overflows,
+                "written": self.written,
+                "batches": self.batches,
+                "sink_errors": self.sink_errors,
+            }
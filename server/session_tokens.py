@@ -0,0 +1,127 @@
+# Signed, expiring session tokens
+#
+# A token carries the user id, its expiry time and a random token id, signed
+# with HMAC-SHA256 under the app's secret key. Checking one needs no
+# database: the signature proves the server issued it and the expiry is
+# inside it. Verified tokens are kept in a small LRU so repeat requests
+# skip the HMAC and parsing; expiry and revocation are still checked on
+# every request, so a revoked token stops working at once.
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+COOKIE_NAME = "session_token"
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class TokenClaims:
+    __slots__ = ("user_id", "expires", "token_id")
+
+    def __init__(self, user_id, expires, token_id):
+        self.user_id = user_id
+        self.expires = expires
+        self.token_id = token_id
+
+
+class SessionTokens:
+    """Issues and verifies session tokens, with a verified-token cache"""
+
+    def __init__(self, secret, ttl=3600, cache_size=1024):
+        if isinstance(secret, str):
+            secret = secret.encode("utf-8")
+        self._secret = secret
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        # token id -> expiry; entries are dropped once the token has expired
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self.issued = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.rejected = 0
+
+    def _sign(self, payload):
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    def issue(self, user_id):
+        """Return a new token for user_id"""
+        expires = int(time.time()) + self.ttl
+        payload = f"{user_id}:{expires}:{secrets.token_urlsafe(12)}".encode("ascii")
+        with self._lock:
+            self.issued += 1
+        return f"{_b64encode(payload)}.{_b64encode(self._sign(payload))}"
+
+    def _parse(self, token):
+        try:
+            payload_part, signature_part = token.split(".")
+            payload = _b64decode(payload_part)
+            signature = _b64decode(signature_part)
+        except (ValueError, TypeError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        try:
+            user_id, expires, token_id = payload.decode("ascii").split(":")
+            return TokenClaims(int(user_id), int(expires), token_id)
+        except ValueError:
+            return None
+
+    def verify(self, token):
+        """Return the token's claims, or None if it is invalid, expired or revoked"""
+        if not token:
+            return None
+        with self._lock:
+            claims = self._cache.get(token)
+            if claims is not None:
+                self._cache.move_to_end(token)
+                self.cache_hits += 1
+        if claims is None:
+            claims = self._parse(token)
+            with self._lock:
+                self.cache_misses += 1
+                if claims is not None:
+                    self._cache[token] = claims
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        if claims is None or claims.expires <= time.time() or claims.token_id in self._revoked:
+            with self._lock:
+                self.rejected += 1
+            return None
+        return claims
+
+    def revoke(self, token):
+        """Revoke a token at once; returns False if it was not valid"""
+        claims = self.verify(token)
+        if claims is None:
+            return False
+        now = time.time()
+        with self._lock:
+            self._revoked[claims.token_id] = claims.expires
+            self._cache.pop(token, None)
+            # Expired tokens fail verification anyway, so forget them
+            for token_id in [t for t, expires in self._revoked.items() if expires <= now]:
+                del self._revoked[token_id]
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "issued": self.issued,
+                "cached": len(self._cache),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "rejected": self.rejected,
+                "revoked": len(self._revoked),
+            }
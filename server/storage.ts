@@ -115,7 +115,12 @@ export class MemStorage implements IStorage {
 
   async createAppointment(appointment: InsertAppointment): Promise<Appointment> {
     const id = this.currentId.appointments++;
-    const newAppointment: Appointment = { ...appointment, id };
+    const newAppointment: Appointment = {
+      ...appointment,
+      id,
+      counselorId: appointment.counselorId ?? null,
+      durationMinutes: appointment.durationMinutes ?? 60,
+    };
     this.appointments.set(id, newAppointment);
     return newAppointment;
   }
@@ -0,0 +1,47 @@
+# Server-Sent Events helpers for streaming chatbot replies
+import json
+import re
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_reply(text):
+    """Split a reply into the chunks it is streamed in.
+
+    Paragraphs are split into sentences so the first chunk is short and can
+    be flushed as soon as the intent is known.
+    """
+    chunks = []
+    for paragraph in text.split("\n\n"):
+        chunks.extend(s for s in _SENTENCE_END.split(paragraph.strip()) if s)
+    return tuple(chunks)
+
+
+def compile_reply_chunks(responses):
+    """Pre-split every reply in a responses catalog, once, at startup"""
+    return {
+        intent: tuple(split_reply(reply) for reply in replies)
+        for intent, replies in responses.items()
+    }
+
+
+def sse_event(data, event=None):
+    """Encode one Server-Sent Event as bytes"""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    for line in data.split("\n"):
+        lines.append(f"data: {line}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def stream_reply(intent, chunks):
+    """Yield an intent event, one chunk event per reply chunk, then done.
+
+    chunks is one of the tuples from compile_reply_chunks(), so a connection
+    only holds references into the shared catalog, never a copy of the reply.
+    """
+    yield sse_event(json.dumps({"intent": intent}), event="intent")
+    for chunk in chunks:
+        yield sse_event(chunk)
+    yield sse_event("", event="done")
@@ -0,0 +1,103 @@
+# Character n-gram TF-IDF intent classifier, used when no keyword matches
+#
+# Every intent is one L2-normalised TF-IDF row. The matrix is stored
+# transposed (one row per n-gram, listing the intents that contain it), so
+# scoring a message only touches the n-grams it actually has: one sparse
+# vector-matrix product over those rows gives the cosine score for every intent.
+# N-grams outside the vocabulary add nothing to the product but still count
+# towards the message's norm.
+import math
+import re
+from collections import Counter
+
+NGRAM_SIZES = (3, 4, 5)
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def char_ngrams(text, sizes=NGRAM_SIZES):
+    """Count character n-grams of each word, padded with spaces at its edges"""
+    counts = Counter()
+    for word in _WORD.findall(text.lower()):
+        padded = f" {word} "
+        for n in sizes:
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+    return counts
+
+
+class TfidfIntentClassifier:
+    """Scores a message against every intent with one sparse product.
+
+    documents maps intent -> list of example texts (keywords, phrasings).
+    """
+
+    def __init__(self, documents, sizes=NGRAM_SIZES):
+        import numpy as np
+        from scipy import sparse
+
+        self._np = np
+        self.sizes = sizes
+        self.intents = list(documents)
+        vocabulary = {}
+        rows, cols, counts = [], [], []
+        for row, intent in enumerate(self.intents):
+            grams = Counter()
+            for text in documents[intent]:
+                grams.update(char_ngrams(text, sizes))
+            for gram, count in grams.items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(gram, len(vocabulary)))
+                counts.append(count)
+        self.vocabulary = vocabulary
+
+        shape = (len(self.intents), len(vocabulary))
+        matrix = sparse.csr_matrix((counts, (rows, cols)), shape=shape, dtype=np.float32)
+        df = np.bincount(matrix.indices, minlength=shape[1])
+        self.idf = (np.log((1 + shape[0]) / (1 + df)) + 1).astype(np.float32)
+        # What a gram no intent contains would get (df = 0)
+        self.max_idf = math.log(1 + shape[0]) + 1
+
+        # Sublinear tf, idf weighting, then unit-length rows
+        matrix.data = (1 + np.log(matrix.data)) * self.idf[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        matrix = sparse.diags(1 / norms).dot(matrix).astype(np.float32)
+        self._postings = matrix.T.tocsr()
+
+    def __len__(self):
+        return len(self.intents)
+
+    def scores(self, text):
+        """Return cosine similarity of text against every intent.
+
+        The message's length includes the n-grams no intent has, weighted
+        with the largest idf, so a message sharing a few grams with an intent
+        but mostly about something else scores low.
+        """
+        np = self._np
+        grams = char_ngrams(text, self.sizes)
+        cols, weights = [], []
+        unknown = 0.0
+        for gram, count in grams.items():
+            col = self.vocabulary.get(gram)
+            if col is not None:
+                cols.append(col)
+                weights.append((1 + math.log(count)) * self.idf[col])
+            else:
+                unknown += ((1 + math.log(count)) * self.max_idf) ** 2
+        if not cols:
+            return np.zeros(len(self.intents), dtype=np.float32)
+        weights = np.asarray(weights, dtype=np.float32)
+        weights /= math.sqrt(float(weights.dot(weights)) + unknown)
+        return self._postings[cols].T.dot(weights)
+
+    def top_k(self, text, k=3):
+        """Return up to k (intent, confidence) pairs, best first"""
+        np = self._np
+        scores = self.scores(text)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.intents[i], float(scores[i])) for i in best if scores[i] > 0]
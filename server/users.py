@@ -0,0 +1,90 @@
+# In-memory user accounts for the API routes
+import re
+import threading
+
+USERNAME = re.compile(r"^[A-Za-z0-9_.-]{3,32}$")
+EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+STUDENT_ID = re.compile(r"^\d{8}$")
+
+
+class User:
+    __slots__ = ("id", "username", "password_hash", "email", "student_id", "full_name",
+                 "staff")
+
+    def __init__(self, id, username, password_hash, email=None, student_id=None,
+                 full_name=None, staff=False):
+        self.id = id
+        self.username = username
+        self.password_hash = password_hash
+        self.email = email
+        self.student_id = student_id
+        self.full_name = full_name
+        # Counselling staff; only granted through the SEED_USERS config, never by registering
+        self.staff = staff
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "studentId": self.student_id,
+            "fullName": self.full_name,
+        }
+
+
+def validate_registration(data):
+    """Return {field: problem} for a registration payload; empty when valid"""
+    errors = {}
+    username = data.get("username")
+    if not isinstance(username, str) or not USERNAME.match(username):
+        errors["username"] = "3-32 letters, digits, '.', '_' or '-'"
+    password = data.get("password")
+    if not isinstance(password, str) or len(password) < 8:
+        errors["password"] = "at least 8 characters"
+    email = data.get("email")
+    if email is not None and (not isinstance(email, str) or not EMAIL.match(email)):
+        errors["email"] = "not a valid email address"
+    student_id = data.get("studentId")
+    if student_id is not None and (not isinstance(student_id, str)
+                                   or not STUDENT_ID.match(student_id)):
+        errors["studentId"] = "8 digits"
+    full_name = data.get("fullName")
+    if full_name is not None and (not isinstance(full_name, str) or not full_name.strip()):
+        errors["fullName"] = "must not be empty"
+    return errors
+
+
+class UserStore:
+    """Users keyed by case-folded username"""
+
+    def __init__(self):
+        self._users = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self._users)
+
+    def get(self, username):
+        return self._users.get(username.casefold())
+
+    def get_by_id(self, user_id):
+        return self._by_id.get(user_id)
+
+    def add(self, username, password_hash, **fields):
+        """Create a user; returns None if the username is taken"""
+        key = username.casefold()
+        with self._lock:
+            if key in self._users:
+                return None
+            user = User(self._next_id, username, password_hash, **fields)
+            self._users[key] = user
+            self._by_id[user.id] = user
+            self._next_id += 1
+        return user
+
+    def set_password_hash(self, username, password_hash):
+        user = self.get(username)
+        if user is not None:
+            user.password_hash = password_hash
@@ -15,7 +15,9 @@ export const users = pgTable("users", {
 export const appointments = pgTable("appointments", {
   id: serial("id").primaryKey(),
   userId: integer("user_id").notNull(),
+  counselorId: integer("counselor_id"),
   date: text("date").notNull(), 
+  durationMinutes: integer("duration_minutes").notNull().default(60),
   type: text("type").notNull(),
   status: text("status").default("pending"),
   notes: text("notes"),
@@ -50,6 +52,8 @@ export const insertAppointmentSchema = createInsertSchema(appointments)
     type: z.enum(["counseling", "therapy", "group"], {
       required_error: "Please select a session type",
     }),
+    counselorId: z.number().int().positive().optional(),
+    durationMinutes: z.number().int().min(15).max(240).optional(),
     notes: z.string().optional(),
   });
 
@@ -8,6 +8,28 @@ from tests.show_unauthorized_access_test import TestUnauthorizedAccess
 from tests.show_sql_injection_test import TestSQLInjectionPrevention
 # This would import TDD tests
 from tests.tdd_profile_feature import TestUserProfileFeature
+from tests.test_intents import TestIntentMatcher
+from tests.test_chatbot import TestChatbot, TestStreamingHelpers
+from tests.test_asgi import TestASGIChatbot
+from tests.test_conversation import TestConversationStore, TestChatbotSessions
+from tests.test_catalog import TestCatalog
+from tests.test_tfidf import TestTfidfClassifier, TestChatbotFallback
+from tests.test_intent_cache import TestNormalizeMessage, TestIntentCache
+from tests.test_json_provider import TestJSONProvider
+from tests.test_scanner import TestRequestScanner, TestBodyScanner, TestScannerHook
+from tests.test_security_events import TestSecurityEventLog, TestSecurityEventHook
+from tests.test_rate_limit import TestTokenBucketLimiter, TestSharedTokenBucketLimiter, TestLoginRateLimit
+from tests.test_credentials import TestCredentialService, TestRegistrationAndLogin
+from tests.test_session_tokens import TestSessionTokens, TestSessionRoutes
+from tests.test_access_policy import TestPolicyTable, TestAccessPolicyHook
+from tests.test_appointments import TestParseDate, TestAppointmentBatch
+from tests.test_appointment_store import TestIntervalIndex, TestAppointmentStore, TestAppointmentRoutes
+from tests.test_availability import TestAvailabilityEngine, TestAvailabilityRoutes
+from tests.test_mood_store import TestRollup, TestMoodStore, TestMoodRoutes
+from tests.test_mood_analytics import TestMoodAnalytics, TestMoodAnalyticsRoutes
+from tests.test_pagination import TestCursors, TestKeysetPages, TestPaginatedRoutes
+from tests.test_resource_search import TestSearchIndex, TestResourceRoutes
+from tests.test_resource_cache import TestResourceCatalogCache, TestResourceCatalogRoutes
 
 def run_tdd_demonstration():
     """Run a demonstration of Test-Driven Development"""
@@ -55,6 +77,51 @@ def run_test_suite():
     suite.addTests(loader.loadTestsFromTestCase(TestUnauthorizedAccess))
     suite.addTests(loader.loadTestsFromTestCase(TestSQLInjectionPrevention))
     suite.addTests(loader.loadTestsFromTestCase(TestUserProfileFeature))
+    suite.addTests(loader.loadTestsFromTestCase(TestIntentMatcher))
+    suite.addTests(loader.loadTestsFromTestCase(TestChatbot))
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamingHelpers))
+    suite.addTests(loader.loadTestsFromTestCase(TestASGIChatbot))
+    suite.addTests(loader.loadTestsFromTestCase(TestConversationStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestChatbotSessions))
+    suite.addTests(loader.loadTestsFromTestCase(TestCatalog))
+    suite.addTests(loader.loadTestsFromTestCase(TestTfidfClassifier))
+    suite.addTests(loader.loadTestsFromTestCase(TestChatbotFallback))
+    suite.addTests(loader.loadTestsFromTestCase(TestNormalizeMessage))
+    suite.addTests(loader.loadTestsFromTestCase(TestIntentCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestJSONProvider))
+    suite.addTests(loader.loadTestsFromTestCase(TestRequestScanner))
+    suite.addTests(loader.loadTestsFromTestCase(TestBodyScanner))
+    suite.addTests(loader.loadTestsFromTestCase(TestScannerHook))
+    suite.addTests(loader.loadTestsFromTestCase(TestSecurityEventLog))
+    suite.addTests(loader.loadTestsFromTestCase(TestSecurityEventHook))
+    suite.addTests(loader.loadTestsFromTestCase(TestTokenBucketLimiter))
+    suite.addTests(loader.loadTestsFromTestCase(TestSharedTokenBucketLimiter))
+    suite.addTests(loader.loadTestsFromTestCase(TestLoginRateLimit))
+    suite.addTests(loader.loadTestsFromTestCase(TestCredentialService))
+    suite.addTests(loader.loadTestsFromTestCase(TestRegistrationAndLogin))
+    suite.addTests(loader.loadTestsFromTestCase(TestSessionTokens))
+    suite.addTests(loader.loadTestsFromTestCase(TestSessionRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestPolicyTable))
+    suite.addTests(loader.loadTestsFromTestCase(TestAccessPolicyHook))
+    suite.addTests(loader.loadTestsFromTestCase(TestParseDate))
+    suite.addTests(loader.loadTestsFromTestCase(TestAppointmentBatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestIntervalIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestAppointmentStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestAppointmentRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestAvailabilityEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestAvailabilityRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestRollup))
+    suite.addTests(loader.loadTestsFromTestCase(TestMoodStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestMoodRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestMoodAnalytics))
+    suite.addTests(loader.loadTestsFromTestCase(TestMoodAnalyticsRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestCursors))
+    suite.addTests(loader.loadTestsFromTestCase(TestKeysetPages))
+    suite.addTests(loader.loadTestsFromTestCase(TestPaginatedRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestSearchIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestResourceRoutes))
+    suite.addTests(loader.loadTestsFromTestCase(TestResourceCatalogCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestResourceCatalogRoutes))
 
     # Create test runner
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,100 @@
+import unittest
+from server import create_app
+from server.access_policy import ALLOW, DEFAULT_POLICIES, DENY, REQUIRE_AUTH, Policy, PolicyTable
+from tests.test_config import get_auth_headers, get_test_app
+
+
+class TestPolicyTable(unittest.TestCase):
+    def setUp(self):
+        """Build a small policy table"""
+        self.table = PolicyTable([
+            Policy("api", "/api", REQUIRE_AUTH),
+            Policy("login", "/api/login", ALLOW),
+            Policy("admin", "/admin", DENY),
+            Policy("reports_read", "/api/reports", ALLOW, methods=["GET"]),
+        ])
+
+    def decision(self, method, path):
+        policy = self.table.decide(method, path)
+        return policy.name if policy else None
+
+    def test_deepest_prefix_wins(self):
+        """Test the most specific matching prefix decides"""
+        self.assertEqual(self.decision("GET", "/api/appointments"), "api")
+        self.assertEqual(self.decision("POST", "/api/login"), "login")
+        self.assertEqual(self.decision("GET", "/admin/users/1"), "admin")
+        self.assertIsNone(self.decision("GET", "/"))
+
+    def test_whole_segments_only(self):
+        """Test a prefix does not match part of a segment"""
+        self.assertIsNone(self.decision("GET", "/administrator"))
+        self.assertEqual(self.decision("GET", "/api/logins"), "api")
+        self.assertEqual(self.decision("GET", "//admin//users"), "admin")
+
+    def test_method_rules(self):
+        """Test method-specific policies fall back to broader ones"""
+        self.assertEqual(self.decision("GET", "/api/reports/weekly"), "reports_read")
+        self.assertEqual(self.decision("DELETE", "/api/reports/weekly"), "api")
+
+    def test_counters(self):
+        """Test each decision is counted against its policy"""
+        for path in ("/admin", "/admin/x", "/api/login", "/static/app.js"):
+            self.table.decide("GET", path)
+        stats = self.table.stats()
+        self.assertEqual(stats["decisions"]["admin"]["count"], 2)
+        self.assertEqual(stats["decisions"]["login"]["count"], 1)
+        self.assertEqual(stats["unmatched"], 1)
+
+    def test_invalid_policies(self):
+        """Test unknown decisions and duplicate prefixes are rejected"""
+        with self.assertRaises(ValueError):
+            Policy("bad", "/x", "maybe")
+        with self.assertRaises(ValueError):
+            PolicyTable([Policy("a", "/x", DENY), Policy("b", "/x/", ALLOW)])
+
+
+class TestAccessPolicyHook(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up test app"""
+        cls.app = get_test_app()
+
+    def setUp(self):
+        """Set up test client"""
+        self.client = self.app.test_client()
+
+    def test_denied_for_every_method(self):
+        """Test denied prefixes are refused whatever the method or route"""
+        for method, url in (("GET", "/admin"), ("POST", "/admin/users"),
+                            ("DELETE", "/api/internal/logs"), ("GET", "/api/user-data")):
+            response = self.client.open(url, method=method)
+            self.assertEqual(response.status_code, 403)
+            self.assertIn("Access Denied", response.get_json()["message"])
+
+    def test_require_auth(self):
+        """Test protected prefixes need a valid session"""
+        response = self.client.get("/api/user")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("please log in", response.get_json()["message"].lower())
+        headers = get_auth_headers(self.client)
+        self.assertEqual(self.client.get("/api/user", headers=headers).status_code, 200)
+        counts = self.app.extensions["access_policy"].stats()["decisions"]
+        self.assertGreaterEqual(counts["user"]["count"], 2)
+
+    def test_allow(self):
+        """Test allowed prefixes pass, even under a denied one, without a security event"""
+        app = create_app({'TESTING': True, 'ACCESS_POLICIES': DEFAULT_POLICIES + (
+            Policy("public_resources", "/api/resources", ALLOW),
+            Policy("admin_health", "/admin/health", ALLOW),
+        )})
+        client = app.test_client()
+        events = app.extensions["security_events"]
+        self.assertEqual(client.get("/api/resources").status_code, 200)
+        self.assertEqual(client.get("/admin/health").status_code, 404)
+        self.assertEqual(events.stats()["emitted"], 0)
+        self.assertEqual(client.get("/admin").status_code, 403)
+        self.assertEqual(events.stats()["emitted"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
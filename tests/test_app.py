@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import json
-from tests.test_config import get_test_app
+from tests.test_config import get_auth_headers, get_test_app
 from flask import request
 
 class TestMentalHealthApp(unittest.TestCase):
@@ -36,7 +36,7 @@ class TestMentalHealthApp(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
 
         # Try to book an appointment with auth header
-        headers = {'Authorization': 'Bearer test-token'}
+        headers = get_auth_headers(self.client)
         response = self.client.post("/api/appointments", 
                                   json=self.appointment_data,
                                   headers=headers)
@@ -47,7 +47,7 @@ class TestMentalHealthApp(unittest.TestCase):
 
     def test_invalid_appointment_date(self):
         """Test invalid appointment date handling"""
-        headers = {'Authorization': 'Bearer test-token'}
+        headers = get_auth_headers(self.client)
         invalid_dates = [
             "invalid-date",
             "2023-03-20 14:30:00",  # Past date
@@ -71,7 +71,7 @@ class TestMentalHealthApp(unittest.TestCase):
 
     def test_appointment_validation(self):
         """Test appointment data validation"""
-        headers = {'Authorization': 'Bearer test-token'}
+        headers = get_auth_headers(self.client)
         invalid_appointments = [
             {"date": "2025-03-20 14:30:00"},  # Missing type
             {"type": "counseling"},            # Missing date
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from server.appointment_store import (COUNSELOR_CONFLICT, USER_CONFLICT, AppointmentStore,
+                                      IntervalIndex)
+from tests.test_config import get_auth_headers, get_test_app
+
+
+def booking(user_id, date, counselor_id=None, duration=None):
+    return {
+        "user_id": user_id,
+        "counselor_id": counselor_id,
+        "date": datetime.strptime(date, "%Y-%m-%d %H:%M:%S"),
+        "duration_minutes": duration,
+        "type": "counseling",
+    }
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_conflicts(self):
+        """Test overlaps are found and touching intervals are allowed"""
+        index = IntervalIndex.build([("c1", 100, 200, 1), ("c1", 300, 400, 2)])
+        self.assertEqual(index.conflict("c1", 150, 160), 1)
+        self.assertEqual(index.conflict("c1", 50, 101), 1)
+        self.assertEqual(index.conflict("c1", 250, 301), 2)
+        self.assertEqual(index.conflict("c1", 90, 500), 1)
+        self.assertIsNone(index.conflict("c1", 200, 300))
+        self.assertIsNone(index.conflict("c2", 150, 160))
+        index.add("c1", 200, 300, 3)
+        self.assertEqual(index.conflict("c1", 250, 260), 3)
+        self.assertEqual([i[2] for i in index.between("c1", 150, 350)], [1, 3, 2])
+
+
+class TestAppointmentStore(unittest.TestCase):
+    def setUp(self):
+        """Create a store on a temporary SQLite file"""
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.url = f"sqlite:///{self.path}"
+        self.store = AppointmentStore(self.url)
+        self.addCleanup(self.store.engine.dispose)
+
+    def test_user_and_counselor_conflicts(self):
+        """Test double bookings are refused for the user and the counselor"""
+        row, error = self.store.book(booking(1, "2030-03-20 14:00:00", counselor_id=7))
+        self.assertIsNone(error)
+        self.assertEqual(row["status"], "confirmed")
+        self.assertEqual(self.store.book(booking(1, "2030-03-20 14:30:00"))[1], USER_CONFLICT)
+        self.assertEqual(self.store.book(booking(2, "2030-03-20 14:59:59", counselor_id=7))[1],
+                         COUNSELOR_CONFLICT)
+        self.assertIsNone(self.store.book(booking(2, "2030-03-20 15:00:00", counselor_id=7))[1])
+        self.assertIsNone(self.store.book(booking(3, "2030-03-20 14:30:00", counselor_id=8))[1])
+        self.assertEqual(self.store.stats()["conflicts"], 2)
+
+    def test_conflicts_within_batch(self):
+        """Test bookings in one batch are checked against each other"""
+        results = self.store.book_many([
+            booking(1, "2030-03-20 09:00:00", counselor_id=7, duration=90),
+            booking(2, "2030-03-20 10:00:00", counselor_id=7),
+            booking(2, "2030-03-20 10:30:00", counselor_id=8),
+        ])
+        self.assertEqual([error for _, error in results], [None, COUNSELOR_CONFLICT, None])
+        self.assertEqual(len(self.store.for_user(2)), 1)
+
+    def test_listener_failure_keeps_booking(self):
+        """Test a listener that raises doesn't fail a committed booking"""
+        class Broken:
+            def appointment_booked(self, *args):
+                raise ValueError("broken")
+
+        self.store.listeners.append(Broken())
+        row, error = self.store.book(booking(1, "2030-03-20 14:00:00", counselor_id=7))
+        self.assertIsNone(error)
+        self.assertEqual(len(self.store.for_user(1)), 1)
+        self.assertEqual(self.store.stats()["listener_errors"], 1)
+
+    def test_index_rebuilt_on_restart(self):
+        """Test a new store over the same database sees existing bookings"""
+        self.store.book(booking(1, "2030-03-20 14:00:00", counselor_id=7))
+        restarted = AppointmentStore(self.url)
+        self.addCleanup(restarted.engine.dispose)
+        self.assertEqual(restarted.stats()["indexed"], 1)
+        self.assertEqual(restarted.book(booking(2, "2030-03-20 14:15:00", counselor_id=7))[1],
+                         COUNSELOR_CONFLICT)
+        row, _ = restarted.book(booking(1, "2030-03-21 14:00:00"))
+        self.assertEqual(row["id"], 2)
+
+
+class TestAppointmentRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up a fresh app and log in"""
+        self.app = get_test_app()
+        self.client = self.app.test_client()
+        self.headers = get_auth_headers(self.client)
+
+    def test_book_list_and_conflict(self):
+        """Test bookings persist, are listed and clash with each other"""
+        appointment = {"date": "2030-03-20 14:30:00", "type": "therapy", "counselorId": 3}
+        response = self.client.post("/api/appointments", json=appointment, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["counselorId"], 3)
+        response = self.client.post("/api/appointments", json=appointment, headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("error", response.get_json())
+
+        listed = self.client.get("/api/appointments", headers=self.headers).get_json()
+        self.assertEqual([a["date"] for a in listed["appointments"]], ["2030-03-20 14:30:00"])
+
+    def test_invalid_counselor_and_duration(self):
+        """Test counselor ids and durations are validated"""
+        for extra in ({"counselorId": "3"}, {"counselorId": 0}, {"counselorId": 999},
+                      {"durationMinutes": 5}, {"durationMinutes": True}):
+            response = self.client.post("/api/appointments", headers=self.headers, json={
+                "date": "2030-03-20 14:30:00", "type": "therapy", **extra})
+            self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from datetime import datetime
+from server.appointments import MAX_BATCH_APPOINTMENTS, parse_date
+from tests.test_config import get_auth_headers, get_test_app
+
+
+class TestParseDate(unittest.TestCase):
+    def test_matches_strptime(self):
+        """Test the fast parser agrees with strptime on the booking format"""
+        for text in ("2030-03-20 14:30:00", "2028-02-29 00:00:00", "2030-12-31 23:59:59",
+                     # Not zero-padded, so parsed by strptime itself
+                     "2030-1-07 10:00:00", "2030-03-20 9:05:00", "2030-3-7 1:2:3"):
+            self.assertEqual(parse_date(text), datetime.strptime(text, "%Y-%m-%d %H:%M:%S"))
+
+    def test_rejects_other_formats(self):
+        """Test anything strptime would reject is rejected"""
+        for text in ("invalid-date", "2025-13-45 25:70:00", "2030-03-20T14:30:00",
+                     "2030-03-20 14:30", "20300320 143000", "2029-02-29 10:00:00",
+                     "2030-03-2O 14:30:00", "", None, 20300320):
+            with self.assertRaises(ValueError):
+                parse_date(text)
+
+
+class TestAppointmentBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up test app and log in once"""
+        cls.app = get_test_app()
+        cls.headers = get_auth_headers(cls.app.test_client())
+
+    def setUp(self):
+        """Set up test client"""
+        self.client = self.app.test_client()
+
+    def test_per_item_results(self):
+        """Test valid bookings are confirmed and each invalid one gets its error"""
+        response = self.client.post("/api/appointments/batch", headers=self.headers, json={
+            "appointments": [
+                {"date": "2030-03-20 14:30:00", "type": "group"},
+                {"date": "2030-03-20 14:30:00"},
+                {"date": "2020-03-20 14:30:00", "type": "group"},
+                {"date": "2030-02-30 14:30:00", "type": "group"},
+                {"date": "2030-03-21 10:00:00", "type": "yoga"},
+                "not an object",
+            ]
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual((data["accepted"], data["rejected"]), (1, 5))
+        self.assertEqual(data["results"][0]["status"], "confirmed")
+        self.assertEqual([r.get("error") for r in data["results"][1:]], [
+            "Missing required fields",
+            "Cannot book appointments in the past",
+            "Invalid date format",
+            "Invalid appointment type",
+            "Missing required fields",
+        ])
+
+    def test_bad_batches(self):
+        """Test malformed and oversized batches are rejected as a whole"""
+        for body in ({}, {"appointments": "x"},
+                     {"appointments": [{}] * (MAX_BATCH_APPOINTMENTS + 1)}):
+            response = self.client.post("/api/appointments/batch", headers=self.headers,
+                                        json=body)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.get_json())
+
+    def test_requires_login(self):
+        """Test the batch endpoint is covered by the appointments policy"""
+        response = self.client.post("/api/appointments/batch", json={"appointments": []})
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
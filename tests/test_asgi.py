@@ -0,0 +1,98 @@
+import unittest
+import asyncio
+import json
+import threading
+from server.asgi import create_asgi_app
+from server.chatbot import Chatbot, DEFAULT_RESPONSE
+
+RESPONSES = {
+    "stress": ["Try deep breathing exercises!"],
+    "anxiety": ["Meditation can help reduce anxiety. Would you like some relaxation techniques?"],
+}
+
+
+def call_asgi(app, method, path, body=b"", query=b""):
+    """Drive an ASGI app with one HTTP request and collect the response"""
+    sent = []
+    chunks = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return chunks.pop(0) if chunks else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": []}
+    asyncio.run(app(scope, receive, send))
+    status = sent[0]["status"]
+    headers = dict(sent[0]["headers"])
+    return status, headers, b"".join(m.get("body", b"") for m in sent[1:])
+
+
+class TestASGIChatbot(unittest.TestCase):
+    def setUp(self):
+        """Build an ASGI app over a small catalog"""
+        self.app = create_asgi_app(Chatbot(RESPONSES), max_body_size=1024)
+
+    def test_chatbot(self):
+        """Test /chatbot keeps the Flask response contract"""
+        status, headers, body = call_asgi(self.app, "POST", "/chatbot", b'{"message": "STRESS"}')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"content-type"], b"application/json")
+        self.assertEqual(json.loads(body), {"response": "Try deep breathing exercises!"})
+
+    def test_batch(self):
+        """Test /chatbot/batch returns results in order and validates input"""
+        payload = json.dumps({"messages": ["hi", "anxiety"]}).encode()
+        status, _, body = call_asgi(self.app, "POST", "/chatbot/batch", payload)
+        self.assertEqual(status, 200)
+        results = json.loads(body)["responses"]
+        self.assertEqual([r["intent"] for r in results], [None, "anxiety"])
+        self.assertEqual(results[0]["response"], DEFAULT_RESPONSE)
+
+        status, _, body = call_asgi(self.app, "POST", "/chatbot/batch", b'{"messages": "hi"}')
+        self.assertEqual(status, 400)
+        self.assertIn("error", json.loads(body))
+
+    def test_bot_runs_off_the_event_loop(self):
+        """Test replies are computed in a worker thread, not on the loop's thread"""
+        threads = []
+
+        class RecordingBot(Chatbot):
+            def reply(self, *args):
+                threads.append(threading.get_ident())
+                return super().reply(*args)
+
+            def reply_batch(self, *args):
+                threads.append(threading.get_ident())
+                return super().reply_batch(*args)
+
+        app = create_asgi_app(RecordingBot(RESPONSES))
+        self.assertEqual(call_asgi(app, "POST", "/chatbot", b'{"message": "stress"}')[0], 200)
+        self.assertEqual(call_asgi(app, "POST", "/chatbot/batch", b'{"messages": ["hi"]}')[0], 200)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_stream(self):
+        """Test /chatbot/stream sends SSE chunks over GET"""
+        status, headers, body = call_asgi(self.app, "GET", "/chatbot/stream", query=b"message=anxiety")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"x-chatbot-intent"], b"anxiety")
+        self.assertIn(b"data: Meditation can help reduce anxiety.\n\n", body)
+        self.assertTrue(body.endswith(b"event: done\ndata: \n\n"))
+
+    def test_errors(self):
+        """Test unknown routes, bad methods, bad JSON and oversized bodies"""
+        self.assertEqual(call_asgi(self.app, "POST", "/missing")[0], 404)
+        self.assertEqual(call_asgi(self.app, "GET", "/chatbot")[0], 405)
+        self.assertEqual(call_asgi(self.app, "POST", "/chatbot", b"not json")[0], 400)
+        self.assertEqual(call_asgi(self.app, "POST", "/chatbot", b"x" * 2048)[0], 413)
+        for body in (b'{"message": ["stress"]}', b'{"message": "hi", "session_id": [1]}'):
+            for path in ("/chatbot", "/chatbot/stream"):
+                self.assertEqual(call_asgi(self.app, "POST", path, body)[0], 400, (path, body))
+        query = b"message=hi&session_id=" + b"a" * 129
+        self.assertEqual(call_asgi(self.app, "GET", "/chatbot/stream", query=query)[0], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
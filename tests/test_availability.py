@@ -0,0 +1,211 @@
+import unittest
+from datetime import date, datetime, timedelta
+from server.appointment_store import AppointmentStore, to_seconds
+from server.availability import AvailabilityEngine, get_availability
+from tests.test_config import get_auth_headers, get_test_app
+
+# A Wednesday
+DAY = "2030-03-20"
+# A Wednesday within the booking horizon, for the routes
+SOON = date.today() + timedelta(days=7 + (2 - date.today().weekday()) % 7)
+
+
+def at(time, day=DAY):
+    return datetime.fromisoformat(f"{day} {time}")
+
+
+def book(store, time, counselor_id, duration=60, user_id=None, day=DAY):
+    row, error = store.book({
+        "user_id": user_id if user_id is not None else counselor_id * 1000 + len(store.by_user),
+        "counselor_id": counselor_id,
+        "date": at(time, day),
+        "duration_minutes": duration,
+        "type": "counseling",
+    })
+    assert error is None, error
+    return row
+
+
+class TestAvailabilityEngine(unittest.TestCase):
+    def setUp(self):
+        """Create a store with an engine listening to it, two days before DAY"""
+        self.store = AppointmentStore()
+        self.addCleanup(self.store.engine.dispose)
+        self.today = date(2030, 3, 18)
+        self.engine = AvailabilityEngine((1, 2), bookings=self.store.counselor_bookings,
+                                         clock=lambda: self.today)
+        self.store.listeners.append(self.engine)
+
+    def test_next_available_skips_bookings(self):
+        """Test the earliest free run long enough for the session is returned"""
+        self.assertEqual(self.engine.next_available(60, at("08:00:00"), 1), (1, at("09:00:00")))
+        book(self.store, "09:00:00", 1)
+        book(self.store, "10:30:00", 1)
+        # 10:00-10:30 is too short for an hour
+        self.assertEqual(self.engine.next_available(60, at("08:00:00"), 1), (1, at("11:30:00")))
+        self.assertEqual(self.engine.next_available(30, at("08:00:00"), 1), (1, at("10:00:00")))
+        self.assertEqual(self.engine.next_available(60, at("08:00:00")), (2, at("09:00:00")))
+        # Starts are rounded up to the next slot
+        self.assertEqual(self.engine.next_available(60, at("12:05:00"), 1), (1, at("12:15:00")))
+
+    def test_rolls_over_closing_time_and_weekends(self):
+        """Test searches continue on the next working day"""
+        self.assertEqual(self.engine.next_available(90, at("15:31:00"), 2),
+                         (2, at("09:00:00", "2030-03-21")))
+        self.assertEqual(self.engine.next_available(60, at("16:30:00", "2030-03-22")),
+                         (1, at("09:00:00", "2030-03-25")))
+
+    def test_cancel_frees_slots(self):
+        """Test cancelling frees the slots but not ones a neighbour still uses"""
+        first = book(self.store, "09:00:00", 1, duration=50)
+        book(self.store, "09:50:00", 1, duration=40)
+        self.store.cancel(first["id"], first["user_id"])
+        # 09:45-10:00 is still shared with the 09:50 booking
+        self.assertEqual(self.engine.free_starts(15, date(2030, 3, 20), 1)[:4],
+                         [at("09:00:00"), at("09:15:00"), at("09:30:00"), at("10:30:00")])
+
+    def test_free_starts(self):
+        """Test range queries list every start with room for the session"""
+        book(self.store, "10:00:00", 2, duration=240)
+        starts = self.engine.free_starts(90, date(2030, 3, 20), 2)
+        self.assertEqual(starts, [at("14:00:00"), at("14:15:00"), at("14:30:00"),
+                                  at("14:45:00"), at("15:00:00"), at("15:15:00"),
+                                  at("15:30:00")])
+        self.assertEqual(self.engine.free_starts(90, date(2030, 3, 20), 2, at("15:00:00")),
+                         starts[-3:])
+        self.assertEqual(self.engine.free_starts(15, date(2030, 3, 23), 2), [])
+
+    def test_matches_brute_force(self):
+        """Test the bitmaps agree with checking every slot against the bookings"""
+        for i, (time, counselor, duration) in enumerate([
+                ("09:10:00", 1, 30), ("11:00:00", 1, 90), ("13:05:00", 1, 45),
+                ("10:00:00", 2, 60), ("15:40:00", 2, 80)]):
+            book(self.store, time, counselor, duration, user_id=i)
+        for counselor in (1, 2):
+            for minutes in (15, 60, 90):
+                expected = []
+                for slot in range(32):
+                    start = to_seconds(at("09:00:00")) + slot * 900
+                    end = start + minutes * 60
+                    if end <= to_seconds(at("17:00:00")) and not any(
+                            s < end and e > start
+                            for s, e, _ in self.store.counselor_bookings(counselor, 0, 1 << 62)):
+                        expected.append(slot)
+                starts = self.engine.free_starts(minutes, date(2030, 3, 20), counselor)
+                self.assertEqual([(s.hour - 9) * 4 + s.minute // 15 for s in starts], expected)
+
+    def test_queries_do_not_store_days(self):
+        """Test only booked days within the horizon are kept"""
+        self.engine.next_available(60, at("17:00:00"))
+        self.engine.free_starts(60, date(2030, 5, 1), 1)
+        self.assertEqual(self.engine.stats()["days"], 0)
+        book(self.store, "09:00:00", 1)
+        self.assertEqual(self.engine.stats()["days"], 1)
+        for year in (2020, 2031, 9999):
+            self.engine.appointment_booked(1, to_seconds(datetime(year, 12, 31, 23, 30)),
+                                           to_seconds(datetime(year, 12, 31, 23, 30)) + 3600)
+        self.assertEqual(list(self.engine._days), [date(2030, 3, 20).toordinal()])
+        self.assertEqual(self.engine.free_starts(60, date(9999, 12, 31), 1), [])
+
+    def test_window_moves_with_the_clock(self):
+        """Test past days are dropped and days coming within the horizon are loaded"""
+        book(self.store, "09:00:00", 1)
+        later = "2030-06-26"
+        book(self.store, "09:00:00", 1, day=later)
+        self.assertEqual(self.engine.stats()["days"], 1)
+        self.assertEqual(self.engine.free_starts(60, date(2030, 6, 26), 1), [])
+        self.today = date(2030, 4, 1)
+        self.assertEqual(self.engine.free_starts(60, date(2030, 6, 26), 1)[0],
+                         at("10:00:00", later))
+        self.assertEqual(list(self.engine._days), [date(2030, 6, 26).toordinal()])
+        self.assertEqual(self.engine.next_available(60, at("08:00:00"), 1),
+                         (1, at("09:00:00", "2030-04-01")))
+
+
+class TestAvailabilityRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up a fresh app and log in"""
+        self.app = get_test_app()
+        self.client = self.app.test_client()
+        self.headers = get_auth_headers(self.client)
+
+    def get(self, url):
+        return self.client.get(url, headers=self.headers)
+
+    def test_next_follows_bookings_and_cancellations(self):
+        """Test the endpoint sees bookings and cancellations as they happen"""
+        query = f"/api/availability/next?type=group&counselorId=2&after={SOON} 09:00:00"
+        self.assertEqual(self.get(query).get_json()["available"],
+                         {"counselorId": 2, "date": f"{SOON} 09:00:00", "durationMinutes": 90})
+        response = self.client.post("/api/appointments", headers=self.headers, json={
+            "date": f"{SOON} 09:00:00", "type": "group", "counselorId": 2})
+        self.assertEqual(response.get_json()["durationMinutes"], 90)
+        self.assertEqual(self.get(query).get_json()["available"]["date"], f"{SOON} 10:30:00")
+
+        appointment_id = response.get_json()["id"]
+        response = self.client.delete(f"/api/appointments/{appointment_id}",
+                                      headers=self.headers)
+        self.assertEqual(response.get_json()["status"], "cancelled")
+        self.assertEqual(self.get(query).get_json()["available"]["date"], f"{SOON} 09:00:00")
+        response = self.client.delete(f"/api/appointments/{appointment_id}",
+                                      headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.delete(f"/api/appointments/{10 ** 21}", headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_range(self):
+        """Test range queries return starts per day and counselor"""
+        friday, saturday = SOON + timedelta(days=2), SOON + timedelta(days=3)
+        data = self.get(f"/api/availability?type=therapy&from={friday}&to={saturday}").get_json()
+        self.assertEqual(data["durationMinutes"], 60)
+        self.assertEqual([day["date"] for day in data["days"]],
+                         [friday.isoformat(), saturday.isoformat()])
+        friday, saturday = data["days"]
+        self.assertEqual(len(friday["counselors"]), 3)
+        self.assertEqual(friday["counselors"][0]["starts"][0], f"{friday['date']} 09:00:00")
+        self.assertEqual(len(friday["counselors"][0]["starts"]), 29)
+        self.assertEqual(saturday["counselors"][0]["starts"], [])
+
+    def test_far_future_booking(self):
+        """Test a booking at the end of the calendar is saved and answered normally"""
+        get_availability(self.app)
+        response = self.client.post("/api/appointments", headers=self.headers, json={
+            "date": "9999-12-31 23:30:00", "type": "therapy", "counselorId": 1})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(get_availability(self.app).stats()["days"], 0)
+
+    def test_range_is_clamped_to_horizon(self):
+        """Test days before today and past the booking horizon are left out"""
+        today = date.today()
+        data = self.get(f"/api/availability?type=group&from={today - timedelta(days=5)}"
+                        f"&to={today + timedelta(days=2)}").get_json()
+        self.assertEqual(data["days"][0]["date"], today.isoformat())
+        self.assertEqual(len(data["days"]), 3)
+        data = self.get("/api/availability?type=group&from=2099-01-01&to=2099-01-05").get_json()
+        self.assertEqual(data["days"], [])
+        data = self.get("/api/availability/next?type=group&after=2099-01-01 09:00:00")
+        self.assertIsNone(data.get_json()["available"])
+        self.assertEqual(get_availability(self.app).stats()["days"], 0)
+
+    def test_login_required(self):
+        """Test availability is only shown to logged-in users"""
+        client = self.app.test_client()
+        for url in ("/api/availability?type=group", "/api/availability/next?type=group"):
+            self.assertEqual(client.get(url).status_code, 401)
+
+    def test_bad_queries(self):
+        """Test unknown types, counselors, dates and long ranges are rejected"""
+        for query in ("/api/availability/next", "/api/availability/next?type=yoga",
+                      "/api/availability/next?type=group&counselorId=99",
+                      "/api/availability/next?type=group&counselorId=x",
+                      "/api/availability/next?type=group&counselorId=%C2%B2",
+                      "/api/availability/next?type=group&after=tomorrow",
+                      "/api/availability?type=group&from=2030-02-30",
+                      "/api/availability?type=group&from=2030-03-20&to=2030-05-20",
+                      "/api/availability?type=group&from=2030-03-20&to=2030-03-19"):
+            response = self.get(query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn("error", response.get_json())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import json
+import os
+import tempfile
+from server.catalog import CatalogError, CatalogSnapshot, FileCatalog, parse_catalog
+from server.chatbot import Chatbot
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        """Write a catalog file to a temp directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "catalog.json")
+        self.write({
+            "stress": ["Try deep breathing exercises!"],
+            "sleep": {"keywords": ["insomnia", "can't sleep"], "replies": ["Try a wind-down routine."]},
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data):
+        with open(self.path, "w") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        # Make sure the change is visible even on coarse mtime filesystems
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_parse_catalog(self):
+        """Test both catalog entry formats and validation"""
+        intents = parse_catalog({"a": ["x"], "b": {"keywords": ["bee"], "replies": ["y"]}})
+        self.assertEqual(intents, {"a": (["a"], ["x"], []), "b": (["bee"], ["y"], [])})
+        for bad in [[], {"a": "x"}, {"a": []}, {"a": {"replies": ["x"], "keywords": [""]}}]:
+            with self.assertRaises(CatalogError):
+                parse_catalog(bad)
+
+    def test_snapshot_is_immutable(self):
+        """Test compiled snapshots can't be changed in place"""
+        snapshot = CatalogSnapshot.from_responses({"stress": ["Breathe."]})
+        with self.assertRaises(TypeError):
+            snapshot.responses["stress"] = ["changed"]
+        self.assertEqual(snapshot.responses["stress"], ("Breathe.",))
+
+    def test_keywords_map_to_intents(self):
+        """Test keywords other than the intent name are matched"""
+        bot = Chatbot(FileCatalog(self.path))
+        self.assertEqual(bot.reply("I can't sleep at all"), ("sleep", "Try a wind-down routine."))
+
+    def test_reload_swaps_snapshot(self):
+        """Test a changed file is picked up and old snapshots stay intact"""
+        catalog = FileCatalog(self.path)
+        old = catalog.snapshot
+        self.assertFalse(catalog.reload_if_changed())
+
+        self.write({"stress": ["Take a short walk."]})
+        self.assertTrue(catalog.reload_if_changed())
+        self.assertIsNot(catalog.snapshot, old)
+        self.assertEqual(catalog.snapshot.version, 2)
+        self.assertEqual(catalog.snapshot.responses["stress"], ("Take a short walk.",))
+        self.assertEqual(old.responses["stress"], ("Try deep breathing exercises!",))
+        self.assertEqual(catalog.stats()["reloads"], 1)
+        self.assertIsNotNone(catalog.stats()["last_swap_seconds"])
+
+    def test_broken_file_keeps_old_snapshot(self):
+        """Test a bad edit is reported and the live catalog is untouched"""
+        catalog = FileCatalog(self.path)
+        old = catalog.snapshot
+        self.write("{not json")
+        self.assertFalse(catalog.reload_if_changed())
+        self.assertIs(catalog.snapshot, old)
+        self.assertEqual(catalog.stats()["reload_errors"], 1)
+        self.assertIn("invalid JSON", catalog.stats()["last_error"])
+        # The broken file is not retried until it changes again
+        self.assertFalse(catalog.reload_if_changed())
+        self.assertEqual(catalog.stats()["reload_errors"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
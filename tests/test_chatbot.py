@@ -0,0 +1,121 @@
+import unittest
+import json
+from server.chatbot import DEFAULT_RESPONSE, DEFAULT_RESPONSES as responses, MAX_BATCH_MESSAGES
+from tests.test_config import get_test_app
+from server.streaming import split_reply, sse_event
+
+
+class TestChatbot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up test app"""
+        cls.app = get_test_app()
+
+    def setUp(self):
+        """Set up test client"""
+        self.client = self.app.test_client()
+
+    def test_single_message(self):
+        """Test the single-message chatbot endpoint"""
+        response = self.client.post("/chatbot", json={"message": "Exam STRESS"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response.get_json()["response"], responses["stress"])
+
+    def test_batch_preserves_order(self):
+        """Test batch results come back in request order"""
+        messages = ["I feel anxiety", "hello", "so much stress", "I feel anxiety"]
+        response = self.client.post("/chatbot/batch", json={"messages": messages})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)["responses"]
+        self.assertEqual([r["intent"] for r in data], ["anxiety", None, "stress", "anxiety"])
+        self.assertIn(data[0]["response"], responses["anxiety"])
+        self.assertEqual(data[1]["response"], DEFAULT_RESPONSE)
+        self.assertIn(data[2]["response"], responses["stress"])
+
+    def test_batch_validation(self):
+        """Test malformed batch payloads are rejected"""
+        invalid_payloads = [
+            {},
+            {"messages": "stress"},
+            {"messages": ["stress", 42]},
+            {"messages": ["hi"] * (MAX_BATCH_MESSAGES + 1)},
+        ]
+        for payload in invalid_payloads:
+            response = self.client.post("/chatbot/batch", json=payload)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.get_json())
+
+    def test_body_must_be_object(self):
+        """Test JSON bodies that are not objects are rejected, not a server error"""
+        for url in ("/chatbot", "/chatbot/batch"):
+            for payload in (["stress"], "stress", 42, None):
+                response = self.client.post(url, data=json.dumps(payload),
+                                            content_type="application/json")
+                self.assertEqual(response.status_code, 400, (url, payload))
+                self.assertEqual(response.get_json(), {"error": "Invalid JSON"})
+
+    def test_message_and_session_must_be_strings(self):
+        """Test non-string messages and long or odd session ids are rejected with 400"""
+        payloads = [
+            {"message": ["stress"]},
+            {"message": {"text": "stress"}},
+            {"message": "stress", "session_id": ["a"]},
+            {"message": "stress", "session_id": 7},
+            {"message": "stress", "session_id": ""},
+            {"message": "stress", "session_id": "a" * 129},
+            {"message": "stress", "session_id": "two words"},
+        ]
+        for url in ("/chatbot", "/chatbot/stream"):
+            for payload in payloads:
+                response = self.client.post(url, json=payload)
+                self.assertEqual(response.status_code, 400, (url, payload))
+                self.assertIn("error", response.get_json())
+        response = self.client.get("/chatbot/stream?message=hi&session_id=" + "a" * 129)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/chatbot", json={"message": "stress",
+                                                      "session_id": "a1-_" * 32})
+        self.assertEqual(response.status_code, 200)
+
+    def test_stream_reply(self):
+        """Test the streaming endpoint sends the intent first, then the reply"""
+        response = self.client.post("/chatbot/stream", json={"message": "anxiety again"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertEqual(response.headers["X-Chatbot-Intent"], "anxiety")
+
+        events = response.get_data(as_text=True).rstrip("\n").split("\n\n")
+        self.assertEqual(events[0], 'event: intent\ndata: {"intent": "anxiety"}')
+        self.assertEqual(events[-1], "event: done\ndata: ")
+        reply = " ".join(e[len("data: "):] for e in events[1:-1])
+        self.assertIn(reply, responses["anxiety"])
+
+    def test_stream_fallback_over_get(self):
+        """Test EventSource-style GET requests stream the default reply"""
+        response = self.client.get("/chatbot/stream?message=hello")
+        self.assertEqual(response.headers["X-Chatbot-Intent"], "none")
+        self.assertIn("data: I'm here to help.", response.get_data(as_text=True))
+
+    def test_session_stats(self):
+        """Test session counters are exposed and move with traffic"""
+        before = self.client.get("/chatbot/stats").get_json()["sessions"]
+        self.client.post("/chatbot", json={"message": "stress", "session_id": "stats-test"})
+        self.client.post("/chatbot", json={"message": "stress", "session_id": "stats-test"})
+        after = self.client.get("/chatbot/stats").get_json()["sessions"]
+        self.assertEqual(after["misses"], before["misses"] + 1)
+        self.assertEqual(after["hits"], before["hits"] + 1)
+
+
+class TestStreamingHelpers(unittest.TestCase):
+    def test_split_reply(self):
+        """Test replies are split into sentences and paragraphs"""
+        text = "Breathe slowly. Count to four!\n\nThen talk to someone?"
+        self.assertEqual(split_reply(text),
+                         ("Breathe slowly.", "Count to four!", "Then talk to someone?"))
+
+    def test_sse_event(self):
+        """Test multi-line data is framed as several data lines"""
+        self.assertEqual(sse_event("a\nb", event="chunk"), b"event: chunk\ndata: a\ndata: b\n\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,26 +1,21 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-import os
+from server import create_app
+
+# The test account, testuser / Test123!. Its hash uses a cheap legacy cost so
+# creating an app stays fast; the first successful login rehashes it at the
+# configured cost.
+TEST_USER = ("testuser", "pbkdf2:sha256:1000$1ROLdsFwU8bOBz4V$"
+             "e1e1aaa73d27426ed6a648c6a1af7fa2626f96f834c01dfee4e3ce87a82d6543")
 
 def get_test_app():
     """Create and configure app for testing"""
-    app = Flask(__name__)
-    app.config.update({
+    return create_app({
         'TESTING': True,
         'SECRET_KEY': 'test_secret_key',
         'SESSION_TYPE': 'filesystem',
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
-        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        'SEED_USERS': [TEST_USER],
     })
 
-    db = SQLAlchemy(app)
-
-    # Create tables
-    with app.app_context():
-        db.create_all()
-
-    # Register routes
-    from server.routes import registerRoutes
-    registerRoutes(app)
-
-    return app
\ No newline at end of file
+def get_auth_headers(client, username='testuser', password='Test123!'):
+    """Log in and return an Authorization header carrying the session token"""
+    response = client.post('/api/login', json={'username': username, 'password': password})
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
@@ -0,0 +1,77 @@
+import unittest
+from server.chatbot import Chatbot
+from server.conversation import ConversationStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestConversationStore(unittest.TestCase):
+    def setUp(self):
+        """Build a small store on a fake clock"""
+        self.clock = FakeClock()
+        self.store = ConversationStore(max_sessions=2, ttl=60, history=3, clock=self.clock)
+
+    def test_hits_and_misses(self):
+        """Test repeat lookups return the same state"""
+        first = self.store.get("a")
+        self.assertIs(self.store.get("a"), first)
+        self.assertEqual(self.store.stats()["hits"], 1)
+        self.assertEqual(self.store.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used session is evicted at the cap"""
+        self.store.get("a")
+        self.store.get("b")
+        self.store.get("a")
+        self.store.get("c")
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.stats()["evictions"], 1)
+        self.store.get("a")
+        self.assertEqual(self.store.stats()["hits"], 2)
+
+    def test_ttl_expiry(self):
+        """Test idle sessions expire and come back empty"""
+        state = self.store.get("a")
+        state.record("stress", "Breathe.")
+        self.clock.now = 61
+        fresh = self.store.get("a")
+        self.assertIsNot(fresh, state)
+        self.assertEqual(len(fresh.recent_intents), 0)
+        self.assertEqual(self.store.stats()["expirations"], 1)
+
+    def test_history_is_bounded(self):
+        """Test per-session history never grows past its limit"""
+        state = self.store.get("a")
+        for i in range(10):
+            state.record("stress", str(i))
+        self.assertEqual(list(state.recent_replies), ["7", "8", "9"])
+
+
+class TestChatbotSessions(unittest.TestCase):
+    def test_no_repeat_within_session(self):
+        """Test a session never gets the same reply twice in a row"""
+        replies = ["One.", "Two.", "Three."]
+        bot = Chatbot({"stress": replies}, sessions=ConversationStore())
+        previous = None
+        for _ in range(50):
+            intent, reply = bot.reply("stress", session_id="s1")
+            self.assertNotEqual(reply, previous)
+            previous = reply
+        self.assertEqual(list(bot.sessions.get("s1").recent_intents)[-1], "stress")
+
+    def test_cycles_through_unused_replies(self):
+        """Test every reply is used before any repeats"""
+        replies = ["One.", "Two.", "Three."]
+        bot = Chatbot({"stress": replies}, sessions=ConversationStore())
+        seen = {bot.reply("stress", session_id="s1")[1] for _ in range(3)}
+        self.assertEqual(seen, set(replies))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import time
+import unittest
+from werkzeug.security import generate_password_hash
+from server import create_app
+from server.credentials import CredentialService, CredentialServiceBusy, hash_method
+from tests.test_config import TEST_USER
+
+FAST_METHOD = "pbkdf2:sha256:2000"
+
+
+class TestCredentialService(unittest.TestCase):
+    def test_verify_and_rehash(self):
+        """Test an outdated hash is verified and replaced at the configured cost"""
+        service = CredentialService(workers=0, method=FAST_METHOD)
+        old_hash = generate_password_hash("Test123!", "pbkdf2:sha256:1000")
+        self.assertEqual(service.verify(old_hash, "wrong"), (False, None))
+        ok, new_hash = service.verify(old_hash, "Test123!")
+        self.assertTrue(ok)
+        self.assertEqual(hash_method(new_hash), FAST_METHOD)
+        self.assertEqual(service.verify(new_hash, "Test123!"), (True, None))
+        self.assertEqual(service.stats()["rehashed"], 1)
+
+    def test_back_pressure(self):
+        """Test jobs past max_pending are rejected rather than queued"""
+        service = CredentialService(workers=0, max_pending=0, method=FAST_METHOD)
+        with self.assertRaises(CredentialServiceBusy):
+            service.hash_password("Test123!")
+        self.assertEqual(service.stats()["rejected"], 1)
+
+    def test_process_pool(self):
+        """Test hashing through a worker process"""
+        service = CredentialService(workers=1, method=FAST_METHOD)
+        self.addCleanup(service.close)
+        password_hash = service.hash_password("Test123!")
+        self.assertEqual(service.verify(password_hash, "Test123!"), (True, None))
+        stats = service.stats()
+        self.assertEqual(stats["completed"], 2)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_timeout_keeps_job_counted(self):
+        """Test a timed-out job raises busy and holds its slot until it ends"""
+        service = CredentialService(workers=1, method=FAST_METHOD, timeout=0.001)
+        self.addCleanup(service.close)
+        # Starting the worker process alone takes far longer than the timeout
+        with self.assertRaises(CredentialServiceBusy):
+            service.hash_password("Test123!")
+        self.assertEqual(service.stats()["timeouts"], 1)
+        self.assertEqual(service.stats()["pending"], 1)
+        deadline = time.monotonic() + 30
+        while service.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(service.stats()["pending"], 0)
+
+    def test_broken_pool_is_replaced(self):
+        """Test a dead worker raises busy and the next job gets a new pool"""
+        service = CredentialService(workers=1, method=FAST_METHOD)
+        self.addCleanup(service.close)
+        with self.assertRaises(CredentialServiceBusy):
+            service._run(os._exit, 1)
+        self.assertEqual(service.stats()["restarts"], 1)
+        self.assertEqual(service.stats()["pending"], 0)
+        password_hash = service.hash_password("Test123!")
+        self.assertEqual(service.verify(password_hash, "Test123!"), (True, None))
+
+
+class TestRegistrationAndLogin(unittest.TestCase):
+    def setUp(self):
+        """Set up an app that hashes in the request thread at a low cost"""
+        self.app = create_app({
+            "TESTING": True,
+            "PASSWORD_HASH_WORKERS": 0,
+            "PASSWORD_HASH_METHOD": FAST_METHOD,
+            "SEED_USERS": [TEST_USER],
+        })
+        self.client = self.app.test_client()
+
+    def test_register_then_login(self):
+        """Test a registered user can log in with their password"""
+        response = self.client.post("/api/register", json={
+            "username": "newstudent",
+            "password": "Correct-Horse-9",
+            "email": "new@cardiff.ac.uk",
+            "studentId": "87654321",
+            "fullName": "New Student"
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["username"], "newstudent")
+        self.assertNotIn("password", response.get_json())
+        stored = self.app.extensions["users"].get("newstudent").password_hash
+        self.assertEqual(hash_method(stored), FAST_METHOD)
+
+        response = self.client.post("/api/login", json={
+            "username": "newstudent",
+            "password": "Correct-Horse-9"
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("id", response.get_json())
+
+    def test_register_validation(self):
+        """Test invalid and duplicate registrations are rejected"""
+        response = self.client.post("/api/register", json={
+            "username": "<script>",
+            "password": "short"
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("validation", response.get_json()["message"].lower())
+        self.assertEqual(set(response.get_json()["errors"]), {"username", "password"})
+
+        response = self.client.post("/api/register", json={
+            "username": "TestUser",
+            "password": "Another-Pass-1"
+        })
+        self.assertEqual(response.status_code, 409)
+
+    def test_unknown_username_is_hashed(self):
+        """Test a login for an unknown username costs a password check too"""
+        credentials = self.app.extensions["credentials"]
+        response = self.client.post("/api/login", json={
+            "username": "nobody",
+            "password": "Test123!"
+        })
+        self.assertEqual(response.status_code, 401)
+        # One job to make the dummy hash, one to check against it
+        self.assertEqual(credentials.stats()["completed"], 2)
+        self.client.post("/api/login", json={"username": "nobody2", "password": "x"})
+        self.assertEqual(credentials.stats()["completed"], 3)
+
+    def test_no_accounts_by_default(self):
+        """Test apps outside the test config start without the test account"""
+        app = create_app({"TESTING": True, "PASSWORD_HASH_WORKERS": 0})
+        self.assertEqual(len(app.extensions["users"]), 0)
+        response = app.test_client().post("/api/login", json={
+            "username": "testuser",
+            "password": "Test123!"
+        })
+        self.assertEqual(response.status_code, 401)
+
+    def test_rehash_on_login(self):
+        """Test the seeded test account is upgraded on its first login"""
+        users = self.app.extensions["users"]
+        self.assertNotEqual(hash_method(users.get("testuser").password_hash), FAST_METHOD)
+        response = self.client.post("/api/login", json={
+            "username": "testuser",
+            "password": "Test123!"
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(hash_method(users.get("testuser").password_hash), FAST_METHOD)
+        self.assertEqual(self.app.extensions["credentials"].stats()["rehashed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
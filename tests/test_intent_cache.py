@@ -0,0 +1,64 @@
+import unittest
+from server.chatbot import Chatbot
+from server.intent_cache import IntentCache, normalize_message
+
+
+class TestNormalizeMessage(unittest.TestCase):
+    def test_case_whitespace_punctuation(self):
+        """Test variants of the same message share one key"""
+        variants = ["I feel anxious", "  i FEEL   anxious!!", "I feel, anxious.", "i\tfeel\nanxious?"]
+        self.assertEqual({normalize_message(v) for v in variants}, {"i feel anxious"})
+
+    def test_apostrophes_kept(self):
+        """Test apostrophes survive, including typographic ones"""
+        self.assertEqual(normalize_message("I CAN’T sleep"), "i can't sleep")
+
+
+class TestIntentCache(unittest.TestCase):
+    def setUp(self):
+        """Build a chatbot with a small cache"""
+        self.cache = IntentCache(max_entries=2)
+        self.bot = Chatbot({"stress": ["One.", "Two."]}, cache=self.cache)
+
+    def test_hits_after_normalisation(self):
+        """Test differently written messages hit the same entry"""
+        self.assertEqual(self.bot.classify("Stress!"), "stress")
+        self.assertEqual(self.bot.classify("  STRESS "), "stress")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["hit_ratio"], 0.5)
+
+    def test_replies_still_vary(self):
+        """Test cached intents still get a random reply"""
+        replies = {self.bot.reply("stress")[1] for _ in range(100)}
+        self.assertEqual(replies, {"One.", "Two."})
+
+    def test_lru_eviction(self):
+        """Test the cache stays within its bound"""
+        for message in ["stress", "hello", "stress", "goodbye"]:
+            self.bot.classify(message)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.bot.classify("stress")
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_long_messages_not_cached(self):
+        """Test messages over max_key_length are answered but never stored"""
+        message = "stress " + "x" * 300
+        for _ in range(2):
+            self.assertEqual(self.bot.classify(message), "stress")
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.stats()["uncached"], 2)
+        self.assertEqual(self.cache.stats()["misses"], 0)
+
+    def test_cleared_on_catalog_swap(self):
+        """Test a new catalog snapshot never sees stale intents"""
+        self.bot.classify("calm")
+        other = Chatbot({"calm": ["Nice."]}).catalog.snapshot
+        self.bot.catalog.swap(other)
+        self.assertEqual(self.bot.classify("calm"), "calm")
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from server.intents import IntentMatcher
+
+
+class TestIntentMatcher(unittest.TestCase):
+    def setUp(self):
+        """Build a matcher over a small catalog"""
+        self.responses = {
+            "stress": ["Try deep breathing exercises!"],
+            "anxiety": ["Meditation can help reduce anxiety."],
+        }
+        self.matcher = IntentMatcher.from_responses(self.responses)
+
+    def test_single_intent(self):
+        """Test a message containing one keyword"""
+        self.assertEqual(self.matcher.match("i feel so much stress"), ["stress"])
+        self.assertEqual(self.matcher.best("exam anxiety"), "anxiety")
+
+    def test_no_match(self):
+        """Test a message with no keywords"""
+        self.assertEqual(self.matcher.match("hello there"), [])
+        self.assertIsNone(self.matcher.best("hello there"))
+        self.assertEqual(self.matcher.best("hello", default="fallback"), "fallback")
+
+    def test_matches_inside_words(self):
+        """Test substring semantics are kept from the old loop"""
+        self.assertEqual(self.matcher.best("i am stressed"), "stress")
+
+    def test_catalog_order_breaks_ties(self):
+        """Test first catalog key wins when hit counts are equal"""
+        self.assertEqual(self.matcher.match("anxiety and stress"), ["stress", "anxiety"])
+
+    def test_ranked_by_hits(self):
+        """Test intents with more phrase hits rank first"""
+        matcher = IntentMatcher([
+            ("stress", "stress"),
+            ("anxious", "anxiety"),
+            ("panic", "anxiety"),
+        ])
+        self.assertEqual(matcher.match("stress, panic and feeling anxious"), ["anxiety", "stress"])
+
+    def test_overlapping_phrases(self):
+        """Test phrases that overlap or nest are all found"""
+        matcher = IntentMatcher([
+            ("he", "a"),
+            ("she", "b"),
+            ("his", "c"),
+            ("hers", "d"),
+        ])
+        self.assertEqual(sorted(matcher.match("ushers")), ["a", "b", "d"])
+
+    def test_agrees_with_substring_loop(self):
+        """Test the automaton finds the same intents as a naive scan"""
+        keywords = ["sad", "sadness", "lonely", "alone", "exam", "exams", "sleep", "eep"]
+        matcher = IntentMatcher((k, k) for k in keywords)
+        for message in ["sadness and sleep", "all alone before exams", "nothing here", "lonely"]:
+            expected = {k for k in keywords if k in message}
+            self.assertEqual(set(matcher.match(message)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import json
+from datetime import date, datetime, timezone
+from unittest import mock
+from flask.json.provider import DefaultJSONProvider
+from server import create_app
+from server import json_provider
+from server.json_provider import FastJSONProvider, preserialized
+from tests.test_config import get_test_app
+
+
+class TestJSONProvider(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up test app"""
+        cls.app = get_test_app()
+
+    def setUp(self):
+        """Set up test client"""
+        self.client = self.app.test_client()
+
+    def test_fast_provider_is_default(self):
+        """Test the app encodes compactly without sorting keys"""
+        self.assertIsInstance(self.app.json, FastJSONProvider)
+        self.assertEqual(self.app.json.dumps({"b": 1, "a": [1, 2]}), '{"b":1,"a":[1,2]}')
+
+    def test_dates_match_default_provider(self):
+        """Test dates encode as Flask's HTTP dates with or without orjson"""
+        value = {"at": datetime(2030, 3, 20, 14, 30, tzinfo=timezone.utc),
+                 "on": date(2030, 3, 20)}
+        expected = DefaultJSONProvider(self.app).dumps(value, separators=(",", ":"))
+        self.assertEqual(self.app.json.dumps(value), expected)
+        with mock.patch.object(json_provider, "orjson", None):
+            self.assertEqual(self.app.json.dumps(value), expected)
+
+    def test_provider_is_pluggable(self):
+        """Test another provider can be configured"""
+        app = create_app({'JSON_PROVIDER': DefaultJSONProvider})
+        self.assertNotIsInstance(app.json, FastJSONProvider)
+
+    def test_preserialized(self):
+        """Test fixed bodies are encoded once as bytes"""
+        body, status, headers = preserialized({"message": "Invalid request"}, 400)
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(json.loads(body), {"message": "Invalid request"})
+        self.assertEqual(status, 400)
+        self.assertIn(("Content-Type", "application/json"), headers)
+
+    def test_constant_responses(self):
+        """Test preserialized route responses look like jsonify ones"""
+        response = self.client.get("/admin")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertIn("access denied", response.get_json()["message"].lower())
+
+        response = self.client.post("/chatbot", json={"message": "hello"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertIn("response", response.get_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
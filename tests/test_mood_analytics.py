@@ -0,0 +1,140 @@
+import unittest
+from array import array
+from datetime import date, datetime, timedelta
+import numpy as np
+from server import mood_analytics as analytics
+from server.appointment_store import to_seconds
+from server.mood_store import MOOD_CODES
+from server import create_app
+from tests.test_config import TEST_USER, get_auth_headers
+
+FIRST = date(2030, 3, 1).toordinal()
+
+
+def snapshot(*users):
+    """MoodStore.snapshot() style data from {day offset: [moods]} per user"""
+    result = []
+    for user_id, days in enumerate(users, 1):
+        times, moods = array("q"), array("b")
+        for offset, day_moods in sorted(days.items()):
+            for hour, mood in enumerate(day_moods):
+                times.append(to_seconds(datetime.fromordinal(FIRST + offset)
+                                        + timedelta(hours=9 + hour)))
+                moods.append(MOOD_CODES[mood])
+        result.append((user_id, times, moods))
+    return result
+
+
+class TestMoodAnalytics(unittest.TestCase):
+    def test_daily_rolling_and_slope(self):
+        """Test daily means, partial rolling windows and the trend slope"""
+        data = snapshot({0: ["great", "okay"], 1: ["good"], 3: ["okay"], 9: ["awful"]})
+        trends = analytics.user_trends(data, FIRST, 5, window=3)
+        self.assertEqual(trends["daily"], [4.0, 4.0, None, 3.0, None])
+        self.assertEqual(trends["rolling"], [4.0, 4.0, 4.0, 3.5, 3.0])
+        # Least squares through (0, 4), (1, 4), (3, 3)
+        self.assertAlmostEqual(trends["slope"], -0.3571, places=4)
+
+    def test_streaks_and_crossings(self):
+        """Test low streaks end on missing days and crossings mark the drop"""
+        moods = ["good", "down", "awful", "down", None, "down", "down"]
+        data = snapshot({day: [mood] for day, mood in enumerate(moods) if mood})
+        trends = analytics.user_trends(data, FIRST, len(moods), window=1)
+        self.assertEqual(trends["lowStreak"], {"current": 2, "longest": 3})
+        self.assertEqual(trends["crossings"], [date.fromordinal(FIRST + 1).isoformat()])
+
+    def test_matches_per_user_results(self):
+        """Test the all-users computation agrees with running users one by one"""
+        rng = np.random.default_rng(1)
+        users = [{day: [str(m) for m in rng.choice(list(MOOD_CODES), rng.integers(1, 3))]
+                  for day in range(30) if rng.random() < 0.7} for _ in range(20)]
+        data = snapshot(*users)
+        _, rows, days, scores = analytics.load_columns(data)
+        matrix = analytics.daily_scores(rows, days, scores, len(data), FIRST, 30)
+        current, longest = analytics.low_streaks(matrix)
+        slopes = analytics.trend_slopes(matrix)
+        for i, user in enumerate(data):
+            single = analytics.user_trends([user], FIRST, 30)
+            self.assertEqual(single["lowStreak"], {"current": current[i], "longest": longest[i]})
+            self.assertAlmostEqual(single["slope"], slopes[i], places=4)
+
+        cohort = analytics.cohort_trends(data, FIRST, 30)
+        self.assertEqual(cohort["users"], 20)
+        self.assertEqual(cohort["usersImproving"] + cohort["usersDeclining"], 20)
+        self.assertEqual(cohort["usersInLowStreak"], int((current >= 3).sum()))
+
+    def test_empty(self):
+        """Test users and cohorts without entries give empty trends"""
+        trends = analytics.user_trends([], FIRST, 3)
+        self.assertEqual(trends["daily"], [None, None, None])
+        self.assertIsNone(trends["slope"])
+        self.assertEqual(analytics.cohort_trends([], FIRST, 3, min_users=0)["users"], 0)
+
+    def test_small_groups_are_withheld(self):
+        """Test days and cohorts with fewer than min_users users are not reported"""
+        data = snapshot({0: ["good"], 1: ["down"]}, {0: ["okay"]})
+        trends = analytics.cohort_trends(data, FIRST, 2, window=1, min_users=2)
+        self.assertEqual(trends["daily"], [3.5, None])
+        self.assertEqual(trends["users"], 2)
+        trends = analytics.cohort_trends(data, FIRST, 2, window=1, min_users=3)
+        self.assertEqual(trends["daily"], [None, None])
+        self.assertIsNone(trends["users"])
+        self.assertIsNone(trends["usersInLowStreak"])
+
+
+class TestMoodAnalyticsRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up an app with a staff account and log in as a student"""
+        self.app = create_app({
+            'TESTING': True,
+            'SECRET_KEY': 'test_secret_key',
+            'SEED_USERS': [TEST_USER, ("counselor", TEST_USER[1], {"staff": True})],
+            'MOOD_COHORT_MIN_USERS': 1,
+        })
+        self.client = self.app.test_client()
+        self.headers = get_auth_headers(self.client)
+        self.staff_headers = get_auth_headers(self.client, "counselor")
+
+    def test_user_and_cohort(self):
+        """Test today's entry shows up in the user's and the cohort's trends"""
+        self.client.post("/api/mood-entries", headers=self.headers, json={"mood": "down"})
+        data = self.client.get("/api/mood-entries/analytics?days=14&window=7",
+                               headers=self.headers).get_json()
+        self.assertEqual(data["to"], date.today().isoformat())
+        self.assertEqual(len(data["daily"]), 14)
+        self.assertEqual(data["daily"][-1], 2.0)
+        self.assertEqual(data["lowStreak"]["current"], 1)
+
+        cohort = self.client.get("/api/mood-entries/analytics/cohort?days=14&streak=1",
+                                 headers=self.staff_headers).get_json()
+        self.assertEqual((cohort["users"], cohort["usersInLowStreak"]), (1, 1))
+        self.assertEqual(cohort["daily"][-1], 2.0)
+
+    def test_bad_queries(self):
+        """Test out of range parameters are rejected"""
+        for query in ("days=0", "days=400", "days=7&window=8", "window=x", "days=-3",
+                      "days=%C2%B2"):
+            response = self.client.get(f"/api/mood-entries/analytics?{query}",
+                                       headers=self.headers)
+            self.assertEqual(response.status_code, 400, query)
+        response = self.client.get("/api/mood-entries/analytics/cohort?streak=0",
+                                   headers=self.staff_headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_cohort_is_staff_only(self):
+        """Test students cannot read the cohort and small cohorts are withheld"""
+        response = self.client.get("/api/mood-entries/analytics/cohort", headers=self.headers)
+        self.assertEqual(response.status_code, 403)
+        anonymous = self.app.test_client().get("/api/mood-entries/analytics/cohort")
+        self.assertEqual(anonymous.status_code, 401)
+        self.client.post("/api/mood-entries", headers=self.headers, json={"mood": "down"})
+        self.app.config["MOOD_COHORT_MIN_USERS"] = 2
+        cohort = self.client.get("/api/mood-entries/analytics/cohort?days=7",
+                                 headers=self.staff_headers).get_json()
+        self.assertEqual(cohort["minUsers"], 2)
+        self.assertIsNone(cohort["users"])
+        self.assertEqual(cohort["daily"], [None] * 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from server import create_app
+from server.mood_store import MoodStore, Rollup
+from tests.test_config import get_auth_headers, get_test_app
+
+
+class TestRollup(unittest.TestCase):
+    def test_daily_and_weekly_buckets(self):
+        """Test counts land in the right day and Monday-based week, in any order"""
+        daily, weekly = Rollup(1), Rollup(7)
+        # 2030-03-18 is a Monday
+        for day, code in ((20, 3), (20, 4), (24, 0), (25, 1), (18, 3)):
+            ordinal = date(2030, 3, day).toordinal()
+            daily.add(ordinal, code)
+            weekly.add(ordinal, code)
+        self.assertEqual([(date.fromordinal(o).day, list(c)) for o, c in daily.between(
+            date(2030, 3, 19).toordinal(), date(2030, 3, 24).toordinal())],
+            [(20, [0, 0, 0, 1, 1]), (24, [1, 0, 0, 0, 0])])
+        self.assertEqual([(date.fromordinal(o).isoformat(), list(c))
+                          for o, c in weekly.between(1, 1 << 31)],
+                         [("2030-03-18", [1, 0, 0, 2, 1]), ("2030-03-25", [0, 1, 0, 0, 0])])
+
+
+class TestMoodStore(unittest.TestCase):
+    def setUp(self):
+        """Create a store on a temporary SQLite file"""
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.url = f"sqlite:///{self.path}"
+        self.store = MoodStore(self.url)
+        self.addCleanup(self.store.engine.dispose)
+
+    def test_entries_and_summaries(self):
+        """Test entries come back newest first and rollups average their scores"""
+        self.store.add(1, "good", "Feeling positive", datetime(2030, 3, 20, 9, 0))
+        self.store.add(1, "great", timestamp=datetime(2030, 3, 20, 18, 0))
+        self.store.add(1, "awful", timestamp=datetime(2030, 3, 19, 22, 0))
+        self.store.add(2, "okay", timestamp=datetime(2030, 3, 20, 9, 0))
+        entries = self.store.entries(1)
+        self.assertEqual([e["mood"] for e in entries], ["great", "good", "awful"])
+        self.assertEqual(entries[1]["note"], "Feeling positive")
+        self.assertEqual(entries[1]["timestamp"], "2030-03-20 09:00:00")
+
+        daily = self.store.summary(1, "daily")
+        self.assertEqual([(d["date"], d["count"], d["average"]) for d in daily],
+                         [("2030-03-19", 1, 1.0), ("2030-03-20", 2, 4.5)])
+        self.assertEqual(daily[1]["moods"], {"awful": 0, "down": 0, "okay": 0,
+                                             "good": 1, "great": 1})
+        weekly = self.store.summary(1, "weekly")
+        self.assertEqual([(w["date"], w["count"]) for w in weekly], [("2030-03-18", 3)])
+        self.assertEqual(self.store.summary(1, "daily", first=date(2030, 3, 20))[0]["count"], 2)
+        self.assertEqual(self.store.summary(3), [])
+
+    def test_columns_rebuilt_on_restart(self):
+        """Test a new store over the same database serves the same entries"""
+        self.store.add(1, "down", "Exams", datetime(2030, 3, 20, 9, 0))
+        self.store.add(1, "okay", timestamp=datetime(2030, 3, 21, 9, 0))
+        restarted = MoodStore(self.url)
+        self.addCleanup(restarted.engine.dispose)
+        self.assertEqual(restarted.entries(1), self.store.entries(1))
+        self.assertEqual(restarted.summary(1, "weekly"), self.store.summary(1, "weekly"))
+        self.assertEqual(restarted.stats()["entries"], 2)
+
+    def test_app_refuses_file_database(self):
+        """Test apps only accept in-memory stores while user ids reset on restart"""
+        for key in ("MOOD_DATABASE_URL", "APPOINTMENTS_DATABASE_URL"):
+            with self.assertRaises(ValueError):
+                create_app({"TESTING": True, key: self.url})
+
+
+class TestMoodRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up a fresh app and log in"""
+        self.app = get_test_app()
+        self.client = self.app.test_client()
+        self.headers = get_auth_headers(self.client)
+
+    def test_record_list_and_summarise(self):
+        """Test entries are recorded for the logged in user and summarised"""
+        for mood in ("good", "down"):
+            response = self.client.post("/api/mood-entries", headers=self.headers,
+                                        json={"mood": mood})
+            self.assertEqual(response.status_code, 201)
+        entries = self.client.get("/api/mood-entries", headers=self.headers).get_json()
+        self.assertEqual([e["mood"] for e in entries["entries"]], ["down", "good"])
+        data = self.client.get("/api/mood-entries/summary?period=weekly",
+                               headers=self.headers).get_json()
+        self.assertEqual(data["summary"][0]["count"], 2)
+        self.assertEqual(data["summary"][0]["average"], 3.0)
+
+    def test_invalid_requests(self):
+        """Test bad moods, notes, periods and dates are rejected"""
+        for body in ({}, {"mood": "fine"}, {"mood": 3}, {"mood": "good", "note": 5},
+                     {"mood": "good", "note": "x" * 2001}):
+            response = self.client.post("/api/mood-entries", headers=self.headers, json=body)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.get_json())
+        for query in ("period=monthly", "from=2030-02-30"):
+            response = self.client.get(f"/api/mood-entries/summary?{query}",
+                                       headers=self.headers)
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.app.test_client().get("/api/mood-entries/summary").status_code,
+                         401)
+
+
+if __name__ == '__main__':
+    unittest.main()
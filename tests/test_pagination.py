@@ -0,0 +1,108 @@
+import unittest
+from datetime import datetime, timedelta
+from server.appointment_store import AppointmentStore
+from server.mood_store import MoodStore
+from server.pagination import decode_cursor, encode_cursor, page_request
+from tests.test_config import get_auth_headers, get_test_app
+
+
+class TestCursors(unittest.TestCase):
+    def test_round_trip_and_rejects(self):
+        """Test cursors decode to their key and malformed ones raise ValueError"""
+        cursor = encode_cursor("2030-03-20 14:30:00", 42)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), (datetime(2030, 3, 20, 14, 30), 42))
+        for bad in ("", "!!!", "eyJ0cyI6MTcwMDAwMDAwMH0", encode_cursor("yesterday", 1),
+                    encode_cursor("2030-03-20 14:30:00", "1"),
+                    encode_cursor("2030-03-20 14:30:00", 10 ** 30),
+                    encode_cursor("2030-03-20 14:30:00", -1),
+                    encode_cursor(["2030-03-20 14:30:00"], 1)):
+            with self.assertRaises(ValueError) as caught:
+                decode_cursor(bad)
+            self.assertEqual(str(caught.exception), "Invalid cursor")
+
+    def test_page_request(self):
+        """Test limit defaults, bounds and cursor errors"""
+        self.assertEqual(page_request({}), (None, 50, None))
+        self.assertEqual(page_request({"limit": "0"})[0], "limit must be between 1 and 200")
+        self.assertEqual(page_request({"limit": "201"})[0], "limit must be between 1 and 200")
+        # A digit int() can't parse
+        self.assertEqual(page_request({"limit": "\u00b2"})[0], "limit must be between 1 and 200")
+        self.assertEqual(page_request({"cursor": "x"})[0], "Invalid cursor")
+
+
+class TestKeysetPages(unittest.TestCase):
+    def test_mood_pages_cover_ties(self):
+        """Test pages of mood entries sharing timestamps neither skip nor repeat"""
+        store = MoodStore()
+        self.addCleanup(store.engine.dispose)
+        start = datetime(2030, 3, 20, 9, 0)
+        for i in range(11):
+            store.add(1, "okay", timestamp=start + timedelta(hours=i // 3))
+        store.add(2, "good", timestamp=start)
+        seen, before = [], None
+        while True:
+            page = store.entries(1, 4, before)
+            seen.extend(entry["id"] for entry in page)
+            if len(page) < 4:
+                break
+            before = decode_cursor(encode_cursor(page[-1]["timestamp"], page[-1]["id"]))
+        self.assertEqual(seen, [11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1])
+
+    def test_appointment_pages(self):
+        """Test appointment pages continue after the cursor's (date, id) key"""
+        store = AppointmentStore()
+        self.addCleanup(store.engine.dispose)
+        start = datetime(2030, 3, 20, 9, 0)
+        store.book_many([{"user_id": user_id, "date": start + timedelta(days=day),
+                          "type": "group"} for user_id, day in ((1, 0), (2, 0), (1, 1), (1, 2))])
+        first = store.for_user(1, 2)
+        rest = store.for_user(1, 2, (datetime.fromisoformat(first[-1]["date"]), first[-1]["id"]))
+        self.assertEqual([row["id"] for row in first + rest], [1, 3, 4])
+
+
+class TestPaginatedRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up a fresh app and log in"""
+        self.app = get_test_app()
+        self.client = self.app.test_client()
+        self.headers = get_auth_headers(self.client)
+
+    def test_mood_entry_pages(self):
+        """Test following nextCursor walks every entry once, newest first"""
+        for mood in ("great", "good", "okay", "down", "awful"):
+            self.client.post("/api/mood-entries", headers=self.headers, json={"mood": mood})
+        moods, url = [], "/api/mood-entries?limit=2"
+        while url:
+            data = self.client.get(url, headers=self.headers).get_json()
+            moods.extend(entry["mood"] for entry in data["entries"])
+            cursor = data["nextCursor"]
+            url = cursor and f"/api/mood-entries?limit=2&cursor={cursor}"
+        self.assertEqual(moods, ["awful", "down", "okay", "good", "great"])
+
+    def test_appointment_pages(self):
+        """Test appointment listings are paged oldest first"""
+        for day in (22, 20, 21):
+            self.client.post("/api/appointments", headers=self.headers, json={
+                "date": f"2030-03-{day} 10:00:00", "type": "counseling"})
+        data = self.client.get("/api/appointments?limit=2", headers=self.headers).get_json()
+        self.assertEqual([a["date"][:10] for a in data["appointments"]],
+                         ["2030-03-20", "2030-03-21"])
+        data = self.client.get(f"/api/appointments?limit=2&cursor={data['nextCursor']}",
+                               headers=self.headers).get_json()
+        self.assertEqual([a["date"][:10] for a in data["appointments"]], ["2030-03-22"])
+        self.assertIsNone(data["nextCursor"])
+
+    def test_bad_page_parameters(self):
+        """Test invalid limits and cursors are rejected"""
+        for url in ("/api/appointments?limit=500", "/api/mood-entries?limit=-1",
+                    "/api/mood-entries?limit=%C2%B2", "/api/mood-entries?cursor=abc",
+                    "/api/appointments?cursor=" + encode_cursor("2030-03-20 14:30:00", 10 ** 30),
+                    "/api/mood-entries?cursor=" + encode_cursor("2030-03-20 14:30:00", 10 ** 30)):
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn("error", response.get_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
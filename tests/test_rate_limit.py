@@ -0,0 +1,154 @@
+import os
+import unittest
+from server import create_app
+from server.rate_limit import SharedTokenBucketLimiter, TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucketLimiter(unittest.TestCase):
+    def setUp(self):
+        """Build a 3-per-minute limiter on a fake clock"""
+        self.clock = FakeClock()
+        self.limiter = TokenBucketLimiter(3, 60, shards=4, clock=self.clock)
+
+    def test_bucket_empties_and_refills(self):
+        """Test requests past the capacity are refused until tokens refill"""
+        self.assertEqual([self.limiter.hit("1.2.3.4")[0] for _ in range(4)],
+                         [True, True, True, False])
+        allowed, retry_after = self.limiter.hit("1.2.3.4")
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 20.0)
+        self.assertTrue(self.limiter.hit("5.6.7.8")[0])
+        self.clock.now = 20.0
+        self.assertTrue(self.limiter.hit("1.2.3.4")[0])
+        self.assertFalse(self.limiter.hit("1.2.3.4")[0])
+
+    def test_idle_keys_expire(self):
+        """Test keys idle for a full refill period are dropped"""
+        for i in range(20):
+            self.limiter.hit(f"10.0.0.{i}")
+        self.assertEqual(len(self.limiter), 20)
+        self.clock.now = 61.0
+        for i in range(20):
+            self.limiter.hit(f"10.0.0.{i}")
+        self.assertEqual(self.limiter.stats()["expired"], 20)
+        self.assertEqual(len(self.limiter), 20)
+
+    def test_key_count_bounded(self):
+        """Test each shard evicts its oldest key past max_keys"""
+        limiter = TokenBucketLimiter(3, 60, shards=4, max_keys=40, clock=self.clock)
+        for i in range(1000):
+            limiter.hit(f"user{i}")
+        self.assertLessEqual(len(limiter), 40)
+        self.assertGreater(limiter.stats()["evictions"], 0)
+
+
+class TestSharedTokenBucketLimiter(unittest.TestCase):
+    def test_attached_limiters_share_buckets(self):
+        """Test a second limiter on the same segment sees the same counts"""
+        name = f"test-rate-limit-{os.getpid()}"
+        clock = FakeClock()
+        first = SharedTokenBucketLimiter(name, 3, 60, slots=64, clock=clock)
+        second = SharedTokenBucketLimiter(name, 3, 60, slots=64, clock=clock)
+        self.addCleanup(first.unlink)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        self.assertTrue(first.owner)
+        self.assertFalse(second.owner)
+        self.assertTrue(first.hit("1.2.3.4")[0])
+        self.assertTrue(second.hit("1.2.3.4")[0])
+        self.assertTrue(first.hit("1.2.3.4")[0])
+        self.assertFalse(second.hit("1.2.3.4")[0])
+        clock.now = 20.0
+        self.assertTrue(second.hit("1.2.3.4")[0])
+
+    def test_table_size_fixed(self):
+        """Test new keys reuse slots once the table is full"""
+        name = f"test-rate-limit-full-{os.getpid()}"
+        limiter = SharedTokenBucketLimiter(name, 3, 60, slots=16)
+        self.addCleanup(limiter.unlink)
+        self.addCleanup(limiter.close)
+        for i in range(200):
+            self.assertTrue(limiter.hit(f"user{i}")[0])
+        self.assertGreater(limiter.stats()["evictions"], 0)
+
+    def test_set_fills_before_evicting(self):
+        """Test a new key in a set takes an empty way rather than evicting a bucket"""
+        name = f"test-rate-limit-set-{os.getpid()}"
+        clock = FakeClock()
+        # A single set of eight ways, so every key shares it
+        limiter = SharedTokenBucketLimiter(name, 2, 60, slots=8, clock=clock)
+        self.addCleanup(limiter.unlink)
+        self.addCleanup(limiter.close)
+        limiter.hit("victim")
+        limiter.hit("victim")
+        self.assertFalse(limiter.hit("victim")[0])
+        for i in range(7):
+            self.assertTrue(limiter.hit(f"other{i}")[0])
+        self.assertFalse(limiter.hit("victim")[0])
+        self.assertEqual(limiter.stats()["evictions"], 0)
+        # Once the others' buckets have refilled, their ways are reused first
+        clock.now = 60.0
+        limiter.hit("victim")
+        limiter.hit("victim")
+        clock.now = 61.0
+        self.assertTrue(limiter.hit("newcomer")[0])
+        self.assertFalse(limiter.hit("victim")[0])
+        self.assertEqual(limiter.stats()["evictions"], 0)
+
+    def test_hash_is_salted_per_segment(self):
+        """Test segments hash keys differently, and attached limiters agree"""
+        name = f"test-rate-limit-salt-{os.getpid()}"
+        first = SharedTokenBucketLimiter(name, 3, 60, slots=64)
+        second = SharedTokenBucketLimiter(name, 3, 60, slots=64)
+        other = SharedTokenBucketLimiter(f"{name}-other", 3, 60, slots=64)
+        for limiter in (first, other):
+            self.addCleanup(limiter.unlink)
+        for limiter in (first, second, other):
+            self.addCleanup(limiter.close)
+        self.assertEqual(first._hash("alice"), second._hash("alice"))
+        self.assertNotEqual(first._hash("alice"), other._hash("alice"))
+
+
+class TestLoginRateLimit(unittest.TestCase):
+    def setUp(self):
+        """Set up an app with a small per-IP login limit"""
+        self.app = create_app({"TESTING": True, "LOGIN_RATE_LIMIT_IP": (3, 60)})
+        self.client = self.app.test_client()
+
+    def test_login_throttled(self):
+        """Test logins past the IP limit get 429 with Retry-After"""
+        for _ in range(3):
+            response = self.client.post("/api/login", json={
+                "username": "nonexistent",
+                "password": "wrong"
+            })
+            self.assertEqual(response.status_code, 401)
+        response = self.client.post("/api/login", json={
+            "username": "testuser",
+            "password": "Test123!"
+        })
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("too many attempts", response.get_json()["message"].lower())
+        self.assertEqual(response.headers["Retry-After"], "20")
+        self.assertEqual(self.app.extensions["login_rate_limits"]["ip"].stats()["limited"], 1)
+
+    def test_username_limit(self):
+        """Test one username is throttled across different IPs"""
+        for i in range(11):
+            response = self.client.post("/api/login", json={
+                "username": "TestUser",
+                "password": "wrong"
+            }, environ_base={"REMOTE_ADDR": f"10.0.0.{i}"})
+        self.assertEqual(response.status_code, 429)
+
+
+if __name__ == '__main__':
+    unittest.main()
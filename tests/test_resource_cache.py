@@ -0,0 +1,120 @@
+import gzip
+import json
+import unittest
+from server.resource_cache import ResourceCatalogCache, get_resource_cache
+from server.resources import ResourceStore, get_resource_store
+from tests.test_config import get_test_app
+
+
+def resource(title, category):
+    return {"title": title, "category": category, "content": "x" * 300, "url": None}
+
+
+class TestResourceCatalogCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a store with two categories and a registered cache"""
+        self.store = ResourceStore([resource("Breathing", "self-help"),
+                                    resource("Helpline", "emergency")])
+        self.cache = ResourceCatalogCache(self.store)
+        self.store.listeners.append(self.cache)
+
+    def test_payload_is_built_once(self):
+        """Test a listing is encoded and compressed once and then reused"""
+        payload = self.cache.payload("self-help")
+        self.assertIs(self.cache.payload("self-help"), payload)
+        self.assertEqual([r["title"] for r in json.loads(payload.body)], ["Breathing"])
+        self.assertEqual(gzip.decompress(payload.gzipped), payload.body)
+        self.assertEqual(self.cache.stats()["builds"], 1)
+
+    def test_writes_invalidate_only_their_categories(self):
+        """Test a write changes its category and the full listing, nothing else"""
+        before = {category: self.cache.validators(category)[0]
+                  for category in (None, "self-help", "emergency")}
+        emergency = self.cache.payload("emergency")
+        self.store.update(1, {"title": "Box breathing"})
+        self.assertNotEqual(self.cache.validators(None)[0], before[None])
+        self.assertNotEqual(self.cache.validators("self-help")[0], before["self-help"])
+        self.assertEqual(self.cache.validators("emergency")[0], before["emergency"])
+        self.assertIs(self.cache.payload("emergency"), emergency)
+        self.assertIn(b"Box breathing", self.cache.payload(None).body)
+
+    def test_moves_and_new_categories(self):
+        """Test moving a resource changes both categories and new ones become known"""
+        self.assertFalse(self.cache.known("finance"))
+        self.store.add(resource("Budgeting", "finance"))
+        self.assertTrue(self.cache.known("finance"))
+        emergency = self.cache.validators("emergency")[0]
+        self.store.update(2, {"category": "self-help"})
+        self.assertNotEqual(self.cache.validators("emergency")[0], emergency)
+        self.assertEqual(json.loads(self.cache.payload("emergency").body), [])
+
+    def test_small_bodies_are_not_compressed(self):
+        """Test bodies under the gzip threshold are only kept plain"""
+        store = ResourceStore([{"title": "A", "category": "b", "content": "c", "url": None}])
+        self.assertIsNone(ResourceCatalogCache(store).payload(None).gzipped)
+
+
+class TestResourceCatalogRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up a fresh app"""
+        self.app = get_test_app()
+        self.client = self.app.test_client()
+
+    def test_validators(self):
+        """Test listings carry an ETag and Last-Modified and must be revalidated"""
+        response = self.client.get("/api/resources")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response.headers)
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(len(response.get_json()), 7)
+
+    def test_not_modified_without_touching_storage(self):
+        """Test a current ETag gets an empty 304 without reading the store"""
+        etag = self.client.get("/api/resources?category=self-help").headers["ETag"]
+        store = get_resource_store(self.app)
+        store.all = None
+        get_resource_cache(self.app)._payloads.clear()
+        response = self.client.get("/api/resources?category=self-help",
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+    def test_if_modified_since(self):
+        """Test Last-Modified revalidates when no ETag is sent"""
+        modified = self.client.get("/api/resources").headers["Last-Modified"]
+        response = self.client.get("/api/resources", headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get("/api/resources", headers={
+            "If-Modified-Since": modified, "If-None-Match": 'W/"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_gzip(self):
+        """Test clients that accept gzip get the compressed body"""
+        plain = self.client.get("/api/resources").data
+        response = self.client.get("/api/resources", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.data), plain)
+        self.assertLess(len(response.data), len(plain))
+
+    def test_write_changes_only_its_category(self):
+        """Test an edit makes stale ETags of its own category miss, not others"""
+        etags = {category: self.client.get(f"/api/resources?category={category}").headers["ETag"]
+                 for category in ("self-help", "emergency")}
+        get_resource_store(self.app).update(1, {"title": "Exam Stress"})
+        statuses = {category: self.client.get(f"/api/resources?category={category}",
+                                              headers={"If-None-Match": etag}).status_code
+                    for category, etag in etags.items()}
+        self.assertEqual(statuses, {"self-help": 200, "emergency": 304})
+
+    def test_unknown_category(self):
+        """Test an unknown category is an empty listing"""
+        response = self.client.get("/api/resources?category=nothing")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from server import resource_search
+from server.resource_search import SearchIndex, term_weights, tokenize
+from server.resources import ResourceStore
+from tests.test_config import get_test_app
+
+
+def resource(title, content, category="self-help"):
+    return {"title": title, "category": category, "content": content, "url": None}
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up a store with a live index"""
+        self.store = ResourceStore([
+            resource("Sleep Hygiene", "Regular sleep routine and less screen time"),
+            resource("Managing Exam Stress", "Revision plans for exam season and stress"),
+            resource("Stress at Work", "Part-time jobs can add stress", "support"),
+            resource("Anxiety Toolkit", "Grounding for anxious moments"),
+        ])
+        self.index = SearchIndex(self.store.all())
+        self.store.listeners.append(self.index)
+
+    def ids(self, query, **kwargs):
+        return [resource_id for resource_id, _ in self.index.search(query, **kwargs)]
+
+    def test_tokenize_and_weights(self):
+        """Test stopwords are dropped and title words outweigh body words"""
+        self.assertEqual(tokenize("How to manage THE exam-stress"), ["manage", "exam", "stress"])
+        weights = term_weights(resource("Exam tips", "exam"))
+        self.assertEqual(weights["exam"], 4)
+        self.assertEqual(weights["self"], 2)
+
+    def test_bm25_ranking(self):
+        """Test documents matching more query terms, more often, rank first"""
+        self.assertEqual(self.ids("exam stress"), [2, 3])
+        self.assertEqual(self.ids("nothing matches"), [])
+        self.assertEqual(self.ids("the and"), [])
+        # Same weighted count of "stress", but the shorter resource wins
+        self.assertEqual(self.ids("stress", limit=1), [3])
+
+    def test_prefix_matching(self):
+        """Test a partial word matches the terms it begins"""
+        self.assertEqual(self.ids("anx"), [4])
+        self.assertEqual(self.ids("slee routine"), [1])
+        # Too short to expand
+        self.assertEqual(self.ids("an"), [])
+
+    def test_category_filter(self):
+        """Test results are limited to the requested category"""
+        self.assertEqual(self.ids("stress", category="support"), [3])
+        self.assertEqual(self.ids("stress", category="finance"), [])
+
+    def test_incremental_updates(self):
+        """Test added and edited resources are searchable at once, old text is not"""
+        added = self.store.add(resource("Budgeting Basics", "Student money tips", "finance"))
+        self.assertEqual(self.ids("money"), [added["id"]])
+        self.store.update(1, {"content": "Naps and wind-down routine"})
+        self.assertEqual(self.ids("screen"), [])
+        self.assertEqual(self.ids("naps"), [1])
+        self.assertEqual(self.index._df("screen"), 0)
+        self.assertEqual(self.index.stats()["dead"], 1)
+        self.assertEqual(len(self.index), 5)
+
+    def test_compaction(self):
+        """Test compaction drops dead documents without changing results"""
+        for _ in range(3):
+            self.store.update(2, {"content": "Exam timetable help"})
+        before = self.index.search("exam stress")
+        with self.index._lock:
+            self.index._compact()
+        self.assertEqual(self.index.search("exam stress"), before)
+        self.assertEqual(self.index.stats()["dead"], 0)
+        self.assertEqual(self.index.stats()["postings"],
+                         sum(len(term_weights(r)) for r in self.store.all()))
+
+    def test_compacts_automatically(self):
+        """Test enough edits trigger a compaction"""
+        original = resource_search.COMPACT_MIN_DEAD
+        resource_search.COMPACT_MIN_DEAD = 8
+        self.addCleanup(setattr, resource_search, "COMPACT_MIN_DEAD", original)
+        for i in range(8):
+            self.store.update(1 + i % 4, {"content": f"edit {i}"})
+        self.assertEqual(self.index.stats()["dead"], 0)
+        self.assertEqual(sorted(self.ids("edit")), [1, 2, 3, 4])
+        self.assertEqual(self.ids("edit 7")[0], 4)
+
+
+class TestResourceRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up a fresh app"""
+        self.app = get_test_app()
+        self.client = self.app.test_client()
+
+    def test_list(self):
+        """Test the catalog lists every resource, or one category"""
+        data = self.client.get("/api/resources").get_json()
+        self.assertEqual(len(data), 7)
+        data = self.client.get("/api/resources?category=emergency").get_json()
+        self.assertEqual([r["title"] for r in data], ["Emergency Support"])
+
+    def test_search(self):
+        """Test q returns scored matches, best first"""
+        data = self.client.get("/api/resources?q=exam%20stress").get_json()
+        self.assertEqual(data[0]["title"], "Managing Exam Stress")
+        self.assertGreater(data[0]["score"], 0)
+        data = self.client.get("/api/resources?q=support&category=self-help&limit=1").get_json()
+        self.assertEqual([r["title"] for r in data], ["Depression Support"])
+
+    def test_bad_limit(self):
+        """Test out-of-range limits are rejected"""
+        for limit in ("0", "101", "x", "%C2%B2"):
+            response = self.client.get(f"/api/resources?q=stress&limit={limit}")
+            self.assertEqual(response.status_code, 400)
+
+    def test_injection_attempt(self):
+        """Test an injection attempt is refused rather than searched"""
+        response = self.client.get("/api/resources?q=%27%20OR%201%3D1")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import io
+import json
+import unittest
+from server import create_app
+from server.scanner import BodyTooLarge, RequestScanner, ScanRule, literal_prefix
+from tests.test_config import get_test_app
+
+
+class TestRequestScanner(unittest.TestCase):
+    def setUp(self):
+        """Build a scanner with the default rules"""
+        self.scanner = RequestScanner()
+
+    def test_clean_requests(self):
+        """Test ordinary paths and queries pass"""
+        self.assertIsNone(self.scanner.scan("/api/resources", "q=exam stress&category=self-help"))
+        self.assertIsNone(self.scanner.scan("/api/appointments"))
+
+    def test_rules_and_counters(self):
+        """Test each rule fires and is counted by name"""
+        self.assertEqual(self.scanner.scan("/api/resources", "q=' OR '1'='1"), "quote")
+        self.assertEqual(self.scanner.scan("/api/resources", "q=1 -- x"), "comment")
+        self.assertEqual(self.scanner.scan("/api/resources", "q=#"), "hash")
+        self.assertEqual(self.scanner.scan("/api/resources", "q=%27"), "double_encoded")
+        self.assertEqual(self.scanner.scan("/api/users'"), "quote")
+        stats = self.scanner.stats()
+        self.assertEqual(stats["blocked"], 5)
+        self.assertEqual(stats["rules"]["quote"], 2)
+
+    def test_host_is_not_scanned(self):
+        """Test only the path and query are looked at"""
+        scanner = RequestScanner([ScanRule("localhost", r"localhost")])
+        self.assertIsNone(scanner.scan("/api/resources", "q=stress"))
+
+    def test_literal_prefix(self):
+        """Test the literal prefix taken from each rule pattern"""
+        self.assertEqual(literal_prefix(r"\bunion\s+select"), "union")
+        self.assertEqual(literal_prefix(r"%(?:27|23)"), "%")
+        self.assertEqual(literal_prefix(r"ab*c"), "a")
+        self.assertEqual(literal_prefix(r"drop|union"), "")
+
+    def test_prefix_gate(self):
+        """Test the gated and ungated alternations find the same rules"""
+        gated = RequestScanner([ScanRule("union", r"\bunion\s+select\b"),
+                                ScanRule("sleep", r"\bsleep\s*\(")])
+        ungated = RequestScanner(gated.rules + (ScanRule("any_digit", r"[0-9]{9}"),))
+        self.assertTrue(gated._regex.pattern.startswith("(?="))
+        self.assertFalse(ungated._regex.pattern.startswith("(?="))
+        for query in ("q=1 UNION  SELECT pw", "q=sleep(5)", "q=reunion selection", "q=stress"):
+            self.assertEqual(gated.scan("/api/resources", query),
+                             ungated.scan("/api/resources", query))
+
+    def test_allow_list(self):
+        """Test allow-listed prefixes skip scanning"""
+        self.assertIsNone(self.scanner.scan("/chatbot/stream", "message=I can't sleep"))
+        self.assertIsNone(self.scanner.scan("/static/app.js", "v='1'"))
+        self.assertEqual(self.scanner.stats()["skipped"], 2)
+        self.assertEqual(self.scanner.stats()["scanned"], 0)
+
+
+class TestBodyScanner(unittest.TestCase):
+    def test_match_across_chunk_boundary(self):
+        """Test a pattern split between two chunks is still found"""
+        scanner = RequestScanner(body_rules=[ScanRule("union", r"\bunion\s+select\b")],
+                                 chunk_size=16, overlap=16)
+        body = b"q=" + b"x" * 10 + b" UNION SELECT password" + b"y" * 40
+        rule, spool = scanner.scan_body(io.BytesIO(body))
+        self.assertEqual(rule, "union")
+        self.assertEqual(spool.read(), body)
+        self.assertEqual(scanner.stats()["body_rules"]["union"], 1)
+
+    def test_body_rules(self):
+        """Test body rules ignore ordinary punctuation but catch injection shapes"""
+        scanner = RequestScanner()
+        for text in (b"I'm ok -- really #1", b"it's 5 o'clock; update soon"):
+            self.assertIsNone(scanner.scan_body(io.BytesIO(text))[0], text)
+        cases = {
+            b"admin' --": "quote_comment",
+            b"x' OR '1'='1": "tautology",
+            b"1 UNION ALL SELECT pw": "union_select",
+            b"1; DROP TABLE users": "stacked_query",
+        }
+        for text, rule in cases.items():
+            self.assertEqual(scanner.scan_body(io.BytesIO(text))[0], rule, text)
+
+    def test_stop_at_first_hit(self):
+        """Test stop ends reading at the first hit instead of spooling the rest"""
+        scanner = RequestScanner(chunk_size=16)
+        body = io.BytesIO(b"x' OR 1=1 --" + b"y" * 1000)
+        rule, spool = scanner.scan_body(body, stop=True)
+        self.assertEqual(rule, "tautology")
+        self.assertEqual(body.tell(), 16)
+        self.assertEqual(scanner.stats()["body_bytes"], 16)
+
+    def test_body_size_cap(self):
+        """Test bodies over max_body_size are refused rather than spooled"""
+        scanner = RequestScanner(chunk_size=1024, max_body_size=4096)
+        self.assertIsNone(scanner.scan_body(io.BytesIO(b"a" * 4096))[0])
+        with self.assertRaises(BodyTooLarge):
+            scanner.scan_body(io.BytesIO(b"a" * 5000))
+        self.assertEqual(scanner.stats()["bodies_refused"], 1)
+
+    def test_large_body_spools_to_disk(self):
+        """Test bodies above the spool size are not held in memory"""
+        scanner = RequestScanner(chunk_size=1024, spool_size=4096)
+        body = b"a" * 100000
+        rule, spool = scanner.scan_body(io.BytesIO(body))
+        self.assertIsNone(rule)
+        self.assertTrue(spool._rolled)
+        self.assertEqual(spool.read(), body)
+        self.assertEqual(scanner.stats()["body_bytes"], len(body))
+
+
+class TestScannerHook(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up test app"""
+        cls.app = get_test_app()
+
+    def setUp(self):
+        """Set up test client"""
+        self.client = self.app.test_client()
+
+    def test_encoded_injection_rejected(self):
+        """Test percent-encoded payloads are decoded before scanning"""
+        response = self.client.get("/api/resources?q=%27%20OR%201%3D1")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["message"], "Invalid request")
+        self.assertGreater(self.app.extensions["request_scanner"].stats()["rules"]["quote"], 0)
+
+    def test_chatbot_apostrophes_allowed(self):
+        """Test the chatbot stream accepts apostrophes in the query"""
+        response = self.client.get("/chatbot/stream?message=I%27m%20so%20stressed")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Chatbot-Intent"], "stress")
+
+    def test_body_passed_to_view(self):
+        """Test a scanned body is still readable by the view in report mode"""
+        response = self.client.post("/api/login", json={
+            "username": "testuser",
+            "password": "Test123!"
+        })
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post("/api/login", json={
+            "username": "admin' --",
+            "password": "x"
+        })
+        self.assertEqual(response.status_code, 401)
+        stats = self.app.extensions["request_scanner"].stats()
+        self.assertGreater(stats["body_rules"]["quote_comment"], 0)
+
+    def test_block_mode(self):
+        """Test body hits are rejected when SCANNER_BODY_MODE is block"""
+        app = create_app({"TESTING": True, "SCANNER_BODY_MODE": "block"})
+        app.logger.disabled = True
+        response = app.test_client().post(
+            "/api/login", data=json.dumps({"username": "admin' --"}),
+            content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["message"], "Invalid request")
+
+    def test_oversized_body_rejected(self):
+        """Test bodies over the cap get a 413 when MAX_CONTENT_LENGTH is unset"""
+        self.app.extensions["request_scanner"].max_body_size = 1024
+        self.addCleanup(setattr, self.app.extensions["request_scanner"], "max_body_size",
+                        self.app.extensions["request_scanner"].max_body_size)
+        response = self.client.post("/api/login", json={"username": "a" * 2000})
+        self.assertEqual(response.status_code, 413)
+
+    def test_apostrophes_in_body_not_reported(self):
+        """Test ordinary punctuation in a JSON body is not logged as an injection"""
+        scanner = self.app.extensions["request_scanner"]
+        before = sum(scanner.stats()["body_rules"].values())
+        self.client.post("/api/register", json={"username": "o'brien -- #1", "password": "x"})
+        self.assertEqual(sum(scanner.stats()["body_rules"].values()), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
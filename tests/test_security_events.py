@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from server import create_app
+from server.security_events import SecurityEventLog
+
+
+class TestSecurityEventLog(unittest.TestCase):
+    def test_events_written_in_batches(self):
+        """Test queued events reach the sink with their fields"""
+        batches = []
+        log = SecurityEventLog(batches.append)
+        for i in range(5):
+            self.assertTrue(log.emit("sql_injection", rule="quote", n=i))
+        self.assertTrue(log.flush())
+        events = [event for batch in batches for event in batch]
+        self.assertEqual([event["n"] for event in events], list(range(5)))
+        self.assertEqual(events[0]["event"], "sql_injection")
+        self.assertEqual(log.stats()["written"], 5)
+        log.close()
+
+    def test_full_queue_drops_events(self):
+        """Test a full queue drops events and counts the overflow"""
+        release = threading.Event()
+        log = SecurityEventLog(lambda batch: release.wait(5), max_queue=2, batch_size=1)
+        log.emit("first")
+        # Let the worker take the first event and block in the sink
+        while log.stats()["queued"]:
+            pass
+        results = [log.emit("flood", n=i) for i in range(5)]
+        self.assertEqual(results, [True, True, False, False, False])
+        stats = log.stats()
+        self.assertEqual(stats["dropped"], 3)
+        self.assertEqual(stats["overflows"], 1)
+        release.set()
+        log.close()
+        self.assertEqual(log.stats()["written"], 3)
+
+    def test_close_flushes_queue(self):
+        """Test close() writes out events that are still queued"""
+        written = []
+        log = SecurityEventLog(written.extend)
+        for i in range(100):
+            log.emit("event", n=i)
+        log.close()
+        self.assertEqual(len(written), 100)
+        self.assertFalse(log.emit("late"))
+
+    def test_sink_errors_counted(self):
+        """Test a failing sink does not stop the worker"""
+        def sink(batch):
+            raise OSError("disk full")
+
+        log = SecurityEventLog(sink)
+        log.emit("event")
+        self.assertTrue(log.flush())
+        self.assertEqual(log.stats()["sink_errors"], 1)
+        log.close()
+
+
+class TestSecurityEventHook(unittest.TestCase):
+    def test_injection_event_logged_as_json(self):
+        """Test the injection hook records structured fields"""
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        app = create_app({"TESTING": True, "SECURITY_LOG_PATH": path})
+        response = app.test_client().get("/api/resources?q=%27")
+        self.assertEqual(response.status_code, 400)
+        app.extensions["security_events"].close()
+        with open(path, encoding="utf-8") as f:
+            event = json.loads(f.readline())
+        self.assertEqual(event["event"], "sql_injection")
+        self.assertEqual(event["rule"], "quote")
+        self.assertEqual(event["method"], "GET")
+        self.assertEqual(event["source"], "url")
+        self.assertTrue(event["blocked"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import time
+import unittest
+from unittest.mock import patch
+from server.session_tokens import SessionTokens
+from tests.test_config import get_auth_headers, get_test_app
+
+
+class TestSessionTokens(unittest.TestCase):
+    def setUp(self):
+        """Build a token service with a short lifetime"""
+        self.tokens = SessionTokens("test_secret_key", ttl=60, cache_size=2)
+
+    def test_issue_and_verify(self):
+        """Test an issued token verifies, and the second check is cached"""
+        token = self.tokens.issue(7)
+        self.assertEqual(self.tokens.verify(token).user_id, 7)
+        self.assertEqual(self.tokens.verify(token).user_id, 7)
+        stats = self.tokens.stats()
+        self.assertEqual((stats["cache_misses"], stats["cache_hits"]), (1, 1))
+
+    def test_tampered_tokens_rejected(self):
+        """Test tokens with a changed payload or another key's signature fail"""
+        token = self.tokens.issue(7)
+        payload, signature = token.split(".")
+        forged = SessionTokens("other_key").issue(1)
+        for bad in (f"{forged.split('.')[0]}.{signature}", forged, "garbage", "a.b.c", ""):
+            self.assertIsNone(self.tokens.verify(bad))
+
+    def test_expired_token_rejected_from_cache(self):
+        """Test expiry is checked even for cached tokens"""
+        token = self.tokens.issue(7)
+        self.assertIsNotNone(self.tokens.verify(token))
+        with patch("time.time", return_value=time.time() + 61):
+            self.assertIsNone(self.tokens.verify(token))
+
+    def test_revocation_immediate(self):
+        """Test a revoked token fails at once, cached or not"""
+        token = self.tokens.issue(7)
+        self.assertIsNotNone(self.tokens.verify(token))
+        self.assertTrue(self.tokens.revoke(token))
+        self.assertIsNone(self.tokens.verify(token))
+        self.assertFalse(self.tokens.revoke(token))
+
+    def test_cache_bounded(self):
+        """Test the verified-token cache keeps only the most recent tokens"""
+        for user_id in range(5):
+            self.tokens.verify(self.tokens.issue(user_id))
+        self.assertEqual(self.tokens.stats()["cached"], 2)
+
+
+class TestSessionRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Set up test app"""
+        cls.app = get_test_app()
+
+    def setUp(self):
+        """Set up test client"""
+        self.client = self.app.test_client()
+
+    def test_login_sets_secure_cookie(self):
+        """Test login returns a token and a locked-down cookie"""
+        response = self.client.post("/api/login", json={
+            "username": "testuser",
+            "password": "Test123!"
+        })
+        self.assertIn("token", response.get_json())
+        cookie = response.headers["Set-Cookie"]
+        for flag in ("HttpOnly", "Secure", "SameSite=Lax"):
+            self.assertIn(flag, cookie)
+        self.assertEqual(self.client.get("/api/user").get_json()["username"], "testuser")
+
+    def test_forged_bearer_rejected(self):
+        """Test protected routes need a real token, not just a header"""
+        response = self.client.get("/api/appointments",
+                                   headers={"Authorization": "Bearer test-token"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_revokes_token(self):
+        """Test a token stops working after logout"""
+        headers = get_auth_headers(self.client)
+        self.assertEqual(self.client.get("/api/user", headers=headers).status_code, 200)
+        self.assertEqual(self.client.post("/api/logout", headers=headers).status_code, 200)
+        self.assertEqual(self.client.get("/api/user", headers=headers).status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from server.catalog import CatalogSnapshot
+from server.chatbot import Chatbot, DEFAULT_RESPONSE
+from server.tfidf import TfidfIntentClassifier, char_ngrams
+
+
+class TestTfidfClassifier(unittest.TestCase):
+    def setUp(self):
+        """Train on a few intents"""
+        self.classifier = TfidfIntentClassifier({
+            "stress": ["stress", "stressed", "overwhelmed"],
+            "anxiety": ["anxiety", "anxious", "panic attack"],
+            "sleep": ["insomnia", "can't sleep"],
+        })
+
+    def test_char_ngrams(self):
+        """Test words are padded and split into n-grams"""
+        self.assertEqual(char_ngrams("Hi", sizes=(3,)), {" hi": 1, "hi ": 1})
+
+    def test_paraphrases(self):
+        """Test paraphrases reach the right intent"""
+        self.assertEqual(self.classifier.top_k("I'm so stressed out", 1)[0][0], "stress")
+        self.assertEqual(self.classifier.top_k("feeling really anxious", 1)[0][0], "anxiety")
+        self.assertEqual(self.classifier.top_k("I can't get to sleep", 1)[0][0], "sleep")
+
+    def test_top_k_is_ranked(self):
+        """Test confidences are sorted and within [0, 1]"""
+        ranked = self.classifier.top_k("stressed and anxious", 3)
+        scores = [score for _, score in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(0 < s <= 1.0001 for s in scores))
+
+    def test_unknown_grams_lower_the_score(self):
+        """Test n-grams outside the vocabulary count towards the message's length"""
+        alone = self.classifier.top_k("stressed", 1)[0][1]
+        padded = self.classifier.top_k("stressed zzzz qqqq", 1)[0][1]
+        self.assertLess(padded, alone)
+        self.assertLess(self.classifier.top_k("the street is busy", 1)[0][1], 0.3)
+
+    def test_unknown_text(self):
+        """Test text with no known n-grams scores nothing"""
+        self.assertEqual(self.classifier.top_k("zzzz qqqq", 3), [])
+
+
+class TestChatbotFallback(unittest.TestCase):
+    def test_classifier_is_lazy(self):
+        """Test the model is only built when a message misses the keywords"""
+        bot = Chatbot({"stress": ["Breathe."], "anxiety": ["Meditate."]})
+        snapshot = bot.catalog.snapshot
+        bot.reply("stress")
+        self.assertIsNone(snapshot._classifier)
+        self.assertEqual(bot.reply("so stresed out"), ("stress", "Breathe."))
+        self.assertIsNotNone(snapshot._classifier)
+
+    def test_examples_train_the_fallback(self):
+        """Test catalog examples are used and low scores fall back"""
+        snapshot = CatalogSnapshot({
+            "sleep": (["insomnia"], ["Try a wind-down routine."], ["I keep waking up at night"]),
+        })
+        bot = Chatbot({})
+        bot.catalog.swap(snapshot)
+        self.assertEqual(bot.classify("waking up every night"), "sleep")
+        self.assertEqual(bot.reply("good morning"), (None, DEFAULT_RESPONSE))
+
+    def test_unrelated_text_falls_back(self):
+        """Test text sharing only a few n-grams with an intent gets the default reply"""
+        bot = Chatbot({"stress": ["Breathe."], "anxiety": ["Meditate."]})
+        for text in ("the street is busy", "I want to stretch my legs", "strong coffee", "str"):
+            self.assertEqual(bot.reply(text), (None, DEFAULT_RESPONSE), text)
+        self.assertEqual(bot.reply("I feel stresed"), ("stress", "Breathe."))
+
+    def test_fallback_can_be_disabled(self):
+        """Test a None threshold keeps exact matching only"""
+        bot = Chatbot({"stress": ["Breathe."]}, fallback_threshold=None)
+        self.assertEqual(bot.reply("stressful week"), ("stress", "Breathe."))
+        self.assertEqual(bot.reply("stresed"), (None, DEFAULT_RESPONSE))
+
+
+if __name__ == '__main__':
+    unittest.main()